@@ -6,22 +6,36 @@ application using FastAPI.
 """
 
 import os
+import threading
 import uuid
-from typing import Dict, List, Optional, Any
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Literal, Optional
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Query, Cookie, Response
+from fastapi import APIRouter, FastAPI, File, UploadFile, HTTPException, Query, Cookie, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from papershelf.api.upload_spool import UploadSizeLimitMiddleware, spool_upload
 from papershelf.ingest.pdf_processor import PDFProcessor
+from papershelf.ingest.embedding_batcher import BatchingEmbeddingGenerator
+from papershelf.ingest.embedding_cache import EmbeddingCache
 from papershelf.ingest.embedding_generator import EmbeddingGenerator
-from papershelf.db.vector_store import VectorStore
+from papershelf.ingest.ingestion_jobs import IngestionWorkerPool, find_existing_paper
+from papershelf.db.vector_backend import create_vector_store
+from papershelf.db.centroid_index import PaperCentroidIndex
 from papershelf.db.chat_history import ChatHistoryDB
+from papershelf.db.job_store import JobStore
+from papershelf.db.lexical_index import LexicalIndex
+from papershelf.db.paper_store import PaperStore
+from papershelf.query.paper_cache import PaperMetadataCache
+from papershelf.query.query_cache import QueryEmbeddingCache
 from papershelf.query.rag_engine import RAGEngine
 from papershelf.utils.pdf_generator import generate_chat_history_pdf
 from papershelf.utils.config import config
+from papershelf.utils.executors import BlockingExecutor
+from papershelf.utils.lazy import LazyService
 
 
 # Define request and response models
@@ -29,6 +43,7 @@ class QueryRequest(BaseModel):
     """Model for query requests."""
     query: str
     top_k: Optional[int] = 5
+    retrieval_mode: Optional[Literal["vector", "lexical", "hybrid", "two_stage"]] = None
 
 
 class QueryResponse(BaseModel):
@@ -38,6 +53,17 @@ class QueryResponse(BaseModel):
     retrieved_documents: List[Dict[str, Any]]
 
 
+class BatchQueryRequest(BaseModel):
+    """Model for batch query requests."""
+    queries: List[str] = Field(min_length=1, max_length=config.MAX_BATCH_QUERIES)
+    retrieval_mode: Optional[Literal["vector", "lexical", "hybrid", "two_stage"]] = None
+
+
+class BatchQueryResponse(BaseModel):
+    """Model for batch query responses."""
+    results: List[QueryResponse]
+
+
 class DocumentResponse(BaseModel):
     """Model for document responses."""
     id: str
@@ -48,48 +74,188 @@ class DocumentResponse(BaseModel):
     status: str
 
 
-# Create FastAPI app
-app = FastAPI(
-    title="PaperShelf API",
-    description="API for the PaperShelf academic paper RAG system",
-    version="0.1.0"
-)
+# Create global service instances; each is built on first use (or by the
+# background warm-up) so importing this module stays cheap
+def _build_pdf_processor() -> PDFProcessor:
+    """Build the PDF processor from the configuration."""
+    return PDFProcessor(
+        chunk_size=config.CHUNK_SIZE,
+        chunk_overlap=config.CHUNK_OVERLAP,
+        max_workers=config.PDF_EXTRACT_WORKERS,
+        pages_per_task=config.PDF_PAGES_PER_TASK,
+        max_tasks_per_worker=config.PDF_WORKER_MAX_TASKS
+    )
+
+
+def _build_embedding_generator(num_processes: Optional[int] = None) -> EmbeddingGenerator:
+    """Build the embedding generator, loading the embedding model."""
+    return EmbeddingGenerator(
+        model_name=config.EMBEDDING_MODEL,
+        cache=embedding_cache,
+        batch_size=config.EMBEDDING_BATCH_SIZE,
+        normalize_embeddings=config.EMBEDDING_NORMALIZE,
+        backend=config.EMBEDDING_BACKEND,
+        onnx_cache_dir=config.ONNX_CACHE_DIR,
+        onnx_quantize=config.ONNX_QUANTIZE,
+        num_processes=config.EMBEDDING_PROCESSES if num_processes is None else num_processes,
+        threads_per_process=config.EMBEDDING_THREADS_PER_PROCESS,
+        sort_by_length=config.EMBEDDING_SORT_BY_LENGTH
+    )
+
+
+def _build_query_encoder() -> EmbeddingGenerator:
+    """
+    Build the in-process encoder used for query embeddings.
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    Queries are short and latency-sensitive, so they skip the encoder
+    process pool, where they would pay for IPC and wait behind ingestion.
+    """
+    return _build_embedding_generator(num_processes=1)
+
+
+def _build_query_embedding_generator() -> BatchingEmbeddingGenerator:
+    """Build the micro-batching wrapper used for query embeddings."""
+    return BatchingEmbeddingGenerator(
+        query_encoder,
+        max_batch_size=config.QUERY_BATCH_MAX_SIZE,
+        max_wait_ms=config.QUERY_BATCH_MAX_WAIT_MS
+    )
+
+
+def _build_rag_engine() -> RAGEngine:
+    """Build the RAG engine, its LLM client and its graph."""
+    return RAGEngine(
+        vector_store=vector_store,
+        embedding_generator=query_embedding_generator or query_encoder,
+        model_name=config.LLM_MODEL,
+        temperature=config.LLM_TEMPERATURE,
+        max_tokens=config.LLM_MAX_TOKENS,
+        query_cache=query_cache,
+        paper_cache=paper_cache,
+        lexical_index=lexical_index,
+        retrieval_mode=config.RETRIEVAL_MODE,
+        hybrid_candidates=config.HYBRID_CANDIDATES,
+        rrf_k=config.HYBRID_RRF_K,
+        lexical_workers=config.LEXICAL_SEARCH_WORKERS,
+        generation_concurrency=config.LLM_MAX_CONCURRENCY,
+        centroid_index=centroid_index,
+        two_stage_papers=config.TWO_STAGE_PAPERS,
+        paper_store=paper_store
+    )
+
+
+pdf_processor = LazyService("pdf_processor", _build_pdf_processor)
+embedding_cache = (
+    LazyService(
+        "embedding_cache",
+        lambda: EmbeddingCache(config.EMBEDDING_CACHE_PATH, max_entries=config.EMBEDDING_CACHE_MAX_ENTRIES)
+    )
+    if config.EMBEDDING_CACHE_PATH else None
 )
-
-# Mount static files directory
-app.mount("/static", StaticFiles(directory="papershelf/static"), name="static")
-
-# Create global instances
-pdf_processor = PDFProcessor()
-embedding_generator = EmbeddingGenerator()
-vector_store = VectorStore()
-chat_history_db = ChatHistoryDB()
-rag_engine = RAGEngine(
+embedding_generator = LazyService("embedding_generator", _build_embedding_generator)
+# Without an encoder process pool, queries share the ingestion model
+query_encoder = (
+    LazyService("query_encoder", _build_query_encoder)
+    if config.EMBEDDING_PROCESSES > 1 else embedding_generator
+)
+vector_store = LazyService(
+    "vector_store",
+    lambda: create_vector_store(
+        config.VECTOR_BACKEND,
+        persist_directory=config.DB_PERSIST_DIRECTORY,
+        write_batch_size=config.VECTOR_WRITE_BATCH_SIZE or None,
+        hnsw_params=config.get_hnsw_params()
+    )
+)
+paper_store = LazyService("paper_store", lambda: PaperStore(config.PAPER_DB_PATH))
+lexical_index = LazyService("lexical_index", lambda: LexicalIndex(config.LEXICAL_INDEX_PATH))
+centroid_index = LazyService("centroid_index", lambda: PaperCentroidIndex(config.CENTROID_INDEX_PATH))
+chat_history_db = LazyService("chat_history_db", lambda: ChatHistoryDB(config.CHAT_HISTORY_DB_PATH))
+query_cache = QueryEmbeddingCache(capacity=config.QUERY_CACHE_SIZE, ttl=config.QUERY_CACHE_TTL)
+paper_cache = PaperMetadataCache(paper_store, capacity=config.PAPER_CACHE_SIZE)
+query_embedding_generator = (
+    LazyService("query_embedding_generator", _build_query_embedding_generator)
+    if config.QUERY_BATCH_MAX_WAIT_MS > 0 else None
+)
+rag_engine = LazyService("rag_engine", _build_rag_engine)
+job_store = LazyService("job_store", lambda: JobStore(config.JOB_DB_PATH))
+ingestion_pool = IngestionWorkerPool(
+    job_store=job_store,
+    pdf_processor=pdf_processor,
+    embedding_generator=embedding_generator,
     vector_store=vector_store,
-    embedding_generator=embedding_generator
+    paper_store=paper_store,
+    lexical_index=lexical_index,
+    centroid_index=centroid_index,
+    num_workers=config.INGEST_WORKERS
 )
 
 
+# Blocking calls made by request handlers run in these pools rather than on
+# the event loop; ingest and query work get separate pools so a burst of
+# uploads cannot hold up interactive queries
+ingest_executor = BlockingExecutor("papershelf-ingest", config.INGEST_EXECUTOR_THREADS)
+query_executor = BlockingExecutor("papershelf-query", config.QUERY_EXECUTOR_THREADS)
+
+
+def _warm_up(app: FastAPI) -> None:
+    """
+    Load the vector store and embedding model ahead of the first request.
+
+    Runs in a background thread so the server accepts connections (and
+    reports not ready) while the model loads.
+
+    Args:
+        app: Application whose state records warm-up failures
+    """
+    try:
+        vector_store.get()
+        embedding_generator.get()
+        # The first forward pass is slower than the rest; pay for it here
+        query_encoder.model.encode(["PaperShelf warm-up"], convert_to_tensor=False)
+    except Exception as e:
+        app.state.warmup_error = str(e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the ingestion workers and optional warm-up, and close services on shutdown."""
+    app.state.warmup_error = None
+    if config.WARMUP_ON_STARTUP:
+        threading.Thread(target=_warm_up, args=(app,), name="papershelf-warm-up", daemon=True).start()
+
+    # Resume jobs that were queued or interrupted before the last shutdown
+    ingestion_pool.start(resume=True)
+
+    yield
+
+    # Jobs still running after the timeout are resumed on the next start
+    ingestion_pool.stop(timeout=30.0)
+    ingest_executor.shutdown()
+    query_executor.shutdown()
+    for service in (
+        rag_engine, query_embedding_generator, query_encoder, embedding_generator, embedding_cache, pdf_processor,
+        vector_store
+    ):
+        if service is not None:
+            service.close()
+
+
+router = APIRouter()
+
+
 # Define endpoints
-@app.get("/", response_class=HTMLResponse)
+@router.get("/", response_class=HTMLResponse)
 async def root():
     """Root endpoint that serves the main page."""
     return FileResponse("papershelf/static/index.html")
 
-@app.get("/upload-page", response_class=HTMLResponse)
+@router.get("/upload-page", response_class=HTMLResponse)
 async def upload_page():
     """Endpoint that serves the upload form."""
     return FileResponse("papershelf/static/upload.html")
 
-@app.get("/query-page", response_class=HTMLResponse)
+@router.get("/query-page", response_class=HTMLResponse)
 async def query_page(response: Response, session_id: Optional[str] = Cookie(None)):
     """
     Endpoint that serves the query page.
@@ -98,18 +264,21 @@ async def query_page(response: Response, session_id: Optional[str] = Cookie(None
     """
     # If no session ID exists, create a new one
     if not session_id:
-        session_id = chat_history_db.create_session()
+        session_id = await query_executor.run(chat_history_db.create_session)
         response.set_cookie(key="session_id", value=session_id, max_age=60*60*24*30)  # 30 days
 
     return FileResponse("papershelf/static/query.html")
 
 
-@app.post("/upload", response_model=DocumentResponse)
+@router.post("/upload", status_code=202)
 async def upload_paper(file: UploadFile = File(...)):
     """
     Upload an academic paper (PDF).
 
-    The paper will be processed, text extracted, and embeddings generated and stored.
+    The paper is streamed to the upload directory and queued for background
+    ingestion; the response holds the ID of the job that will extract text,
+    generate embeddings and store them. Papers that were already ingested are
+    returned right away.
     """
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="File must be a PDF")
@@ -120,60 +289,182 @@ async def upload_paper(file: UploadFile = File(...)):
     safe_filename = os.path.basename(original_filename)
     # Create a unique filename to avoid conflicts
     unique_id = str(uuid.uuid4())[:8]  # Use first 8 chars of UUID for brevity
-    temp_path = f"{unique_id}_{safe_filename}"
+    os.makedirs(config.UPLOAD_DIR, exist_ok=True)
+    upload_path = os.path.join(config.UPLOAD_DIR, f"{unique_id}_{safe_filename}")
+    queued = False
     try:
-        with open(temp_path, "wb") as f:
-            f.write(await file.read())
-
-        # Process the PDF
-        metadata = pdf_processor.extract_metadata(temp_path)
-        # Add original filename to metadata
-        metadata["original_filename"] = original_filename
-        chunks = pdf_processor.process_pdf(temp_path)
-
-        # Generate embeddings
-        embeddings = embedding_generator.generate_embeddings(chunks)
-
-        # Create document IDs
-        doc_id_base = str(uuid.uuid4())
-        doc_ids = [f"{doc_id_base}_{i}" for i in range(len(chunks))]
-
-        # Create metadata for each chunk
-        metadatas = []
-        for i in range(len(chunks)):
-            chunk_metadata = metadata.copy()
-            chunk_metadata["chunk_index"] = i
-            chunk_metadata["total_chunks"] = len(chunks)
-            chunk_metadata["doc_id_base"] = doc_id_base
-            metadatas.append(chunk_metadata)
-
-        # Store in vector database
-        vector_store.add_documents(
-            document_ids=doc_ids,
-            embeddings=embeddings,
-            texts=chunks,
-            metadatas=metadatas
+        # Stream the upload to disk in chunks, hashing it on the way
+        spooled = await spool_upload(
+            file,
+            upload_path,
+            max_bytes=config.MAX_UPLOAD_MB * 1024 * 1024,
+            executor=ingest_executor.executor
         )
+        content_hash = spooled["content_hash"]
+
+        # Skip parsing and embedding if this exact file was already ingested
+        existing = await ingest_executor.run(find_existing_paper, paper_store, vector_store, content_hash)
+        if existing:
+            existing_metadata = existing["metadata"]
+            return JSONResponse(status_code=200, content={
+                "id": existing["doc_id_base"],
+                "title": existing_metadata.get("title", "Unknown"),
+                "author": existing_metadata.get("author", "Unknown"),
+                "page_count": existing_metadata.get("page_count", 0),
+                "original_filename": existing_metadata.get("original_filename", original_filename),
+                "status": "duplicate"
+            })
+
+        # Reuse the job already ingesting the same file, if any
+        job = await ingest_executor.run(job_store.find_active_job, content_hash)
+        if job is None:
+            job_id = await ingest_executor.run(job_store.create_job, upload_path, original_filename, content_hash)
+            queued = True
+            ingestion_pool.notify()
+        else:
+            job_id = job["job_id"]
 
         return {
-            "id": doc_id_base,
-            "title": metadata.get("title", "Unknown"),
-            "author": metadata.get("author", "Unknown"),
-            "page_count": metadata.get("page_count", 0),
+            "job_id": job_id,
+            "state": "queued" if queued else job["state"],
             "original_filename": original_filename,
-            "status": "success"
+            "status_url": f"/jobs/{job_id}"
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
 
     finally:
-        # Clean up the temporary file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        # The ingestion job removes the file once it is done with it
+        if not queued and os.path.exists(upload_path):
+            os.remove(upload_path)
+
+
+@router.get("/jobs")
+async def list_jobs(state: Optional[str] = None, limit: int = Query(100, ge=1, le=1000)):
+    """List recent ingestion jobs, optionally only those in one state."""
+    try:
+        jobs = await ingest_executor.run(job_store.list_jobs, state=state, limit=limit)
+        # The server-side path of the upload is an implementation detail
+        for job in jobs:
+            job.pop("file_path", None)
+        return {"jobs": jobs}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing jobs: {str(e)}")
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get the state, progress and timings of an ingestion job."""
+    try:
+        job = await ingest_executor.run(job_store.get_job, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+        job.pop("file_path", None)
+        return job
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting job: {str(e)}")
+
+
+@router.get("/papers")
+async def list_papers(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    sort: Literal["created_at", "title", "author"] = "created_at",
+    order: Literal["asc", "desc"] = "asc",
+    title: Optional[str] = None,
+    author: Optional[str] = None
+):
+    """
+    List ingested papers one page at a time.
+
+    Pass the next_cursor of a response as cursor to get the following page;
+    the sort order and filters must stay the same between pages.
+    """
+    try:
+        return await query_executor.run(
+            paper_store.list_papers,
+            limit=limit,
+            cursor=cursor,
+            sort_by=sort,
+            descending=order == "desc",
+            title=title,
+            author=author
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error listing papers: {str(e)}")
+
+
+@router.get("/papers/{paper_id}")
+async def get_paper(paper_id: str):
+    """Get the metadata of a paper."""
+    try:
+        paper = await query_executor.run(paper_store.get_paper, paper_id)
+        if not paper:
+            raise HTTPException(status_code=404, detail=f"Paper {paper_id} not found")
+
+        return paper
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting paper: {str(e)}")
+
+
+@router.get("/papers/{paper_id}/chunks")
+async def get_paper_chunks(paper_id: str, include_text: bool = True):
+    """List the chunks of a paper in order, with the paper's metadata."""
+    try:
+        chunks = await query_executor.run(vector_store.get_paper_chunks, paper_id, include_documents=include_text)
+        if not chunks:
+            raise HTTPException(status_code=404, detail=f"Paper {paper_id} not found")
+
+        paper = await query_executor.run(paper_store.get_paper, paper_id)
+        return {"id": paper_id, "paper": paper, "chunk_count": len(chunks), "chunks": chunks}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting paper chunks: {str(e)}")
+
 
+def _delete_paper(paper_id: str) -> Dict[str, Any]:
+    """Delete a paper's chunks, their full-text entries, its centroid and its metadata."""
+    deleted_chunks = vector_store.delete_paper(paper_id)
+    lexical_index.delete_paper(paper_id)
+    centroid_index.delete_paper(paper_id)
+    deleted_metadata = paper_store.delete_paper(paper_id)
+    paper_cache.invalidate(paper_id)
+    return {"deleted_chunks": deleted_chunks, "deleted_metadata": deleted_metadata}
 
-@app.post("/query", response_model=QueryResponse)
+
+@router.delete("/papers/{paper_id}")
+async def delete_paper(paper_id: str):
+    """Delete a paper, its chunks and its metadata."""
+    try:
+        deleted = await ingest_executor.run(_delete_paper, paper_id)
+        if not deleted["deleted_chunks"] and not deleted["deleted_metadata"]:
+            raise HTTPException(status_code=404, detail=f"Paper {paper_id} not found")
+
+        return {"id": paper_id, "deleted_chunks": deleted["deleted_chunks"]}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting paper: {str(e)}")
+
+
+@router.post("/query", response_model=QueryResponse)
 async def query_papers(request: QueryRequest, session_id: Optional[str] = Cookie(None)):
     """
     Query the academic papers using RAG.
@@ -182,15 +473,16 @@ async def query_papers(request: QueryRequest, session_id: Optional[str] = Cookie
     The query and response will be saved to the database if a session ID is provided.
     """
     try:
-        result = rag_engine.query(request.query)
+        result = await query_executor.run(rag_engine.query, request.query, retrieval_mode=request.retrieval_mode)
 
         # Save the query and response to the database if a session ID is provided
         if session_id:
-            chat_history_db.add_chat_entry(
+            await query_executor.run(
+                chat_history_db.add_chat_entry,
                 session_id=session_id,
                 query=request.query,
-                answer=result.answer,
-                retrieved_documents=result.retrieved_documents
+                answer=result["answer"],
+                retrieved_documents=result["retrieved_documents"]
             )
 
         return result
@@ -199,39 +491,97 @@ async def query_papers(request: QueryRequest, session_id: Optional[str] = Cookie
         raise HTTPException(status_code=500, detail=f"Error querying papers: {str(e)}")
 
 
-@app.get("/stats")
+@router.post("/query/batch", response_model=BatchQueryResponse)
+async def query_papers_batch(request: BatchQueryRequest, session_id: Optional[str] = Cookie(None)):
+    """
+    Query the academic papers with several questions at once.
+
+    The questions are embedded and searched together, and their answers are
+    generated concurrently. Each query and response is saved to the database
+    if a session ID is provided.
+    """
+    try:
+        results = await query_executor.run(
+            rag_engine.query_batch, request.queries, retrieval_mode=request.retrieval_mode
+        )
+
+        if session_id:
+            for result in results:
+                await query_executor.run(
+                    chat_history_db.add_chat_entry,
+                    session_id=session_id,
+                    query=result["query"],
+                    answer=result["answer"],
+                    retrieved_documents=result["retrieved_documents"]
+                )
+
+        return {"results": results}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying papers: {str(e)}")
+
+
+@router.get("/stats")
 async def get_stats():
     """Get statistics about the database."""
     try:
-        stats = vector_store.get_collection_stats()
+        stats = await query_executor.run(vector_store.get_collection_stats)
+        if embedding_cache is not None and embedding_cache.loaded:
+            stats["embedding_cache"] = embedding_cache.get_stats()
+        stats["query_cache"] = query_cache.get_stats()
+        stats["paper_cache"] = paper_cache.get_stats()
+        if query_embedding_generator is not None and query_embedding_generator.loaded:
+            stats["query_batching"] = query_embedding_generator.get_stats()
         return stats
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting stats: {str(e)}")
 
 
-@app.get("/sessions")
+@router.get("/ready")
+async def readiness(request: Request):
+    """
+    Report whether the embedding model and vector store are loaded.
+
+    Returns 503 until both are ready, so load balancers can hold traffic
+    back from a worker that is still warming up.
+    """
+    services = {
+        "vector_store": bool(vector_store.loaded),
+        "embedding_generator": bool(embedding_generator.loaded),
+        "rag_engine": bool(rag_engine.loaded)
+    }
+    ready = services["vector_store"] and services["embedding_generator"]
+    content = {
+        "ready": ready,
+        "services": services,
+        "warmup_error": getattr(request.app.state, "warmup_error", None)
+    }
+    return JSONResponse(status_code=200 if ready else 503, content=content)
+
+
+@router.get("/sessions")
 async def get_sessions():
     """Get all chat sessions."""
     try:
-        sessions = chat_history_db.get_all_sessions()
+        sessions = await query_executor.run(chat_history_db.get_all_sessions)
         return {"sessions": sessions}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting sessions: {str(e)}")
 
 
-@app.get("/sessions/{session_id}")
+@router.get("/sessions/{session_id}")
 async def get_session_history(session_id: str):
     """Get chat history for a specific session."""
     try:
         # Get session info
-        session_info = chat_history_db.get_session_info(session_id)
+        session_info = await query_executor.run(chat_history_db.get_session_info, session_id)
         if not session_info:
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
 
         # Get chat history
-        history = chat_history_db.get_session_history(session_id)
+        history = await query_executor.run(chat_history_db.get_session_history, session_id)
 
         return {
             "session_info": session_info,
@@ -244,23 +594,23 @@ async def get_session_history(session_id: str):
         raise HTTPException(status_code=500, detail=f"Error getting session history: {str(e)}")
 
 
-@app.get("/sessions/{session_id}/export-pdf")
+@router.get("/sessions/{session_id}/export-pdf")
 async def export_session_to_pdf(session_id: str):
     """Export chat history for a specific session to PDF."""
     try:
         # Get session info
-        session_info = chat_history_db.get_session_info(session_id)
+        session_info = await query_executor.run(chat_history_db.get_session_info, session_id)
         if not session_info:
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
 
         # Get chat history
-        history = chat_history_db.get_session_history(session_id)
+        history = await query_executor.run(chat_history_db.get_session_history, session_id)
 
         # Create PDF export directory if it doesn't exist
         os.makedirs(config.PDF_EXPORT_DIR, exist_ok=True)
 
         # Generate PDF
-        pdf_path = generate_chat_history_pdf(config.PDF_EXPORT_DIR, session_info, history)
+        pdf_path = await query_executor.run(generate_chat_history_pdf, config.PDF_EXPORT_DIR, session_info, history)
 
         # Return the PDF file
         return FileResponse(
@@ -275,8 +625,41 @@ async def export_session_to_pdf(session_id: str):
         raise HTTPException(status_code=500, detail=f"Error exporting session to PDF: {str(e)}")
 
 
-def create_app():
-    """Create and configure the FastAPI application."""
-    # The app is already configured in this module
-    # This function is provided for compatibility with other parts of the code
+def create_app() -> FastAPI:
+    """
+    Create and configure the FastAPI application.
+
+    Services are shared module-level instances that are built lazily, so
+    creating an app does not load any models.
+
+    Returns:
+        FastAPI application
+    """
+    app = FastAPI(
+        title="PaperShelf API",
+        description="API for the PaperShelf academic paper RAG system",
+        version="0.1.0",
+        lifespan=lifespan
+    )
+
+    # Stop reading oversized uploads before their body is parsed
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=config.MAX_UPLOAD_MB * 1024 * 1024)
+
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Mount static files directory
+    app.mount("/static", StaticFiles(directory="papershelf/static"), name="static")
+
+    app.include_router(router)
     return app
+
+
+# Application used by `uvicorn papershelf.api.app:app`
+app = create_app()
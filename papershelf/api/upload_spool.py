@@ -0,0 +1,171 @@
+"""
+Upload spooling module for PaperShelf.
+
+This module streams uploaded files to disk in fixed-size chunks, so memory
+use per upload stays constant, while validating and hashing them on the way.
+It also provides middleware that stops reading upload requests as soon as
+they exceed the upload limit, before the multipart body is parsed.
+"""
+
+import asyncio
+import hashlib
+import os
+from concurrent.futures import Executor
+from typing import Any, BinaryIO, Dict, Optional, Sequence
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# PDF files start with this marker, possibly after a little leading junk
+PDF_MAGIC = b"%PDF-"
+HEADER_SEARCH_BYTES = 1024
+
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    """Build the error returned for uploads over the size limit."""
+    return HTTPException(
+        status_code=413,
+        detail=f"File is larger than the {max_bytes // (1024 * 1024)} MB upload limit"
+    )
+
+
+def _check_pdf_header(header: bytes) -> None:
+    """
+    Reject files whose first bytes do not contain the PDF marker.
+
+    Args:
+        header: The first bytes of the file
+    """
+    if PDF_MAGIC not in header[:HEADER_SEARCH_BYTES]:
+        raise HTTPException(status_code=400, detail="File is not a valid PDF")
+
+
+def _write_chunk(f: BinaryIO, digest: Any, chunk: bytes) -> None:
+    """Hash a chunk and append it to the spool file."""
+    digest.update(chunk)
+    f.write(chunk)
+
+
+async def spool_upload(
+    upload: UploadFile,
+    path: str,
+    max_bytes: int,
+    chunk_size: int = 1024 * 1024,
+    executor: Optional[Executor] = None
+) -> Dict[str, Any]:
+    """
+    Stream an uploaded PDF to disk, hashing it as it is written.
+
+    The upload is rejected as soon as its first bytes show it is not a PDF
+    or it grows past max_bytes, and the partial file is removed.
+
+    Args:
+        upload: The uploaded file
+        path: Path to write the file to
+        max_bytes: Largest accepted file size in bytes
+        chunk_size: Number of bytes read and written at a time
+        executor: Executor the blocking writes run in (None for the event
+            loop's default executor)
+
+    Returns:
+        Dictionary with the file "path", its SHA-256 "content_hash" and its
+        "size" in bytes
+    """
+    loop = asyncio.get_running_loop()
+    digest = hashlib.sha256()
+    size = 0
+    header = b""
+    header_checked = False
+
+    try:
+        with open(path, "wb") as f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+
+                if not header_checked:
+                    header += chunk[:HEADER_SEARCH_BYTES - len(header)]
+                    if len(header) >= HEADER_SEARCH_BYTES:
+                        _check_pdf_header(header)
+                        header_checked = True
+
+                await loop.run_in_executor(executor, _write_chunk, f, digest, chunk)
+
+        # Files shorter than the search window are checked once fully read
+        if not header_checked:
+            _check_pdf_header(header)
+
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    return {
+        "path": path,
+        "content_hash": digest.hexdigest(),
+        "size": size
+    }
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware that rejects upload requests larger than the upload limit.
+
+    The multipart body of an upload is read in full before the endpoint
+    runs, so the endpoint's own size check comes too late to save the
+    bandwidth and temporary disk space. Requests whose Content-Length is
+    over the limit are rejected before any of the body is read, and the
+    body is counted as it is read so one without a Content-Length is cut
+    off once it passes the limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int, paths: Sequence[str] = ("/upload",)):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application
+            max_bytes: Largest accepted file size in bytes; request bodies may
+                exceed it by MULTIPART_OVERHEAD_BYTES for the multipart framing
+            paths: Paths of the upload endpoints
+        """
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = tuple(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.max_bytes + MULTIPART_OVERHEAD_BYTES
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            error = _too_large(self.max_bytes)
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                # FastAPI passes HTTP errors raised while reading the body through
+                if received > limit:
+                    raise _too_large(self.max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
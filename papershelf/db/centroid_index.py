@@ -0,0 +1,233 @@
+"""
+Paper centroid index module for PaperShelf.
+
+This module stores one centroid embedding per paper, the normalized mean of
+its chunk embeddings, in SQLite. Searching the centroids picks the papers
+closest to a query, so chunk search can be limited to those papers.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from papershelf.db.sqlite import connect_sqlite
+from papershelf.db.vector_backend import VectorStoreBackend, normalize_rows
+from papershelf.utils.config import config
+
+
+class PaperCentroidIndex:
+    """Class for managing the centroid embeddings of papers."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the centroid index database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path or config.CENTROID_INDEX_PATH
+        self._create_tables_if_not_exist()
+
+        # Centroids are searched in memory; the matrix is reloaded when the
+        # stored version changes, including through another process
+        self._matrix_lock = threading.Lock()
+        self._version = -1
+        self._doc_id_bases: List[str] = []
+        self._matrix: Optional[np.ndarray] = None
+
+    def _create_tables_if_not_exist(self):
+        """Create the necessary tables if they don't exist."""
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS centroids (
+            doc_id_base TEXT PRIMARY KEY,
+            num_chunks INTEGER NOT NULL,
+            centroid BLOB NOT NULL
+        )
+        ''')
+
+        # Bumped on every change so processes know when to reload the matrix
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS state (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO state (key, value) VALUES ('version', 0)")
+
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def compute_centroid(embeddings: Union[List[List[float]], np.ndarray]) -> np.ndarray:
+        """
+        Compute the centroid of a paper's chunk embeddings.
+
+        Chunks are normalized before averaging so each counts equally.
+
+        Args:
+            embeddings: Embeddings of the paper's chunks
+
+        Returns:
+            Float32 unit vector
+        """
+        embeddings = normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        return normalize_rows(embeddings.mean(axis=0, keepdims=True))[0]
+
+    def add_paper(self, doc_id_base: str, embeddings: Union[List[List[float]], np.ndarray]) -> None:
+        """
+        Store the centroid of a paper, replacing any earlier one.
+
+        Papers without chunks have no centroid and are skipped.
+
+        Args:
+            doc_id_base: ID shared by all chunks of the paper
+            embeddings: Embeddings of the paper's chunks
+        """
+        if len(embeddings) == 0:
+            return
+        self._add_centroids([(doc_id_base, len(embeddings), self.compute_centroid(embeddings))])
+
+    def _add_centroids(self, centroids: List[Tuple[str, int, np.ndarray]]) -> None:
+        """Store (doc_id_base, num_chunks, centroid) entries in one transaction."""
+        conn = connect_sqlite(self.db_path)
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO centroids (doc_id_base, num_chunks, centroid) VALUES (?, ?, ?)",
+                [
+                    (doc_id_base, num_chunks, np.asarray(centroid, dtype=np.float32).tobytes())
+                    for doc_id_base, num_chunks, centroid in centroids
+                ]
+            )
+            conn.execute("UPDATE state SET value = value + 1 WHERE key = 'version'")
+        conn.close()
+
+    def delete_paper(self, doc_id_base: str) -> bool:
+        """
+        Delete the centroid of a paper.
+
+        Args:
+            doc_id_base: ID shared by all chunks of the paper
+
+        Returns:
+            True if the paper had a centroid, False otherwise
+        """
+        conn = connect_sqlite(self.db_path)
+        with conn:
+            cursor = conn.execute("DELETE FROM centroids WHERE doc_id_base = ?", (doc_id_base,))
+            if cursor.rowcount:
+                conn.execute("UPDATE state SET value = value + 1 WHERE key = 'version'")
+        conn.close()
+
+        return cursor.rowcount > 0
+
+    def _load(self) -> Tuple[List[str], Optional[np.ndarray]]:
+        """Return the paper IDs and centroid matrix, reloading them if they changed."""
+        conn = connect_sqlite(self.db_path)
+        version = conn.execute("SELECT value FROM state WHERE key = 'version'").fetchone()[0]
+
+        with self._matrix_lock:
+            if version != self._version:
+                rows = conn.execute("SELECT doc_id_base, centroid FROM centroids ORDER BY doc_id_base").fetchall()
+                self._doc_id_bases = [row["doc_id_base"] for row in rows]
+                self._matrix = (
+                    np.stack([np.frombuffer(row["centroid"], dtype=np.float32) for row in rows]) if rows else None
+                )
+                self._version = version
+            loaded = (self._doc_id_bases, self._matrix)
+
+        conn.close()
+        return loaded
+
+    def search(
+        self,
+        query_embeddings: Union[List[List[float]], np.ndarray],
+        n_papers: int = 10
+    ) -> List[List[str]]:
+        """
+        Find the papers whose centroids are closest to each query.
+
+        Args:
+            query_embeddings: Embeddings of the queries, as a list or 2-D array
+            n_papers: Number of papers to return per query
+
+        Returns:
+            One list of doc_id_base values per query, closest first
+        """
+        queries = normalize_rows(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        doc_id_bases, matrix = self._load()
+        k = min(n_papers, len(doc_id_bases))
+        if k == 0:
+            return [[] for _ in queries]
+
+        papers = []
+        for similarities in queries @ matrix.T:
+            top = np.argpartition(-similarities, k - 1)[:k]
+            papers.append([doc_id_bases[i] for i in top[np.argsort(-similarities[top])]])
+
+        return papers
+
+    def backfill_from_vector_store(self, vector_store: VectorStoreBackend, batch_size: int = 1000) -> int:
+        """
+        Compute the centroid of every paper in the vector store.
+
+        Centroids that already exist are replaced, so this can be rerun.
+
+        Args:
+            vector_store: Vector store holding the chunks
+            batch_size: Number of chunks read per call to the vector store
+
+        Returns:
+            Number of papers whose centroid was stored
+        """
+        # Chunks may come in any order, so sums are kept per paper
+        sums: Dict[str, np.ndarray] = {}
+        counts: Dict[str, int] = {}
+        for chunk in vector_store.iter_chunks(batch_size=batch_size, include_embeddings=True):
+            doc_id_base = (chunk["metadata"] or {}).get("doc_id_base")
+            if not doc_id_base:
+                continue
+            embedding = normalize_rows(np.asarray([chunk["embedding"]], dtype=np.float32))[0]
+            if doc_id_base in sums:
+                sums[doc_id_base] += embedding
+            else:
+                sums[doc_id_base] = embedding
+            counts[doc_id_base] = counts.get(doc_id_base, 0) + 1
+
+        centroids = [
+            (doc_id_base, counts[doc_id_base], normalize_rows(total[np.newaxis])[0])
+            for doc_id_base, total in sums.items()
+        ]
+        for start in range(0, len(centroids), batch_size):
+            self._add_centroids(centroids[start:start + batch_size])
+
+        return len(centroids)
+
+    def get_version(self) -> int:
+        """
+        Get the version of the index, which changes whenever a centroid is added or deleted.
+
+        Returns:
+            Version counter of the index
+        """
+        conn = connect_sqlite(self.db_path)
+        version = conn.execute("SELECT value FROM state WHERE key = 'version'").fetchone()[0]
+        conn.close()
+
+        return version
+
+    def count(self) -> int:
+        """
+        Count the papers with a centroid.
+
+        Returns:
+            Number of centroids in the index
+        """
+        conn = connect_sqlite(self.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM centroids").fetchone()[0]
+        conn.close()
+
+        return count
@@ -0,0 +1,349 @@
+"""
+Index tuning module for PaperShelf.
+
+This module measures how HNSW index parameters, and limiting chunk search
+to the papers picked by their centroids, trade recall for search latency on
+the embeddings actually stored in the vector database.
+"""
+
+import time
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from papershelf.db.centroid_index import PaperCentroidIndex
+from papershelf.db.vector_backend import VectorStoreBackend
+
+
+def _import_hnswlib():
+    """Import hnswlib, which Chroma installs as the chroma-hnswlib package."""
+    try:
+        import hnswlib
+    except ImportError as e:
+        raise ImportError(
+            "Index tuning requires hnswlib, which is installed with chromadb. "
+            "Install it with `pip install chroma-hnswlib`."
+        ) from e
+    return hnswlib
+
+
+def load_embeddings(
+    vector_store: VectorStoreBackend,
+    max_chunks: Optional[int] = None,
+    batch_size: int = 1000
+) -> np.ndarray:
+    """
+    Read chunk embeddings from the vector store.
+
+    Args:
+        vector_store: Vector store holding the chunks
+        max_chunks: Maximum number of embeddings to read (None for all)
+        batch_size: Number of chunks read per call to the vector store
+
+    Returns:
+        Float32 array of shape (chunks, dimension)
+    """
+    embeddings = []
+    for chunk in vector_store.iter_chunks(batch_size=batch_size, include_embeddings=True):
+        embeddings.append(chunk["embedding"])
+        if max_chunks and len(embeddings) >= max_chunks:
+            break
+
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def _percentile_ms(seconds: List[float], percentile: float) -> float:
+    """Return a latency percentile in milliseconds."""
+    return float(np.percentile(seconds, percentile) * 1000.0)
+
+
+def exact_neighbors(corpus: np.ndarray, queries: np.ndarray, k: int) -> Tuple[np.ndarray, List[float]]:
+    """
+    Find the true nearest neighbours of each query by cosine similarity.
+
+    Args:
+        corpus: Embeddings searched, shape (chunks, dimension)
+        queries: Query embeddings, shape (queries, dimension)
+        k: Number of neighbours per query
+
+    Returns:
+        Tuple of the neighbour positions in corpus, shape (queries, k), and
+        the seconds each query took
+    """
+    corpus = corpus / np.maximum(np.linalg.norm(corpus, axis=1, keepdims=True), 1e-12)
+    neighbors = np.empty((len(queries), k), dtype=np.int64)
+    latencies = []
+
+    for i, query in enumerate(queries):
+        began = time.perf_counter()
+        similarities = corpus @ (query / max(np.linalg.norm(query), 1e-12))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        neighbors[i] = top[np.argsort(-similarities[top])]
+        latencies.append(time.perf_counter() - began)
+
+    return neighbors, latencies
+
+
+def evaluate_hnsw(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    M: int,
+    construction_ef: int,
+    search_efs: Sequence[int],
+    num_threads: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Build one HNSW index and measure recall and latency for several search_ef values.
+
+    The index is built with the same library and distance Chroma uses. Search
+    latency covers the index lookup only, one query at a time on one thread,
+    not the metadata and text Chroma fetches afterwards.
+
+    Args:
+        corpus: Embeddings indexed, shape (chunks, dimension)
+        queries: Query embeddings, shape (queries, dimension)
+        truth: Exact neighbours of each query, shape (queries, k)
+        M: Number of links per node
+        construction_ef: Size of the candidate list while building
+        search_efs: Sizes of the candidate list while searching
+        num_threads: Threads used to build the index
+
+    Returns:
+        One result per search_ef with the settings, "recall", "p50_ms",
+        "p99_ms" and "build_seconds"
+    """
+    hnswlib = _import_hnswlib()
+    k = truth.shape[1]
+    index = hnswlib.Index(space="cosine", dim=corpus.shape[1])
+
+    began = time.perf_counter()
+    index.init_index(max_elements=len(corpus), ef_construction=construction_ef, M=M)
+    index.set_num_threads(num_threads)
+    index.add_items(corpus, np.arange(len(corpus)))
+    build_seconds = time.perf_counter() - began
+
+    index.set_num_threads(1)
+    results = []
+    for search_ef in search_efs:
+        index.set_ef(search_ef)
+        latencies = []
+        hits = 0
+        for query, expected in zip(queries, truth):
+            began = time.perf_counter()
+            labels, _ = index.knn_query(query, k=k)
+            latencies.append(time.perf_counter() - began)
+            hits += len(np.intersect1d(labels[0], expected))
+
+        results.append({
+            "M": M,
+            "construction_ef": construction_ef,
+            "search_ef": search_ef,
+            "recall": hits / truth.size,
+            "p50_ms": _percentile_ms(latencies, 50),
+            "p99_ms": _percentile_ms(latencies, 99),
+            "build_seconds": build_seconds
+        })
+
+    return results
+
+
+def tune_index(
+    vector_store: VectorStoreBackend,
+    m_values: Sequence[int],
+    construction_ef_values: Sequence[int],
+    search_ef_values: Sequence[int],
+    k: int = 10,
+    num_queries: int = 200,
+    max_chunks: Optional[int] = None,
+    num_threads: int = 1,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Measure recall@k and search latency for candidate HNSW settings.
+
+    A random sample of the stored chunks is held out as queries; the rest
+    are indexed with each combination of settings and searched, and the
+    results are compared with exact search.
+
+    Args:
+        vector_store: Vector store whose embeddings are used
+        m_values: Values of M to try
+        construction_ef_values: Values of construction_ef to try
+        search_ef_values: Values of search_ef to try
+        k: Number of neighbours compared per query
+        num_queries: Number of chunks held out as queries
+        max_chunks: Maximum number of chunks read (None for all)
+        num_threads: Threads used to build each index
+        seed: Seed of the random query sample
+
+    Returns:
+        Dictionary with the number of "chunks" indexed, "queries" and "k",
+        the collection's "current" parameters, the "exact" search latency and
+        one entry in "results" per combination of settings
+    """
+    embeddings = load_embeddings(vector_store, max_chunks=max_chunks)
+    if len(embeddings) <= num_queries + k:
+        raise ValueError(f"Need more than {num_queries + k} chunks to tune the index, found {len(embeddings)}")
+
+    order = np.random.default_rng(seed).permutation(len(embeddings))
+    queries = embeddings[order[:num_queries]]
+    corpus = embeddings[order[num_queries:]]
+    truth, exact_latencies = exact_neighbors(corpus, queries, k)
+
+    results = []
+    for M, construction_ef in product(m_values, construction_ef_values):
+        results.extend(evaluate_hnsw(
+            corpus, queries, truth, M, construction_ef, search_ef_values, num_threads=num_threads
+        ))
+
+    return {
+        "chunks": len(corpus),
+        "queries": num_queries,
+        "k": k,
+        "current": vector_store.get_index_params(),
+        "exact": {
+            "p50_ms": _percentile_ms(exact_latencies, 50),
+            "p99_ms": _percentile_ms(exact_latencies, 99)
+        },
+        "results": results
+    }
+
+
+def _neighbor_ids(results: Dict, exclude_id: str, k: int) -> List[str]:
+    """Return the first k result IDs of a single query, leaving out exclude_id."""
+    return [doc_id for doc_id in results["ids"][0] if doc_id != exclude_id][:k]
+
+
+def _sample_chunks(
+    vector_store: VectorStoreBackend,
+    size: int,
+    max_chunks: Optional[int],
+    seed: int
+) -> Tuple[int, List[str], np.ndarray]:
+    """
+    Pick a uniform random sample of chunks in one pass over the vector store.
+
+    Reservoir sampling keeps only the sample in memory, however many chunks
+    are read.
+
+    Args:
+        vector_store: Vector store holding the chunks
+        size: Number of chunks to sample
+        max_chunks: Maximum number of chunks read (None for all)
+        seed: Seed of the random sample
+
+    Returns:
+        Tuple of the number of chunks read, the sampled chunk IDs and their
+        embeddings, shape (sampled, dimension)
+    """
+    rng = np.random.default_rng(seed)
+    ids: List[str] = []
+    embeddings: Optional[np.ndarray] = None
+    seen = 0
+    for chunk in vector_store.iter_chunks(include_embeddings=True):
+        if embeddings is None:
+            embeddings = np.empty((size, len(chunk["embedding"])), dtype=np.float32)
+        if seen < size:
+            slot = seen
+            ids.append(chunk["id"])
+        else:
+            slot = int(rng.integers(seen + 1))
+            if slot < size:
+                ids[slot] = chunk["id"]
+        if slot < size:
+            embeddings[slot] = chunk["embedding"]
+        seen += 1
+        if max_chunks and seen >= max_chunks:
+            break
+
+    if embeddings is None:
+        return 0, [], np.empty((0, 0), dtype=np.float32)
+    return seen, ids, embeddings[:len(ids)]
+
+
+def benchmark_two_stage(
+    vector_store: VectorStoreBackend,
+    centroid_index: PaperCentroidIndex,
+    paper_counts: Sequence[int],
+    k: int = 10,
+    num_queries: int = 200,
+    max_chunks: Optional[int] = None,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Measure recall@k and latency of two-stage retrieval for several paper counts.
+
+    A random sample of the stored chunks is used as queries. Each is
+    searched over all chunks, and then again with two-stage retrieval:
+    the closest papers are picked by centroid, and only their chunks are
+    searched. The chunk used as a query is left out of both result lists,
+    so finding itself does not count towards recall. Recall is relative to
+    the full search, whether that search is exact or approximate.
+
+    Args:
+        vector_store: Vector store holding the chunks
+        centroid_index: Centroid index of the same papers
+        paper_counts: Numbers of papers searched in the second stage to try
+        k: Number of neighbours compared per query
+        num_queries: Number of chunks used as queries
+        max_chunks: Maximum number of chunks the queries are sampled from
+            (None for all)
+        seed: Seed of the random query sample
+
+    Returns:
+        Dictionary with the number of "chunks" sampled from, "papers" with a
+        centroid, "queries" and "k", the "full" search latency and one entry
+        in "results" per paper count
+    """
+    papers = centroid_index.count()
+    if papers == 0:
+        raise ValueError("No paper centroids found; run backfill-centroids first")
+
+    chunks, query_ids, queries = _sample_chunks(vector_store, num_queries, max_chunks, seed)
+    if chunks < num_queries:
+        raise ValueError(f"Need at least {num_queries} chunks to benchmark, found {chunks}")
+
+    truth = []
+    full_latencies = []
+    for query_id, query in zip(query_ids, queries):
+        began = time.perf_counter()
+        results = vector_store.query(query, n_results=k + 1)
+        full_latencies.append(time.perf_counter() - began)
+        truth.append(_neighbor_ids(results, query_id, k))
+    expected_total = max(sum(len(expected) for expected in truth), 1)
+
+    results = []
+    for n_papers in paper_counts:
+        latencies = []
+        centroid_latencies = []
+        hits = 0
+        for query_id, query, expected in zip(query_ids, queries, truth):
+            began = time.perf_counter()
+            doc_id_bases = centroid_index.search(query, n_papers=n_papers)[0]
+            picked = time.perf_counter()
+            found = vector_store.query(query, n_results=k + 1, where={"doc_id_base": {"$in": doc_id_bases}})
+            latencies.append(time.perf_counter() - began)
+            centroid_latencies.append(picked - began)
+            hits += len(set(_neighbor_ids(found, query_id, k)) & set(expected))
+
+        results.append({
+            "papers": n_papers,
+            "recall": hits / expected_total,
+            "p50_ms": _percentile_ms(latencies, 50),
+            "p99_ms": _percentile_ms(latencies, 99),
+            "centroid_p50_ms": _percentile_ms(centroid_latencies, 50)
+        })
+
+    return {
+        "chunks": chunks,
+        "papers": papers,
+        "queries": num_queries,
+        "k": k,
+        "full": {
+            "p50_ms": _percentile_ms(full_latencies, 50),
+            "p99_ms": _percentile_ms(full_latencies, 99)
+        },
+        "results": results
+    }
@@ -0,0 +1,363 @@
+"""
+Ingestion job store module for PaperShelf.
+
+This module handles SQLite database operations for the durable table of
+background ingestion jobs, so queued and interrupted jobs survive a restart.
+"""
+
+import json
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from papershelf.db.sqlite import connect_sqlite
+from papershelf.utils.config import config
+
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Columns a worker may update while a job runs
+PROGRESS_FIELDS = (
+    "total_pages",
+    "pages_parsed",
+    "total_chunks",
+    "chunks_embedded",
+    "parsed_at",
+    "embedded_at"
+)
+
+
+class JobStore:
+    """Class for managing the ingestion job database."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the ingestion job database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path or config.JOB_DB_PATH
+        self._create_tables_if_not_exist()
+
+    def _create_tables_if_not_exist(self):
+        """Create the necessary tables if they don't exist."""
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ingestion_jobs (
+            job_id TEXT PRIMARY KEY,
+            state TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            original_filename TEXT,
+            content_hash TEXT,
+            total_pages INTEGER,
+            pages_parsed INTEGER DEFAULT 0,
+            total_chunks INTEGER,
+            chunks_embedded INTEGER DEFAULT 0,
+            attempts INTEGER DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            created_at REAL,
+            started_at REAL,
+            parsed_at REAL,
+            embedded_at REAL,
+            finished_at REAL,
+            claimed_by TEXT,
+            heartbeat_at REAL
+        )
+        ''')
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_state ON ingestion_jobs (state, created_at)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_content_hash ON ingestion_jobs (content_hash, state)"
+        )
+
+        # Databases created before jobs were leased lack the lease columns
+        columns = {row["name"] for row in cursor.execute("PRAGMA table_info(ingestion_jobs)")}
+        for column, column_type in (("claimed_by", "TEXT"), ("heartbeat_at", "REAL")):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE ingestion_jobs ADD COLUMN {column} {column_type}")
+
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        """
+        Convert a job row into the dictionary returned to callers.
+
+        Args:
+            row: Row from the ingestion_jobs table
+
+        Returns:
+            Dictionary with the job's state, progress, timings and result
+        """
+        def elapsed(start: Optional[float], end: Optional[float]) -> Optional[float]:
+            return end - start if start is not None and end is not None else None
+
+        return {
+            "job_id": row["job_id"],
+            "state": row["state"],
+            "file_path": row["file_path"],
+            "original_filename": row["original_filename"],
+            "content_hash": row["content_hash"],
+            "attempts": row["attempts"],
+            "claimed_by": row["claimed_by"],
+            "progress": {
+                "pages_parsed": row["pages_parsed"],
+                "total_pages": row["total_pages"],
+                "chunks_embedded": row["chunks_embedded"],
+                "total_chunks": row["total_chunks"]
+            },
+            "timings": {
+                "created_at": row["created_at"],
+                "started_at": row["started_at"],
+                "finished_at": row["finished_at"],
+                "queued_seconds": elapsed(row["created_at"], row["started_at"]),
+                "parse_seconds": elapsed(row["started_at"], row["parsed_at"]),
+                "embed_seconds": elapsed(row["parsed_at"], row["embedded_at"]),
+                "store_seconds": elapsed(row["embedded_at"], row["finished_at"]),
+                "total_seconds": elapsed(row["created_at"], row["finished_at"])
+            },
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"]
+        }
+
+    def create_job(self, file_path: str, original_filename: str, content_hash: Optional[str] = None) -> str:
+        """
+        Create a queued ingestion job.
+
+        Args:
+            file_path: Path of the uploaded PDF the job will ingest
+            original_filename: Filename the PDF was uploaded with
+            content_hash: SHA-256 hash of the PDF contents
+
+        Returns:
+            str: The UUID of the new job
+        """
+        job_id = str(uuid.uuid4())
+        conn = connect_sqlite(self.db_path)
+
+        conn.execute(
+            "INSERT INTO ingestion_jobs (job_id, state, file_path, original_filename, content_hash, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, file_path, original_filename, content_hash, time.time())
+        )
+
+        conn.commit()
+        conn.close()
+
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job by ID.
+
+        Args:
+            job_id: The job UUID
+
+        Returns:
+            Dictionary describing the job, or None if it does not exist
+        """
+        conn = connect_sqlite(self.db_path)
+        row = conn.execute("SELECT * FROM ingestion_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        conn.close()
+
+        return self._to_dict(row) if row else None
+
+    def find_active_job(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a queued or running job for the same file contents.
+
+        Args:
+            content_hash: SHA-256 hash of the PDF contents
+
+        Returns:
+            Dictionary describing the job, or None if there is none
+        """
+        conn = connect_sqlite(self.db_path)
+        row = conn.execute(
+            "SELECT * FROM ingestion_jobs WHERE content_hash = ? AND state IN (?, ?) "
+            "ORDER BY created_at LIMIT 1",
+            (content_hash, QUEUED, RUNNING)
+        ).fetchone()
+        conn.close()
+
+        return self._to_dict(row) if row else None
+
+    def claim_next_job(self, worker_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Atomically move the oldest queued job to the running state.
+
+        The claiming worker holds a lease on the job, which it keeps by
+        calling heartbeat; a job whose lease expires is requeued by
+        requeue_interrupted.
+
+        Args:
+            worker_id: ID of the claiming worker, recorded as the job's owner
+
+        Returns:
+            Dictionary describing the claimed job, or None if the queue is empty
+        """
+        conn = connect_sqlite(self.db_path)
+        try:
+            # Take the write lock before reading so two workers can't claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT job_id FROM ingestion_jobs WHERE state = ? ORDER BY created_at LIMIT 1",
+                (QUEUED,)
+            ).fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+
+            now = time.time()
+            conn.execute(
+                "UPDATE ingestion_jobs SET state = ?, started_at = ?, attempts = attempts + 1, "
+                "claimed_by = ?, heartbeat_at = ? WHERE job_id = ?",
+                (RUNNING, now, worker_id, now, row["job_id"])
+            )
+            conn.commit()
+            job = conn.execute("SELECT * FROM ingestion_jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+        finally:
+            conn.close()
+
+        return self._to_dict(job)
+
+    def update_progress(self, job_id: str, **fields: Any) -> None:
+        """
+        Record progress of a running job.
+
+        Args:
+            job_id: The job UUID
+            **fields: Values for any of the columns in PROGRESS_FIELDS
+        """
+        unknown = set(fields) - set(PROGRESS_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown progress fields: {sorted(unknown)}")
+        if not fields:
+            return
+
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        conn = connect_sqlite(self.db_path)
+        conn.execute(
+            f"UPDATE ingestion_jobs SET {assignments} WHERE job_id = ?",
+            (*fields.values(), job_id)
+        )
+        conn.commit()
+        conn.close()
+
+    def heartbeat(self, job_id: str, worker_id: Optional[str] = None) -> bool:
+        """
+        Renew the lease of a running job.
+
+        Args:
+            job_id: The job UUID
+            worker_id: ID of the worker that claimed the job
+
+        Returns:
+            True if the worker still holds the job, False if it was requeued
+            or claimed by another worker
+        """
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.execute(
+            "UPDATE ingestion_jobs SET heartbeat_at = ? WHERE job_id = ? AND state = ? AND claimed_by IS ?",
+            (time.time(), job_id, RUNNING, worker_id)
+        )
+        conn.commit()
+        conn.close()
+
+        return cursor.rowcount > 0
+
+    def complete_job(self, job_id: str, result: Dict[str, Any]) -> None:
+        """
+        Mark a job as completed.
+
+        Args:
+            job_id: The job UUID
+            result: Description of the ingested paper
+        """
+        self._finish(job_id, COMPLETED, result=json.dumps(result), error=None)
+
+    def fail_job(self, job_id: str, error: str) -> None:
+        """
+        Mark a job as failed.
+
+        Args:
+            job_id: The job UUID
+            error: Description of what went wrong
+        """
+        self._finish(job_id, FAILED, result=None, error=error)
+
+    def _finish(self, job_id: str, state: str, result: Optional[str], error: Optional[str]) -> None:
+        """Move a job to a terminal state."""
+        conn = connect_sqlite(self.db_path)
+        conn.execute(
+            "UPDATE ingestion_jobs SET state = ?, result = ?, error = ?, finished_at = ? WHERE job_id = ?",
+            (state, result, error, time.time(), job_id)
+        )
+        conn.commit()
+        conn.close()
+
+    def requeue_interrupted(self, lease_seconds: Optional[float] = None) -> int:
+        """
+        Requeue running jobs whose lease has expired.
+
+        A job's lease expires when its worker stops sending heartbeats, as
+        when the process running it stopped mid-ingestion; jobs still being
+        worked on by other processes are left alone. Their progress is reset
+        because a job restarts from the beginning.
+
+        Args:
+            lease_seconds: Seconds without a heartbeat after which a job's
+                lease expires (None for JOB_LEASE_SECONDS)
+
+        Returns:
+            Number of jobs requeued
+        """
+        if lease_seconds is None:
+            lease_seconds = config.JOB_LEASE_SECONDS
+
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.execute(
+            "UPDATE ingestion_jobs SET state = ?, started_at = NULL, parsed_at = NULL, embedded_at = NULL, "
+            "pages_parsed = 0, chunks_embedded = 0, claimed_by = NULL, heartbeat_at = NULL "
+            "WHERE state = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+            (QUEUED, RUNNING, time.time() - lease_seconds)
+        )
+        conn.commit()
+        conn.close()
+
+        return cursor.rowcount
+
+    def list_jobs(self, state: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        List the most recent jobs.
+
+        Args:
+            state: Only list jobs in this state (None for all states)
+            limit: Maximum number of jobs to return
+
+        Returns:
+            List of job dictionaries, newest first
+        """
+        conn = connect_sqlite(self.db_path)
+        if state is None:
+            rows = conn.execute(
+                "SELECT * FROM ingestion_jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT * FROM ingestion_jobs WHERE state = ? ORDER BY created_at DESC LIMIT ?", (state, limit)
+            ).fetchall()
+        conn.close()
+
+        return [self._to_dict(row) for row in rows]
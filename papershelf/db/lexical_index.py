@@ -0,0 +1,227 @@
+"""
+Lexical index module for PaperShelf.
+
+This module keeps a BM25 full-text index of chunk text in SQLite FTS5,
+built at ingest time alongside the vector database, so exact terms such as
+dataset names, equation labels and author names can be matched even when
+dense retrieval misses them.
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from papershelf.db.sqlite import connect_sqlite
+from papershelf.db.vector_backend import VectorStoreBackend
+from papershelf.utils.config import config
+
+
+# Terms of a query; everything else (quotes, operators, punctuation) is
+# dropped so user text can never be parsed as FTS5 query syntax
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class LexicalIndex:
+    """Class for managing the full-text index of chunk text."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the lexical index database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path or config.LEXICAL_INDEX_PATH
+        self._create_tables_if_not_exist()
+
+    def _create_tables_if_not_exist(self):
+        """Create the necessary tables if they don't exist."""
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS chunks (
+            rowid INTEGER PRIMARY KEY,
+            chunk_id TEXT UNIQUE NOT NULL,
+            doc_id_base TEXT,
+            chunk_index INTEGER,
+            text TEXT NOT NULL
+        )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chunks_doc_id_base ON chunks (doc_id_base)")
+
+        # The full-text index reads chunk text from the chunks table instead
+        # of storing a second copy; triggers keep the two in step
+        cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+            text,
+            content='chunks',
+            content_rowid='rowid',
+            tokenize='porter unicode61'
+        )
+        ''')
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS chunks_after_insert AFTER INSERT ON chunks BEGIN
+            INSERT INTO chunks_fts (rowid, text) VALUES (new.rowid, new.text);
+        END
+        ''')
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS chunks_after_delete AFTER DELETE ON chunks BEGIN
+            INSERT INTO chunks_fts (chunks_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+        END
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def add_chunks(
+        self,
+        document_ids: List[str],
+        texts: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> None:
+        """
+        Index the text of chunks, replacing any chunks with the same IDs.
+
+        Args:
+            document_ids: List of chunk IDs
+            texts: List of chunk texts
+            metadatas: List of chunk metadata dictionaries, from which
+                doc_id_base and chunk_index are stored
+        """
+        if len(document_ids) != len(texts):
+            raise ValueError("document_ids and texts must have the same length")
+        metadatas = metadatas or [{} for _ in document_ids]
+
+        conn = connect_sqlite(self.db_path)
+        with conn:
+            conn.executemany("DELETE FROM chunks WHERE chunk_id = ?", [(chunk_id,) for chunk_id in document_ids])
+            conn.executemany(
+                "INSERT INTO chunks (chunk_id, doc_id_base, chunk_index, text) VALUES (?, ?, ?, ?)",
+                [
+                    (chunk_id, (metadata or {}).get("doc_id_base"), (metadata or {}).get("chunk_index"), text)
+                    for chunk_id, text, metadata in zip(document_ids, texts, metadatas)
+                ]
+            )
+        conn.close()
+
+    @staticmethod
+    def build_match_query(query_text: str) -> Optional[str]:
+        """
+        Turn free text into an FTS5 query matching any of its terms.
+
+        Args:
+            query_text: The query text
+
+        Returns:
+            FTS5 MATCH expression, or None if the text has no searchable terms
+        """
+        terms = list(dict.fromkeys(term.lower() for term in _TERM_PATTERN.findall(query_text)))
+        if not terms:
+            return None
+        return " OR ".join(f'"{term}"' for term in terms)
+
+    def search(self, query_text: str, n_results: int = 5) -> Dict[str, List[List[Any]]]:
+        """
+        Find the chunks that best match a query by BM25.
+
+        Args:
+            query_text: The query text
+            n_results: Number of results to return
+
+        Returns:
+            Dictionary with "ids", "documents", "metadatas" and "scores" in the
+            nested-list layout of VectorStore.query; scores are BM25 scores
+            where higher is better
+        """
+        results: Dict[str, List[List[Any]]] = {"ids": [[]], "documents": [[]], "metadatas": [[]], "scores": [[]]}
+        match_query = self.build_match_query(query_text)
+        if match_query is None:
+            return results
+
+        conn = connect_sqlite(self.db_path)
+        rows = conn.execute(
+            "SELECT chunks.chunk_id, chunks.doc_id_base, chunks.chunk_index, chunks.text, "
+            "bm25(chunks_fts) AS rank FROM chunks_fts JOIN chunks ON chunks.rowid = chunks_fts.rowid "
+            "WHERE chunks_fts MATCH ? ORDER BY rank LIMIT ?",
+            (match_query, n_results)
+        ).fetchall()
+        conn.close()
+
+        for row in rows:
+            metadata = {}
+            if row["doc_id_base"] is not None:
+                metadata["doc_id_base"] = row["doc_id_base"]
+            if row["chunk_index"] is not None:
+                metadata["chunk_index"] = row["chunk_index"]
+
+            results["ids"][0].append(row["chunk_id"])
+            results["documents"][0].append(row["text"])
+            results["metadatas"][0].append(metadata)
+            # SQLite's bm25() is lower for better matches; flip it so higher is better
+            results["scores"][0].append(-row["rank"])
+
+        return results
+
+    def delete_paper(self, doc_id_base: str) -> int:
+        """
+        Remove all chunks of a paper from the index.
+
+        Args:
+            doc_id_base: Base ID shared by the paper's chunks
+
+        Returns:
+            Number of chunks removed
+        """
+        conn = connect_sqlite(self.db_path)
+        with conn:
+            cursor = conn.execute("DELETE FROM chunks WHERE doc_id_base = ?", (doc_id_base,))
+        conn.close()
+
+        return cursor.rowcount
+
+    def backfill_from_vector_store(self, vector_store: VectorStoreBackend, batch_size: int = 1000) -> int:
+        """
+        Index the text of every chunk in the vector store.
+
+        Chunks that are already indexed are replaced, so this can be rerun.
+
+        Args:
+            vector_store: Vector store holding the chunks
+            batch_size: Number of chunks read and indexed at a time
+
+        Returns:
+            Number of chunks indexed
+        """
+        indexed = 0
+        batch: List[Dict[str, Any]] = []
+        for chunk in vector_store.iter_chunks(batch_size=batch_size, include_documents=True):
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                indexed += self._add_batch(batch)
+                batch = []
+        if batch:
+            indexed += self._add_batch(batch)
+
+        return indexed
+
+    def _add_batch(self, chunks: List[Dict[str, Any]]) -> int:
+        """Index a batch of chunks read from the vector store."""
+        self.add_chunks(
+            document_ids=[chunk["id"] for chunk in chunks],
+            texts=[chunk["document"] or "" for chunk in chunks],
+            metadatas=[chunk["metadata"] for chunk in chunks]
+        )
+        return len(chunks)
+
+    def count(self) -> int:
+        """
+        Count the indexed chunks.
+
+        Returns:
+            Number of chunks in the index
+        """
+        conn = connect_sqlite(self.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        conn.close()
+
+        return count
@@ -0,0 +1,673 @@
+"""
+Memory-mapped NumPy vector store module for PaperShelf.
+
+This module provides an exact-search vector store for small and medium
+shelves. Normalized float32 embeddings live in a memory-mapped .npy file,
+so every process serving queries shares the same pages of the operating
+system's page cache, and a query is one matrix-vector product followed by
+a partial sort. Chunk IDs, texts and metadata live in SQLite next to it.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from papershelf.db.sqlite import connect_sqlite
+from papershelf.db.vector_backend import VectorStoreBackend, normalize_rows
+
+
+# File names inside the persist directory
+VECTORS_FILE = "vectors.npy"
+CHUNKS_DB_FILE = "chunks.db"
+
+# Rows allocated when the vectors file is first created
+INITIAL_CAPACITY = 1024
+
+
+class NumpyVectorStore(VectorStoreBackend):
+    """Class for exact search over a memory-mapped embedding matrix."""
+
+    def __init__(
+        self,
+        persist_directory: str = "./chroma_db",
+        write_batch_size: Optional[int] = None,
+        max_pending_writes: int = 4
+    ):
+        """
+        Initialize the vector store.
+
+        Args:
+            persist_directory: Directory holding the vectors file and chunk database
+            write_batch_size: Largest number of documents appended per batch
+                (None for 5000)
+            max_pending_writes: Number of background writes that may be queued
+                before add_documents(wait=False) blocks
+        """
+        super().__init__(write_batch_size or 5000, max_pending_writes)
+        self.persist_directory = persist_directory
+        self.vectors_path = os.path.join(persist_directory, VECTORS_FILE)
+        self.db_path = os.path.join(persist_directory, CHUNKS_DB_FILE)
+
+        # Create the directory if it doesn't exist
+        os.makedirs(persist_directory, exist_ok=True)
+        self._create_tables_if_not_exist()
+
+        # This process's read-only view of the vectors, refreshed when another
+        # writer (possibly another process) has changed them
+        self._view_lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._generation = -1
+        self._version = -1
+        self._rows = 0
+        self._live: np.ndarray = np.zeros(0, dtype=bool)
+
+    def _create_tables_if_not_exist(self):
+        """Create the necessary tables if they don't exist."""
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+
+        # Row numbers are positions in the vectors file; replaced and deleted
+        # chunks keep their row, marked deleted, until the store is compacted
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS chunks (
+            row INTEGER PRIMARY KEY,
+            chunk_id TEXT NOT NULL,
+            doc_id_base TEXT,
+            chunk_index INTEGER,
+            text TEXT,
+            metadata TEXT,
+            deleted INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_chunks_live_id ON chunks (chunk_id) WHERE deleted = 0"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chunks_doc_id_base ON chunks (doc_id_base) WHERE deleted = 0"
+        )
+
+        # rows: rows of the vectors file in use; generation: bumped when the
+        # file is replaced; version: bumped on every change
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS state (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        ''')
+        cursor.executemany(
+            "INSERT OR IGNORE INTO state (key, value) VALUES (?, ?)",
+            [("rows", 0), ("dimension", 0), ("generation", 0), ("version", 0)]
+        )
+
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _read_state(conn: sqlite3.Connection) -> Dict[str, int]:
+        """Read the state counters."""
+        return {row["key"]: row["value"] for row in conn.execute("SELECT key, value FROM state")}
+
+    @staticmethod
+    def _write_state(conn: sqlite3.Connection, **values: int) -> None:
+        """Update state counters inside the caller's transaction."""
+        conn.executemany("UPDATE state SET value = ? WHERE key = ?", [(value, key) for key, value in values.items()])
+
+    def _write_batches(
+        self,
+        document_ids: List[str],
+        embeddings: Union[List[List[float]], np.ndarray],
+        texts: List[str],
+        metadatas: Optional[List[Dict]]
+    ) -> None:
+        """Append documents in batches, recording each batch's latency."""
+        for start in range(0, len(document_ids), self.write_batch_size):
+            end = start + self.write_batch_size
+            began = time.perf_counter()
+            self._append(
+                document_ids[start:end],
+                np.asarray(embeddings[start:end], dtype=np.float32),
+                texts[start:end],
+                metadatas[start:end] if metadatas is not None else [None] * len(document_ids[start:end])
+            )
+            self._record_write(len(document_ids[start:end]), time.perf_counter() - began)
+
+    def _append(
+        self,
+        document_ids: List[str],
+        embeddings: np.ndarray,
+        texts: List[str],
+        metadatas: List[Optional[Dict]]
+    ) -> None:
+        """
+        Append one batch of documents, replacing documents with the same IDs.
+
+        The SQLite write lock is held from the first read of the state to
+        the commit, which serializes writers across processes. Vectors are
+        written past the committed rows first, so readers never see rows
+        whose chunk entries are not committed yet.
+        """
+        if embeddings.ndim != 2:
+            raise ValueError("embeddings must be two-dimensional")
+
+        conn = connect_sqlite(self.db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            state = self._read_state(conn)
+            dimension = state["dimension"] or embeddings.shape[1]
+            if embeddings.shape[1] != dimension:
+                raise ValueError(f"Expected embeddings of dimension {dimension}, got {embeddings.shape[1]}")
+
+            rows = state["rows"]
+            generation = state["generation"]
+            if self._capacity() < rows + len(document_ids):
+                self._grow(rows, rows + len(document_ids), dimension)
+                generation += 1
+
+            vectors = np.lib.format.open_memmap(self.vectors_path, mode="r+")
+            vectors[rows:rows + len(document_ids)] = normalize_rows(embeddings)
+            vectors.flush()
+            del vectors
+
+            # Replaced documents become tombstones; within a batch the last copy wins
+            conn.executemany(
+                "UPDATE chunks SET deleted = 1 WHERE chunk_id = ? AND deleted = 0",
+                [(chunk_id,) for chunk_id in set(document_ids)]
+            )
+            last_offset = {chunk_id: offset for offset, chunk_id in enumerate(document_ids)}
+            entries = []
+            for offset, (chunk_id, text, metadata) in enumerate(zip(document_ids, texts, metadatas)):
+                metadata = metadata or {}
+                entries.append((
+                    rows + offset,
+                    chunk_id,
+                    metadata.get("doc_id_base"),
+                    metadata.get("chunk_index"),
+                    text,
+                    json.dumps(metadata) if metadata else None,
+                    int(last_offset[chunk_id] != offset)
+                ))
+            conn.executemany(
+                "INSERT INTO chunks (row, chunk_id, doc_id_base, chunk_index, text, metadata, deleted) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                entries
+            )
+
+            self._write_state(
+                conn,
+                rows=rows + len(document_ids),
+                dimension=dimension,
+                generation=generation,
+                version=state["version"] + 1
+            )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _capacity(self) -> int:
+        """Return the number of rows the vectors file can hold."""
+        if not os.path.exists(self.vectors_path):
+            return 0
+        return np.load(self.vectors_path, mmap_mode="r").shape[0]
+
+    def _grow(self, rows: int, needed: int, dimension: int) -> None:
+        """
+        Replace the vectors file with a larger one holding the first rows.
+
+        The new file is written beside the old one and swapped in with a
+        rename, so processes still reading the old file keep a valid mapping.
+        """
+        capacity = max(INITIAL_CAPACITY, needed, 2 * self._capacity())
+        self._rewrite_vectors(capacity, dimension, np.arange(rows))
+
+    def _rewrite_vectors(self, capacity: int, dimension: int, keep_rows: np.ndarray) -> None:
+        """Write a new vectors file holding the given rows of the current one, in order."""
+        temp_path = f"{self.vectors_path}.tmp"
+        vectors = np.lib.format.open_memmap(temp_path, mode="w+", dtype=np.float32, shape=(capacity, dimension))
+        if len(keep_rows):
+            current = np.load(self.vectors_path, mmap_mode="r")
+            for start in range(0, len(keep_rows), 65536):
+                selected = keep_rows[start:start + 65536]
+                vectors[start:start + len(selected)] = current[selected]
+            del current
+        vectors.flush()
+        del vectors
+        os.replace(temp_path, self.vectors_path)
+
+    def _refresh(self) -> Tuple[Optional[np.ndarray], int, np.ndarray, int]:
+        """
+        Bring this process's view of the vectors up to date.
+
+        Returns:
+            Tuple of the mapped vectors (None if nothing was ever written),
+            the number of rows in use, the mask of live rows and the
+            generation the view belongs to
+        """
+        conn = connect_sqlite(self.db_path)
+        state = self._read_state(conn)
+
+        with self._view_lock:
+            if state["version"] != self._version:
+                if state["generation"] != self._generation or self._vectors is None:
+                    self._vectors = (
+                        np.load(self.vectors_path, mmap_mode="r") if os.path.exists(self.vectors_path) else None
+                    )
+                    self._generation = state["generation"]
+
+                live = np.ones(state["rows"], dtype=bool)
+                deleted = conn.execute("SELECT row FROM chunks WHERE deleted = 1 AND row < ?", (state["rows"],))
+                live[[row[0] for row in deleted]] = False
+                self._live = live
+                self._rows = state["rows"]
+                self._version = state["version"]
+            view = (self._vectors, self._rows, self._live, self._generation)
+
+        conn.close()
+        return view
+
+    @staticmethod
+    def _where_clause(where: Optional[Dict]) -> Tuple[str, List[Any]]:
+        """
+        Translate a Chroma-style filter into SQL over live chunks.
+
+        Supports {"key": value}, {"key": {"$eq": value}}, {"key": {"$in": [...]}}
+        and "$and" of those.
+
+        Args:
+            where: Filter condition (None for all chunks)
+
+        Returns:
+            Tuple of the WHERE clause and its parameters
+        """
+        conditions = ["deleted = 0"]
+        params: List[Any] = []
+
+        def add(filters: Dict) -> None:
+            for key, value in filters.items():
+                if key == "$and":
+                    for item in value:
+                        add(item)
+                    continue
+                values = [value]
+                if isinstance(value, dict):
+                    if set(value) == {"$eq"}:
+                        values = [value["$eq"]]
+                    elif set(value) == {"$in"} and value["$in"]:
+                        values = list(value["$in"])
+                    else:
+                        raise ValueError(f"Unsupported filter for the numpy backend: {value}")
+
+                placeholders = ", ".join("?" * len(values))
+                if key in ("doc_id_base", "chunk_index"):
+                    conditions.append(f"{key} IN ({placeholders})")
+                else:
+                    conditions.append(f"json_extract(metadata, ?) IN ({placeholders})")
+                    params.append(f'$."{key}"')
+                params.extend(values)
+
+        add(where or {})
+        return " AND ".join(conditions), params
+
+    @staticmethod
+    def _to_chunk(row: sqlite3.Row, include_documents: bool) -> Dict:
+        """Convert a chunk row into the dictionary returned to callers."""
+        chunk = {
+            "id": row["chunk_id"],
+            "metadata": json.loads(row["metadata"]) if row["metadata"] else {}
+        }
+        if include_documents:
+            chunk["document"] = row["text"]
+        return chunk
+
+    @staticmethod
+    def _begin_read(conn: sqlite3.Connection, generation: int) -> bool:
+        """
+        Start a read transaction if the store is still at the given generation.
+
+        Compaction renumbers rows and bumps the generation, so row numbers
+        taken from a view of an older generation can name other chunks.
+        Reads made in the transaction see the same snapshot as the check.
+
+        Returns:
+            True if the transaction was started, False if the generation changed
+        """
+        conn.execute("BEGIN")
+        current = conn.execute("SELECT value FROM state WHERE key = 'generation'").fetchone()[0]
+        if current != generation:
+            conn.rollback()
+            return False
+        return True
+
+    def query_batch(
+        self,
+        query_embeddings: Union[List[List[float]], np.ndarray],
+        n_results: int = 5,
+        where: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Find the exact nearest documents to each of several queries.
+
+        Scores every live row (or every row matching the filter) with one
+        matrix product and keeps the best n_results per query with a
+        partial sort. A query that overlaps a compaction by another process
+        is retried on the compacted rows.
+
+        Args:
+            query_embeddings: Embeddings of the queries, as a list or 2-D array
+            n_results: Number of results to return per query
+            where: Filter condition applied to every query
+
+        Returns:
+            Dictionary with "ids", "documents", "metadatas" and "distances"
+            (cosine distance), holding one list per query under each key
+        """
+        queries = normalize_rows(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        while True:
+            results = self._query_view(queries, n_results, where)
+            if results is not None:
+                return results
+
+    def _query_view(self, queries: np.ndarray, n_results: int, where: Optional[Dict]) -> Optional[Dict]:
+        """Run query_batch on the current view, or return None if it went stale."""
+        results: Dict[str, List[List[Any]]] = {
+            "ids": [[] for _ in queries],
+            "documents": [[] for _ in queries],
+            "metadatas": [[] for _ in queries],
+            "distances": [[] for _ in queries]
+        }
+
+        vectors, rows, live, generation = self._refresh()
+        if vectors is None or rows == 0:
+            return results
+
+        if where:
+            # Only the rows matching the filter are scored, so narrow filters
+            # (such as the papers picked by two-stage retrieval) cost less
+            clause, params = self._where_clause(where)
+            conn = connect_sqlite(self.db_path)
+            try:
+                if not self._begin_read(conn, generation):
+                    return None
+                matching = [
+                    row[0] for row in conn.execute(f"SELECT row FROM chunks WHERE {clause} ORDER BY row", params)
+                ]
+                conn.commit()
+            finally:
+                conn.close()
+            candidate_rows = np.array([row for row in matching if row < rows], dtype=np.int64)
+            candidate_rows = candidate_rows[live[candidate_rows]]
+            similarities = vectors[candidate_rows] @ queries.T
+        else:
+            candidate_rows = None
+            similarities = vectors[:rows] @ queries.T
+            similarities[~live] = -np.inf
+
+        k = min(n_results, int(live.sum()) if candidate_rows is None else len(candidate_rows))
+        if k == 0:
+            return results
+
+        top_rows = []
+        for column in similarities.T:
+            top = np.argpartition(-column, k - 1)[:k]
+            top = top[np.argsort(-column[top])]
+            top_rows.append((top if candidate_rows is None else candidate_rows[top], column[top]))
+
+        wanted = sorted({int(row) for top, _ in top_rows for row in top})
+        conn = connect_sqlite(self.db_path)
+        try:
+            if not self._begin_read(conn, generation):
+                return None
+            chunks = {
+                row["row"]: row
+                for row in conn.execute(
+                    f"SELECT row, chunk_id, text, metadata FROM chunks WHERE row IN ({', '.join('?' * len(wanted))})",
+                    wanted
+                )
+            }
+            conn.commit()
+        finally:
+            conn.close()
+
+        for i, (top, scores) in enumerate(top_rows):
+            for row, score in zip(top, scores):
+                # Rows are only renumbered by compaction, which the
+                # generation check above rules out, so every row is present
+                chunk = chunks[int(row)]
+                results["ids"][i].append(chunk["chunk_id"])
+                results["documents"][i].append(chunk["text"])
+                results["metadatas"][i].append(json.loads(chunk["metadata"]) if chunk["metadata"] else None)
+                results["distances"][i].append(float(1.0 - score))
+
+        return results
+
+    def get_document_by_id(self, document_id: str) -> Optional[Dict]:
+        """
+        Get a document by its ID.
+
+        Args:
+            document_id: ID of the document
+
+        Returns:
+            Document data or None if not found
+        """
+        conn = connect_sqlite(self.db_path)
+        row = conn.execute(
+            "SELECT chunk_id, text, metadata FROM chunks WHERE chunk_id = ? AND deleted = 0", (document_id,)
+        ).fetchone()
+        conn.close()
+
+        if row is None:
+            return None
+        chunk = self._to_chunk(row, include_documents=True)
+        return {"id": chunk["id"], "document": chunk["document"], "metadata": chunk["metadata"]}
+
+    def find_paper_by_hash(self, content_hash: str) -> Optional[Dict]:
+        """
+        Find a paper whose chunks carry the hash of its file contents.
+
+        Chunks written to this backend never carry the hash, which lives in
+        the paper store, so there is nothing to find.
+
+        Args:
+            content_hash: SHA-256 hex digest of the paper's PDF file
+
+        Returns:
+            None
+        """
+        return None
+
+    def get_paper_chunks(self, doc_id_base: str, include_documents: bool = True) -> List[Dict]:
+        """
+        Get all chunks of a paper.
+
+        Args:
+            doc_id_base: Base ID shared by the paper's chunks
+            include_documents: Whether to include the chunk texts
+
+        Returns:
+            List of dictionaries with the "id", "metadata" and (optionally)
+            "document" of each chunk, in chunk order
+        """
+        conn = connect_sqlite(self.db_path)
+        rows = conn.execute(
+            "SELECT chunk_id, text, metadata FROM chunks WHERE doc_id_base = ? AND deleted = 0 "
+            "ORDER BY chunk_index",
+            (doc_id_base,)
+        ).fetchall()
+        conn.close()
+
+        return [self._to_chunk(row, include_documents) for row in rows]
+
+    def iter_chunks(
+        self,
+        where: Optional[Dict] = None,
+        batch_size: int = 1000,
+        include_documents: bool = False,
+        include_embeddings: bool = False
+    ) -> Iterator[Dict]:
+        """
+        Iterate over the chunks matching a filter, a page at a time.
+
+        Args:
+            where: Filter condition (None for all chunks)
+            batch_size: Number of chunks read per query
+            include_documents: Whether to include the chunk texts
+            include_embeddings: Whether to include the chunk embeddings,
+                which are stored normalized to unit length
+
+        Yields:
+            Dictionary with the "id", "metadata" and (optionally) "document"
+            and "embedding" of each chunk
+        """
+        clause, params = self._where_clause(where)
+        vectors = self._refresh()[0] if include_embeddings else None
+        last_row = -1
+        while True:
+            conn = connect_sqlite(self.db_path)
+            rows = conn.execute(
+                f"SELECT row, chunk_id, text, metadata FROM chunks WHERE {clause} AND row > ? ORDER BY row LIMIT ?",
+                (*params, last_row, batch_size)
+            ).fetchall()
+            conn.close()
+
+            for row in rows:
+                chunk = self._to_chunk(row, include_documents)
+                if include_embeddings:
+                    chunk["embedding"] = vectors[row["row"]].tolist()
+                yield chunk
+            if len(rows) < batch_size:
+                return
+            last_row = rows[-1]["row"]
+
+    def _delete_where(self, clause: str, params: List[Any]) -> int:
+        """Mark the live chunks matching a condition as deleted."""
+        conn = connect_sqlite(self.db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            deleted = conn.execute(f"UPDATE chunks SET deleted = 1 WHERE deleted = 0 AND {clause}", params).rowcount
+            if deleted:
+                self._write_state(conn, version=self._read_state(conn)["version"] + 1)
+            conn.commit()
+        finally:
+            conn.close()
+
+        return deleted
+
+    def delete_paper(self, doc_id_base: str) -> int:
+        """
+        Delete all chunks of a paper.
+
+        Args:
+            doc_id_base: Base ID shared by the paper's chunks
+
+        Returns:
+            Number of chunks deleted (0 if the paper does not exist)
+        """
+        return self._delete_where("doc_id_base = ?", [doc_id_base])
+
+    def delete_document(self, document_id: str) -> bool:
+        """
+        Delete a document from the vector store.
+
+        Args:
+            document_id: ID of the document to delete
+
+        Returns:
+            True if the document existed and was deleted, False otherwise
+        """
+        return self._delete_where("chunk_id = ?", [document_id]) > 0
+
+    def compact(self) -> int:
+        """
+        Drop deleted and replaced rows from the vectors file.
+
+        Live rows are renumbered in order into a new file that replaces the
+        old one, and the generation is bumped; other processes pick it up on
+        their next query, and queries that were running are retried.
+
+        Returns:
+            Number of rows removed
+        """
+        self.flush()
+        conn = connect_sqlite(self.db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            state = self._read_state(conn)
+            live_rows = np.array(
+                [row[0] for row in conn.execute("SELECT row FROM chunks WHERE deleted = 0 ORDER BY row")],
+                dtype=np.int64
+            )
+            removed = state["rows"] - len(live_rows)
+            if removed == 0:
+                conn.rollback()
+                return 0
+
+            conn.execute("DELETE FROM chunks WHERE deleted = 1")
+            # Rows only move down, in order, so renumbering never collides
+            conn.executemany(
+                "UPDATE chunks SET row = ? WHERE row = ?",
+                [(new_row, int(old_row)) for new_row, old_row in enumerate(live_rows)]
+            )
+            self._write_state(
+                conn,
+                rows=len(live_rows),
+                generation=state["generation"] + 1,
+                version=state["version"] + 1
+            )
+            # The renumbered file goes in place just before the renumbering
+            # commits, keeping the window where the two disagree short
+            self._rewrite_vectors(max(INITIAL_CAPACITY, len(live_rows)), state["dimension"], live_rows)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        return removed
+
+    def get_index_params(self) -> Dict[str, Any]:
+        """
+        Get the parameters of the search index.
+
+        Returns:
+            Dictionary with the distance "space" and the "search" method
+        """
+        return {"space": "cosine", "search": "exact"}
+
+    def get_collection_stats(self) -> Dict:
+        """
+        Get statistics about the stored documents.
+
+        Returns:
+            Dictionary with the number of live documents, rows in use and
+            tombstones, the vectors file, and the write statistics
+        """
+        _, rows, live, _ = self._refresh()
+        count = int(live.sum())
+        return {
+            "count": count,
+            "backend": "numpy",
+            "rows": rows,
+            "tombstones": rows - count,
+            "capacity": self._capacity(),
+            "vectors_path": self.vectors_path,
+            "persist_directory": self.persist_directory,
+            "index": self.get_index_params(),
+            "writes": self.get_write_stats()
+        }
+
+    def close(self) -> None:
+        """Wait for background writes and release the mapped vectors."""
+        super().close()
+        with self._view_lock:
+            self._vectors = None
+            self._version = -1
+            self._generation = -1
@@ -0,0 +1,365 @@
+"""
+Paper metadata store module for PaperShelf.
+
+This module handles SQLite database operations for paper-level metadata,
+which is stored once per paper instead of being copied into every chunk
+in the vector database.
+"""
+
+import base64
+import json
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+from papershelf.db.sqlite import connect_sqlite
+from papershelf.db.vector_backend import VectorStoreBackend
+from papershelf.utils.config import config
+
+
+# Text metadata columns, as extracted from the PDF
+TEXT_FIELDS = (
+    "title",
+    "author",
+    "subject",
+    "keywords",
+    "creator",
+    "producer",
+    "file_path",
+    "original_filename"
+)
+
+# Sort orders of the catalog, each backed by an index on (expression, doc_id_base)
+SORT_EXPRESSIONS = {
+    "created_at": "created_at",
+    "title": "title COLLATE NOCASE",
+    "author": "author COLLATE NOCASE"
+}
+
+
+class PaperStore:
+    """Class for managing the paper metadata database."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the paper metadata database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path or config.PAPER_DB_PATH
+        self._create_tables_if_not_exist()
+
+    def _create_tables_if_not_exist(self):
+        """Create the necessary tables if they don't exist."""
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS papers (
+            doc_id_base TEXT PRIMARY KEY,
+            content_hash TEXT,
+            title TEXT,
+            author TEXT,
+            subject TEXT,
+            keywords TEXT,
+            creator TEXT,
+            producer TEXT,
+            file_path TEXT,
+            original_filename TEXT,
+            page_count INTEGER,
+            total_chunks INTEGER,
+            created_at REAL
+        )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_papers_content_hash ON papers (content_hash)")
+        for sort_by, expression in SORT_EXPRESSIONS.items():
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_papers_{sort_by} ON papers ({expression}, doc_id_base)"
+            )
+
+        # Bumped on every change so readers can tell when the catalog changed
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS state (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO state (key, value) VALUES ('version', 0)")
+
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        """
+        Convert a paper row into the metadata dictionary returned to callers.
+
+        Args:
+            row: Row from the papers table
+
+        Returns:
+            Dictionary with the paper's metadata
+        """
+        return {key: row[key] for key in row.keys()}
+
+    def add_paper(
+        self,
+        doc_id_base: str,
+        metadata: Dict[str, Any],
+        content_hash: Optional[str] = None,
+        total_chunks: int = 0
+    ) -> None:
+        """
+        Store the metadata of a paper, replacing any earlier entry for it.
+
+        Args:
+            doc_id_base: ID shared by all chunks of the paper
+            metadata: Metadata of the paper, as extracted from the PDF
+            content_hash: SHA-256 hash of the PDF contents
+            total_chunks: Number of chunks in the paper
+        """
+        # Missing values are stored as empty strings so every row has a sort key
+        text_values = [
+            str(metadata[field]) if metadata.get(field) is not None else ""
+            for field in TEXT_FIELDS
+        ]
+        conn = connect_sqlite(self.db_path)
+
+        conn.execute(
+            f"INSERT OR REPLACE INTO papers (doc_id_base, content_hash, {', '.join(TEXT_FIELDS)}, "
+            f"page_count, total_chunks, created_at) VALUES ({', '.join('?' * (len(TEXT_FIELDS) + 5))})",
+            (
+                doc_id_base,
+                content_hash,
+                *text_values,
+                int(metadata.get("page_count") or 0),
+                total_chunks,
+                time.time()
+            )
+        )
+        conn.execute("UPDATE state SET value = value + 1 WHERE key = 'version'")
+
+        conn.commit()
+        conn.close()
+
+    def get_paper(self, doc_id_base: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the metadata of a paper.
+
+        Args:
+            doc_id_base: ID shared by all chunks of the paper
+
+        Returns:
+            Dictionary with the paper's metadata, or None if it does not exist
+        """
+        conn = connect_sqlite(self.db_path)
+        row = conn.execute("SELECT * FROM papers WHERE doc_id_base = ?", (doc_id_base,)).fetchone()
+        conn.close()
+
+        return self._to_dict(row) if row else None
+
+    def get_papers(self, doc_id_bases: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the metadata of several papers with one query.
+
+        Args:
+            doc_id_bases: IDs of the papers
+
+        Returns:
+            Dictionary mapping each ID that exists to the paper's metadata
+        """
+        if not doc_id_bases:
+            return {}
+
+        conn = connect_sqlite(self.db_path)
+        rows = conn.execute(
+            f"SELECT * FROM papers WHERE doc_id_base IN ({', '.join('?' * len(doc_id_bases))})",
+            list(doc_id_bases)
+        ).fetchall()
+        conn.close()
+
+        return {row["doc_id_base"]: self._to_dict(row) for row in rows}
+
+    def list_papers(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        sort_by: str = "created_at",
+        descending: bool = False,
+        title: Optional[str] = None,
+        author: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List papers one page at a time.
+
+        Pages are found by seeking past the last paper of the previous page
+        (keyset pagination) through the index of the sort order, so each page
+        costs the same however deep into the catalog it is.
+
+        Args:
+            limit: Maximum number of papers to return
+            cursor: Cursor returned with the previous page (None for the first page)
+            sort_by: Sort order, one of "created_at", "title" or "author"
+            descending: Whether to sort in descending order
+            title: Only list papers whose title contains this text (case-insensitive)
+            author: Only list papers whose author contains this text (case-insensitive)
+
+        Returns:
+            Dictionary with the "papers" on this page and the "next_cursor"
+            (None on the last page)
+        """
+        if sort_by not in SORT_EXPRESSIONS:
+            raise ValueError(f"Unknown sort order: {sort_by}")
+        expression = SORT_EXPRESSIONS[sort_by]
+        direction = "DESC" if descending else "ASC"
+
+        conditions = []
+        params: List[Any] = []
+        for column, text in (("title", title), ("author", author)):
+            if text:
+                conditions.append(f"{column} LIKE ? ESCAPE '\\'")
+                params.append(f"%{self._escape_like(text)}%")
+        if cursor:
+            last_value, last_id = self._decode_cursor(cursor)
+            # Spelled out rather than as a row value so SQLite seeks the index
+            after, at_or_after = ("<", "<=") if descending else (">", ">=")
+            conditions.append(
+                f"{expression} {at_or_after} ? AND ({expression} {after} ? OR doc_id_base {after} ?)"
+            )
+            params.extend([last_value, last_value, last_id])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        conn = connect_sqlite(self.db_path)
+        rows = conn.execute(
+            f"SELECT * FROM papers {where} ORDER BY {expression} {direction}, doc_id_base {direction} LIMIT ?",
+            (*params, limit + 1)
+        ).fetchall()
+        conn.close()
+
+        papers = [self._to_dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = papers[-1]
+            next_cursor = self._encode_cursor(last[sort_by], last["doc_id_base"])
+
+        return {"papers": papers, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _escape_like(text: str) -> str:
+        """Escape the LIKE wildcards in user-supplied text."""
+        return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    @staticmethod
+    def _encode_cursor(value: Any, doc_id_base: str) -> str:
+        """Encode the sort key of the last paper on a page as an opaque cursor."""
+        return base64.urlsafe_b64encode(json.dumps([value, doc_id_base]).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> List[Any]:
+        """Decode a cursor created by _encode_cursor."""
+        try:
+            value, doc_id_base = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        return [value, doc_id_base]
+
+    def count_papers(self) -> int:
+        """
+        Count the papers in the catalog.
+
+        Returns:
+            Number of papers
+        """
+        conn = connect_sqlite(self.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+        conn.close()
+
+        return count
+
+    def get_version(self) -> int:
+        """
+        Get the version of the catalog, which changes whenever a paper is added or deleted.
+
+        Returns:
+            Version counter of the catalog
+        """
+        conn = connect_sqlite(self.db_path)
+        version = conn.execute("SELECT value FROM state WHERE key = 'version'").fetchone()[0]
+        conn.close()
+
+        return version
+
+    def backfill_from_vector_store(self, vector_store: VectorStoreBackend, batch_size: int = 1000) -> int:
+        """
+        Add papers that were ingested with their metadata copied onto every chunk.
+
+        Reads the metadata of each paper's first chunk; papers already in the
+        catalog are left as they are.
+
+        Args:
+            vector_store: Vector store holding the chunks
+            batch_size: Number of chunks read per call to the vector store
+
+        Returns:
+            Number of papers added
+        """
+        added = 0
+        for chunk in vector_store.iter_chunks(where={"chunk_index": 0}, batch_size=batch_size):
+            metadata = chunk["metadata"]
+            doc_id_base = metadata.get("doc_id_base")
+            if not doc_id_base or "title" not in metadata or self.get_paper(doc_id_base):
+                continue
+            self.add_paper(
+                doc_id_base,
+                metadata,
+                content_hash=metadata.get("content_hash"),
+                total_chunks=int(metadata.get("total_chunks") or 0)
+            )
+            added += 1
+
+        return added
+
+    def find_paper_by_hash(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a previously ingested paper by the hash of its file contents.
+
+        Args:
+            content_hash: SHA-256 hex digest of the paper's PDF file
+
+        Returns:
+            Dictionary with the paper's doc_id_base and metadata, or None if
+            no paper with this hash exists
+        """
+        conn = connect_sqlite(self.db_path)
+        row = conn.execute(
+            "SELECT * FROM papers WHERE content_hash = ? ORDER BY created_at LIMIT 1", (content_hash,)
+        ).fetchone()
+        conn.close()
+
+        if row is None:
+            return None
+
+        return {
+            "doc_id_base": row["doc_id_base"],
+            "metadata": self._to_dict(row)
+        }
+
+    def delete_paper(self, doc_id_base: str) -> bool:
+        """
+        Delete the metadata of a paper.
+
+        Args:
+            doc_id_base: ID shared by all chunks of the paper
+
+        Returns:
+            True if the paper existed and was deleted, False otherwise
+        """
+        conn = connect_sqlite(self.db_path)
+        cursor = conn.execute("DELETE FROM papers WHERE doc_id_base = ?", (doc_id_base,))
+        if cursor.rowcount:
+            conn.execute("UPDATE state SET value = value + 1 WHERE key = 'version'")
+        conn.commit()
+        conn.close()
+
+        return cursor.rowcount > 0
@@ -0,0 +1,23 @@
+"""
+SQLite helpers for PaperShelf.
+
+This module opens the connections used by the SQLite-backed stores, which
+share their database files between threads and processes.
+"""
+
+import sqlite3
+
+
+def connect_sqlite(path: str) -> sqlite3.Connection:
+    """
+    Open a connection that waits for other writers instead of failing.
+
+    Args:
+        path: Path to the SQLite database file
+
+    Returns:
+        Connection returning rows as sqlite3.Row
+    """
+    conn = sqlite3.connect(path, timeout=30.0)
+    conn.row_factory = sqlite3.Row
+    return conn
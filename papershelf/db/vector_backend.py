@@ -0,0 +1,385 @@
+"""
+Vector store backend module for PaperShelf.
+
+This module defines the interface every vector store backend implements,
+along with the write batching, background writer, write statistics and
+vector normalization they share, and creates the backend selected in the
+configuration.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
+
+import numpy as np
+
+
+# Number of recent write batches kept for latency percentiles
+WRITE_LATENCY_WINDOW = 1000
+
+# Vector store backends that can be selected
+VECTOR_BACKENDS = ("chroma", "numpy")
+
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Scale each row to unit length so dot products are cosine similarities.
+
+    Args:
+        embeddings: 2-D array with one embedding per row
+
+    Returns:
+        Array of the same shape; all-zero rows stay zero
+    """
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+class VectorStoreBackend(ABC):
+    """Interface of the vector database, shared by all backends."""
+
+    def __init__(self, write_batch_size: int, max_pending_writes: int = 4):
+        """
+        Initialize the shared write state.
+
+        Args:
+            write_batch_size: Largest number of documents written per batch
+            max_pending_writes: Number of background writes that may be queued
+                before add_documents(wait=False) blocks
+        """
+        self.write_batch_size = write_batch_size
+        self.max_pending_writes = max_pending_writes
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._writer_lock = threading.Lock()
+        self._pending_writes = threading.BoundedSemaphore(max_pending_writes)
+        self._pending: Set[Future] = set()
+
+        self._stats_lock = threading.Lock()
+        self._write_latencies: deque = deque(maxlen=WRITE_LATENCY_WINDOW)
+        self._write_stats = {
+            "batches": 0,
+            "documents": 0,
+            "total_seconds": 0.0,
+            "max_batch_seconds": 0.0
+        }
+
+    def add_documents(
+        self,
+        document_ids: List[str],
+        embeddings: Union[List[List[float]], np.ndarray],
+        texts: List[str],
+        metadatas: Optional[List[Dict]] = None,
+        wait: bool = True
+    ) -> Optional[Future]:
+        """
+        Add documents to the vector store.
+
+        Documents are written in batches of at most write_batch_size, and
+        existing IDs are overwritten, so retrying a partly written paper with
+        the same IDs neither fails nor duplicates chunks.
+
+        Args:
+            document_ids: List of document IDs
+            embeddings: List of embeddings, or a float32 array with one row per document
+            texts: List of text chunks
+            metadatas: List of metadata dictionaries
+            wait: Whether to return once the documents are written; if False
+                they are written by a background thread, in call order
+
+        Returns:
+            None, or with wait=False a Future that completes when the documents
+            are written (and raises the write error, if any)
+        """
+        if len(document_ids) != len(embeddings) or len(document_ids) != len(texts):
+            raise ValueError("document_ids, embeddings, and texts must have the same length")
+        if metadatas is not None and len(metadatas) != len(document_ids):
+            raise ValueError("metadatas must have the same length as document_ids")
+
+        if wait:
+            self._write_batches(document_ids, embeddings, texts, metadatas)
+            return None
+
+        # Bound the queued writes so a fast producer cannot buffer unbounded embeddings
+        self._pending_writes.acquire()
+        try:
+            future = self._get_writer().submit(self._write_batches, document_ids, embeddings, texts, metadatas)
+        except BaseException:
+            self._pending_writes.release()
+            raise
+        with self._writer_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._write_done)
+        return future
+
+    @abstractmethod
+    def _write_batches(
+        self,
+        document_ids: List[str],
+        embeddings: Union[List[List[float]], np.ndarray],
+        texts: List[str],
+        metadatas: Optional[List[Dict]]
+    ) -> None:
+        """Upsert documents in batches of write_batch_size, recording each with _record_write."""
+
+    def _record_write(self, documents: int, seconds: float) -> None:
+        """Add a written batch to the write statistics."""
+        with self._stats_lock:
+            self._write_stats["batches"] += 1
+            self._write_stats["documents"] += documents
+            self._write_stats["total_seconds"] += seconds
+            self._write_stats["max_batch_seconds"] = max(self._write_stats["max_batch_seconds"], seconds)
+            self._write_latencies.append(seconds)
+
+    def _get_writer(self) -> ThreadPoolExecutor:
+        """Return the background writer, creating it on first use."""
+        with self._writer_lock:
+            if self._writer is None:
+                # A single thread keeps background writes in call order
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-store-writer")
+            return self._writer
+
+    def _write_done(self, future: Future) -> None:
+        """Release the slot of a finished background write."""
+        with self._writer_lock:
+            self._pending.discard(future)
+        self._pending_writes.release()
+
+    def flush(self) -> None:
+        """
+        Wait for all background writes to finish.
+
+        Raises the error of the first failed write, if any.
+        """
+        with self._writer_lock:
+            pending = list(self._pending)
+        for future in pending:
+            future.result()
+
+    def close(self) -> None:
+        """Wait for background writes and stop the writer thread."""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.shutdown(wait=True)
+
+    def get_write_stats(self) -> Dict:
+        """
+        Get latency statistics of the batches written so far.
+
+        Returns:
+            Dictionary with the number of batches and documents written, the
+            batch size, total and mean write time, and the p50, p95 and
+            maximum batch latency in milliseconds (percentiles cover the
+            most recent batches)
+        """
+        with self._stats_lock:
+            stats = dict(self._write_stats)
+            latencies = list(self._write_latencies)
+        with self._writer_lock:
+            pending = len(self._pending)
+
+        total_seconds = stats.pop("total_seconds")
+        max_batch_seconds = stats.pop("max_batch_seconds")
+        p50, p95 = np.percentile(latencies, [50, 95]) if latencies else (0.0, 0.0)
+        return {
+            **stats,
+            "write_batch_size": self.write_batch_size,
+            "pending_writes": pending,
+            "total_seconds": total_seconds,
+            "mean_batch_ms": total_seconds * 1000 / stats["batches"] if stats["batches"] else 0.0,
+            "p50_batch_ms": float(p50) * 1000,
+            "p95_batch_ms": float(p95) * 1000,
+            "max_batch_ms": max_batch_seconds * 1000
+        }
+
+    def query(
+        self,
+        query_embedding: Union[List[float], np.ndarray],
+        n_results: int = 5,
+        where: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Query the vector store for similar documents.
+
+        Args:
+            query_embedding: Embedding of the query, as a list or 1-D array
+            n_results: Number of results to return
+            where: Filter condition
+
+        Returns:
+            Dictionary with query results
+        """
+        return self.query_batch(np.atleast_2d(query_embedding), n_results=n_results, where=where)
+
+    @abstractmethod
+    def query_batch(
+        self,
+        query_embeddings: Union[List[List[float]], np.ndarray],
+        n_results: int = 5,
+        where: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Query the vector store for documents similar to each of several queries.
+
+        Args:
+            query_embeddings: Embeddings of the queries, as a list or 2-D array
+            n_results: Number of results to return per query
+            where: Filter condition applied to every query
+
+        Returns:
+            Dictionary with "ids", "documents", "metadatas" and "distances"
+            (cosine distance), holding one list per query under each key in
+            the order of query_embeddings
+        """
+
+    @abstractmethod
+    def get_document_by_id(self, document_id: str) -> Optional[Dict]:
+        """
+        Get a document by its ID.
+
+        Args:
+            document_id: ID of the document
+
+        Returns:
+            Dictionary with the "id", "document" and "metadata" of the
+            document, or None if not found
+        """
+
+    @abstractmethod
+    def find_paper_by_hash(self, content_hash: str) -> Optional[Dict]:
+        """
+        Find a paper whose chunks carry the hash of its file contents.
+
+        Only papers ingested before metadata was kept in the paper store
+        carry the hash on their chunks.
+
+        Args:
+            content_hash: SHA-256 hex digest of the paper's PDF file
+
+        Returns:
+            Dictionary with the paper's doc_id_base and the metadata of one of
+            its chunks, or None if no paper with this hash exists
+        """
+
+    @abstractmethod
+    def get_paper_chunks(self, doc_id_base: str, include_documents: bool = True) -> List[Dict]:
+        """
+        Get all chunks of a paper.
+
+        Args:
+            doc_id_base: Base ID shared by the paper's chunks
+            include_documents: Whether to include the chunk texts
+
+        Returns:
+            List of dictionaries with the "id", "metadata" and (optionally)
+            "document" of each chunk, in chunk order
+        """
+
+    @abstractmethod
+    def iter_chunks(
+        self,
+        where: Optional[Dict] = None,
+        batch_size: int = 1000,
+        include_documents: bool = False,
+        include_embeddings: bool = False
+    ) -> Iterator[Dict]:
+        """
+        Iterate over the chunks matching a filter, a page at a time.
+
+        Args:
+            where: Filter condition (None for all chunks)
+            batch_size: Number of chunks fetched at a time
+            include_documents: Whether to include the chunk texts
+            include_embeddings: Whether to include the chunk embeddings
+
+        Yields:
+            Dictionary with the "id", "metadata" and (optionally) "document"
+            and "embedding" of each chunk
+        """
+
+    @abstractmethod
+    def delete_paper(self, doc_id_base: str) -> int:
+        """
+        Delete all chunks of a paper.
+
+        Args:
+            doc_id_base: Base ID shared by the paper's chunks
+
+        Returns:
+            Number of chunks deleted (0 if the paper does not exist)
+        """
+
+    @abstractmethod
+    def delete_document(self, document_id: str) -> bool:
+        """
+        Delete a document from the vector store.
+
+        Args:
+            document_id: ID of the document to delete
+
+        Returns:
+            True if the document existed and was deleted, False otherwise
+        """
+
+    @abstractmethod
+    def get_index_params(self) -> Dict[str, Any]:
+        """
+        Get the parameters of the search index.
+
+        Returns:
+            Dictionary describing how the index searches
+        """
+
+    @abstractmethod
+    def get_collection_stats(self) -> Dict:
+        """
+        Get statistics about the stored documents.
+
+        Returns:
+            Dictionary with at least the "count" of documents, the "index"
+            parameters and the "writes" statistics
+        """
+
+
+def create_vector_store(
+    backend: str = "chroma",
+    persist_directory: str = "./chroma_db",
+    write_batch_size: Optional[int] = None,
+    max_pending_writes: int = 4,
+    hnsw_params: Optional[Dict[str, int]] = None
+) -> VectorStoreBackend:
+    """
+    Create a vector store with the given backend.
+
+    Args:
+        backend: "chroma" (approximate HNSW search in ChromaDB) or "numpy"
+            (exact search over a memory-mapped embedding matrix)
+        persist_directory: Directory to persist the database
+        write_batch_size: Largest number of documents written per batch (None
+            for the backend's default)
+        max_pending_writes: Number of background writes that may be queued
+        hnsw_params: HNSW index parameters, used by the chroma backend only
+
+    Returns:
+        The vector store
+    """
+    if backend == "chroma":
+        from papershelf.db.vector_store import VectorStore
+
+        return VectorStore(
+            persist_directory=persist_directory,
+            write_batch_size=write_batch_size,
+            max_pending_writes=max_pending_writes,
+            hnsw_params=hnsw_params
+        )
+    if backend == "numpy":
+        from papershelf.db.numpy_vector_store import NumpyVectorStore
+
+        return NumpyVectorStore(
+            persist_directory=persist_directory,
+            write_batch_size=write_batch_size,
+            max_pending_writes=max_pending_writes
+        )
+    raise ValueError(f"Unknown vector store backend: {backend}")
@@ -6,23 +6,55 @@ using ChromaDB as the vector database.
 """
 
 import os
-from typing import Dict, List, Optional, Union
+import time
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings
 
+from papershelf.db.vector_backend import VectorStoreBackend
 
-class VectorStore:
-    """Class for managing the vector database."""
+# Name of the collection holding the paper chunks
+COLLECTION_NAME = "academic_papers"
 
-    def __init__(self, persist_directory: str = "./chroma_db"):
+# Collections used by rebuild_index: the new collection is built under the
+# first name, and the old one is moved to the second while they are swapped
+REBUILD_COLLECTION_NAME = f"{COLLECTION_NAME}_rebuild"
+REPLACED_COLLECTION_NAME = f"{COLLECTION_NAME}_replaced"
+
+# HNSW index parameters that can be set, as named in Chroma's collection
+# metadata (without the "hnsw:" prefix)
+HNSW_PARAMS = ("M", "construction_ef", "search_ef", "batch_size", "sync_threshold")
+
+
+class VectorStore(VectorStoreBackend):
+    """Class for managing the vector database in ChromaDB."""
+
+    def __init__(
+        self,
+        persist_directory: str = "./chroma_db",
+        write_batch_size: Optional[int] = None,
+        max_pending_writes: int = 4,
+        hnsw_params: Optional[Dict[str, int]] = None
+    ):
         """
         Initialize the vector store.
 
         Args:
             persist_directory: Directory to persist the database
+            write_batch_size: Largest number of documents written per call to
+                the client (None for the client's own limit, which is also the
+                upper bound)
+            max_pending_writes: Number of background writes that may be queued
+                before add_documents(wait=False) blocks
+            hnsw_params: HNSW index parameters ("M", "construction_ef",
+                "search_ef", "batch_size", "sync_threshold") used when the
+                collection is created; Chroma fixes them at creation, so an
+                existing collection keeps its own until rebuild_index is run
         """
         self.persist_directory = persist_directory
+        self.hnsw_params = self._validate_hnsw_params(hnsw_params)
         
         # Create the directory if it doesn't exist
         os.makedirs(persist_directory, exist_ok=True)
@@ -30,64 +62,124 @@ class VectorStore:
         # Initialize ChromaDB client
         self.client = chromadb.PersistentClient(path=persist_directory)
         
-        # Create or get the collection for papers
-        self.collection = self.client.get_or_create_collection(
-            name="academic_papers",
-            metadata={"hnsw:space": "cosine"}
-        )
+        # Get the collection for papers, creating it with the index parameters
+        # if it does not exist yet
+        self._recover_rebuild()
+        if COLLECTION_NAME in [collection.name for collection in self.client.list_collections()]:
+            self.collection = self.client.get_collection(COLLECTION_NAME)
+        else:
+            self.collection = self.client.get_or_create_collection(
+                name=COLLECTION_NAME,
+                metadata=self._collection_metadata(self.hnsw_params)
+            )
+
+        # Chroma rejects writes larger than its maximum batch size
+        client_limit = getattr(self.client, "max_batch_size", None)
+        if write_batch_size and client_limit:
+            write_batch_size = min(write_batch_size, client_limit)
+        else:
+            write_batch_size = write_batch_size or client_limit or 5000
+        super().__init__(write_batch_size, max_pending_writes)
+
+    def _recover_rebuild(self) -> None:
+        """Finish the collection swap of a rebuild_index run that stopped partway."""
+        names = [collection.name for collection in self.client.list_collections()]
+
+        # The old collection is only moved aside once every chunk is copied,
+        # so a rebuilt collection without a live one is complete
+        if COLLECTION_NAME not in names:
+            if REBUILD_COLLECTION_NAME in names:
+                self.client.get_collection(REBUILD_COLLECTION_NAME).modify(name=COLLECTION_NAME)
+            elif REPLACED_COLLECTION_NAME in names:
+                self.client.get_collection(REPLACED_COLLECTION_NAME).modify(name=COLLECTION_NAME)
+            names = [collection.name for collection in self.client.list_collections()]
+
+        if COLLECTION_NAME in names and REPLACED_COLLECTION_NAME in names:
+            self.client.delete_collection(REPLACED_COLLECTION_NAME)
 
-    def add_documents(
+    @staticmethod
+    def _validate_hnsw_params(hnsw_params: Optional[Dict[str, int]]) -> Dict[str, int]:
+        """Check that only known HNSW parameters are given, dropping unset ones."""
+        hnsw_params = {key: value for key, value in (hnsw_params or {}).items() if value}
+        unknown = set(hnsw_params) - set(HNSW_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown HNSW parameters: {', '.join(sorted(unknown))}")
+        return hnsw_params
+
+    @staticmethod
+    def _collection_metadata(hnsw_params: Dict[str, int]) -> Dict[str, Any]:
+        """Build the collection metadata that configures its index."""
+        return {"hnsw:space": "cosine", **{f"hnsw:{key}": int(value) for key, value in hnsw_params.items()}}
+
+    def _write_batches(
         self,
         document_ids: List[str],
-        embeddings: List[List[float]],
+        embeddings: Union[List[List[float]], np.ndarray],
         texts: List[str],
-        metadatas: Optional[List[Dict]] = None
+        metadatas: Optional[List[Dict]]
     ) -> None:
+        """Upsert documents in client-sized batches, recording each batch's latency."""
+        for start in range(0, len(document_ids), self.write_batch_size):
+            end = start + self.write_batch_size
+            batch_metadatas = None
+            if metadatas is not None:
+                # Chroma rejects empty metadata dictionaries but accepts None
+                batch_metadatas = [metadata or None for metadata in metadatas[start:end]]
+
+            began = time.perf_counter()
+            self.collection.upsert(
+                ids=document_ids[start:end],
+                # Converting one batch at a time keeps only that batch as Python lists
+                embeddings=self._to_chroma_embeddings(embeddings[start:end]),
+                documents=texts[start:end],
+                metadatas=batch_metadatas
+            )
+            self._record_write(len(document_ids[start:end]), time.perf_counter() - began)
+
+    @staticmethod
+    def _to_chroma_embeddings(embeddings: Union[List[List[float]], np.ndarray]) -> List[List[float]]:
         """
-        Add documents to the vector store.
+        Convert embeddings to the list form the Chroma client accepts.
+
+        Arrays are converted once, here at the client boundary, so callers can
+        pass float32 arrays through without intermediate copies.
 
         Args:
-            document_ids: List of document IDs
-            embeddings: List of embeddings
-            texts: List of text chunks
-            metadatas: List of metadata dictionaries
-        """
-        if len(document_ids) != len(embeddings) or len(document_ids) != len(texts):
-            raise ValueError("document_ids, embeddings, and texts must have the same length")
-            
-        if metadatas is None:
-            metadatas = [{} for _ in document_ids]
-            
-        self.collection.add(
-            ids=document_ids,
-            embeddings=embeddings,
-            documents=texts,
-            metadatas=metadatas
-        )
+            embeddings: List of embeddings or a 2-D array
 
-    def query(
+        Returns:
+            List of embeddings
+        """
+        if isinstance(embeddings, np.ndarray):
+            return embeddings.tolist()
+        return embeddings
+
+    def query_batch(
         self,
-        query_embedding: List[float],
+        query_embeddings: Union[List[List[float]], np.ndarray],
         n_results: int = 5,
         where: Optional[Dict] = None
     ) -> Dict:
         """
-        Query the vector store for similar documents.
+        Query the vector store for documents similar to each of several queries.
+
+        All queries are searched in one call to the index.
 
         Args:
-            query_embedding: Embedding of the query
-            n_results: Number of results to return
-            where: Filter condition
+            query_embeddings: Embeddings of the queries, as a list or 2-D array
+            n_results: Number of results to return per query
+            where: Filter condition applied to every query
 
         Returns:
-            Dictionary with query results
+            Dictionary with query results, holding one list per query under
+            each key in the order of query_embeddings
         """
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=self._to_chroma_embeddings(query_embeddings),
             n_results=n_results,
             where=where
         )
-        
+
         return results
 
     def get_document_by_id(self, document_id: str) -> Optional[Dict]:
@@ -106,12 +198,133 @@ class VectorStore:
                 return {
                     "id": result["ids"][0],
                     "document": result["documents"][0],
-                    "metadata": result["metadatas"][0] if result["metadatas"] else {}
+                    "metadata": (result["metadatas"][0] if result["metadatas"] else None) or {}
                 }
             return None
         except Exception:
             return None
 
+    def find_paper_by_hash(self, content_hash: str) -> Optional[Dict]:
+        """
+        Find a previously ingested paper by the hash of its file contents.
+
+        Only papers ingested before paper metadata moved to the paper store
+        carry content_hash on their chunks; newer papers are found through
+        PaperStore.find_paper_by_hash. Uses a metadata filter on content_hash,
+        which Chroma answers from its metadata index rather than by scanning
+        the collection.
+
+        Args:
+            content_hash: SHA-256 hex digest of the paper's PDF file
+
+        Returns:
+            Dictionary with the paper's doc_id_base and the metadata of one of
+            its chunks, or None if no paper with this hash exists
+        """
+        result = self.collection.get(
+            where={"content_hash": content_hash},
+            limit=1,
+            include=["metadatas"]
+        )
+        if not result["ids"]:
+            return None
+
+        metadata = result["metadatas"][0] if result["metadatas"] else {}
+        return {
+            "doc_id_base": metadata.get("doc_id_base"),
+            "metadata": metadata
+        }
+
+    def get_paper_chunks(self, doc_id_base: str, include_documents: bool = True) -> List[Dict]:
+        """
+        Get all chunks of a paper with one metadata-filtered lookup.
+
+        Args:
+            doc_id_base: Base ID shared by the paper's chunks
+            include_documents: Whether to include the chunk texts
+
+        Returns:
+            List of dictionaries with the "id", "metadata" and (optionally)
+            "document" of each chunk, in chunk order
+        """
+        include = ["metadatas", "documents"] if include_documents else ["metadatas"]
+        result = self.collection.get(where={"doc_id_base": doc_id_base}, include=include)
+
+        chunks = []
+        for i, chunk_id in enumerate(result["ids"]):
+            chunk = {
+                "id": chunk_id,
+                "metadata": (result["metadatas"][i] if result["metadatas"] else None) or {}
+            }
+            if include_documents:
+                chunk["document"] = result["documents"][i]
+            chunks.append(chunk)
+
+        chunks.sort(key=lambda chunk: chunk["metadata"].get("chunk_index", 0))
+        return chunks
+
+    def iter_chunks(
+        self,
+        where: Optional[Dict] = None,
+        batch_size: int = 1000,
+        include_documents: bool = False,
+        include_embeddings: bool = False
+    ) -> Iterator[Dict]:
+        """
+        Iterate over the chunks matching a filter, a page at a time.
+
+        The IDs of the matching chunks are listed first and the chunks are
+        then fetched by ID, since paging with offsets makes Chroma skip over
+        every earlier chunk again for each page. Texts and embeddings are
+        only fetched if requested.
+
+        Args:
+            where: Filter condition (None for all chunks)
+            batch_size: Number of chunks fetched per call to the client
+            include_documents: Whether to include the chunk texts
+            include_embeddings: Whether to include the chunk embeddings
+
+        Yields:
+            Dictionary with the "id", "metadata" and (optionally) "document"
+            and "embedding" of each chunk
+        """
+        include = ["metadatas"]
+        if include_documents:
+            include.append("documents")
+        if include_embeddings:
+            include.append("embeddings")
+        chunk_ids = sorted(self.collection.get(where=where, include=[])["ids"])
+        for start in range(0, len(chunk_ids), batch_size):
+            result = self.collection.get(ids=chunk_ids[start:start + batch_size], include=include)
+            for i, chunk_id in enumerate(result["ids"]):
+                chunk = {
+                    "id": chunk_id,
+                    "metadata": (result["metadatas"][i] if result["metadatas"] else None) or {}
+                }
+                if include_documents:
+                    chunk["document"] = result["documents"][i]
+                if include_embeddings:
+                    chunk["embedding"] = result["embeddings"][i]
+                yield chunk
+
+    def delete_paper(self, doc_id_base: str) -> int:
+        """
+        Delete all chunks of a paper.
+
+        The chunk IDs are found with one metadata-filtered lookup and removed
+        with one bulk delete, however many chunks the paper has.
+
+        Args:
+            doc_id_base: Base ID shared by the paper's chunks
+
+        Returns:
+            Number of chunks deleted (0 if the paper does not exist)
+        """
+        chunk_ids = self.collection.get(where={"doc_id_base": doc_id_base}, include=[])["ids"]
+        if chunk_ids:
+            self.collection.delete(ids=chunk_ids)
+        return len(chunk_ids)
+
     def delete_document(self, document_id: str) -> bool:
         """
         Delete a document from the vector store.
@@ -120,14 +333,94 @@ class VectorStore:
             document_id: ID of the document to delete
 
         Returns:
-            True if successful, False otherwise
+            True if the document existed and was deleted, False otherwise
         """
         try:
+            # Chroma silently ignores unknown IDs, so check first
+            if not self.collection.get(ids=[document_id], include=[])["ids"]:
+                return False
             self.collection.delete(ids=[document_id])
             return True
         except Exception:
             return False
 
+    def get_index_params(self) -> Dict[str, Any]:
+        """
+        Get the HNSW parameters the collection's index was built with.
+
+        Returns:
+            Dictionary with the distance "space" and every parameter in
+            HNSW_PARAMS that was set (unset ones use Chroma's defaults)
+        """
+        metadata = self.collection.metadata or {}
+        return {
+            key[len("hnsw:"):]: value
+            for key, value in metadata.items()
+            if key.startswith("hnsw:")
+        }
+
+    def rebuild_index(self, hnsw_params: Optional[Dict[str, int]] = None, batch_size: int = 1000) -> int:
+        """
+        Rebuild the collection with new HNSW parameters.
+
+        Chroma fixes the index parameters of a collection when it is created,
+        so every chunk is copied into a new collection built with them, which
+        then replaces the old one. The old collection is only dropped once
+        the new one is in place, and a swap that stops partway is finished
+        when the store is next opened. Other processes using the database
+        must be stopped first.
+
+        Args:
+            hnsw_params: Parameters to change (None to use the ones this store
+                was created with); parameters not given keep their current value
+            batch_size: Number of chunks copied per call to the client
+
+        Returns:
+            Number of chunks copied
+        """
+        self.flush()
+        current = {key: value for key, value in self.get_index_params().items() if key in HNSW_PARAMS}
+        requested = hnsw_params if hnsw_params is not None else self.hnsw_params
+        params = {**current, **self._validate_hnsw_params(requested)}
+
+        # A rebuild interrupted while copying leaves an incomplete target
+        # collection behind; one interrupted while swapping is recovered
+        self._recover_rebuild()
+        if REBUILD_COLLECTION_NAME in [collection.name for collection in self.client.list_collections()]:
+            self.client.delete_collection(REBUILD_COLLECTION_NAME)
+        target = self.client.create_collection(REBUILD_COLLECTION_NAME, metadata=self._collection_metadata(params))
+
+        copied = 0
+        batch: List[Dict] = []
+        for chunk in self.iter_chunks(batch_size=batch_size, include_documents=True, include_embeddings=True):
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                copied += self._copy_chunks(target, batch)
+                batch = []
+        if batch:
+            copied += self._copy_chunks(target, batch)
+
+        # Move the old collection aside rather than dropping it, so a crash
+        # during the swap never loses the chunks
+        self.collection.modify(name=REPLACED_COLLECTION_NAME)
+        target.modify(name=COLLECTION_NAME)
+        self.client.delete_collection(REPLACED_COLLECTION_NAME)
+        self.collection = self.client.get_collection(COLLECTION_NAME)
+        self.hnsw_params = params
+
+        return copied
+
+    @staticmethod
+    def _copy_chunks(collection: Any, chunks: List[Dict]) -> int:
+        """Write chunks read by iter_chunks into another collection."""
+        collection.upsert(
+            ids=[chunk["id"] for chunk in chunks],
+            embeddings=[chunk["embedding"] for chunk in chunks],
+            documents=[chunk["document"] for chunk in chunks],
+            metadatas=[chunk["metadata"] or None for chunk in chunks]
+        )
+        return len(chunks)
+
     def get_collection_stats(self) -> Dict:
         """
         Get statistics about the collection.
@@ -139,5 +432,7 @@ class VectorStore:
         return {
             "count": count,
             "collection_name": self.collection.name,
-            "persist_directory": self.persist_directory
+            "persist_directory": self.persist_directory,
+            "index": self.get_index_params(),
+            "writes": self.get_write_stats()
         }
\ No newline at end of file
@@ -0,0 +1,414 @@
+"""
+Bulk ingestion module for PaperShelf.
+
+This module ingests every PDF in a directory or zip archive through a staged
+pipeline: a process pool parses the files, a single thread embeds their
+chunks in large cross-document batches, and a single thread writes them to
+the vector store. The stages are connected by bounded queues, so a slow
+stage holds the faster ones back instead of letting work pile up in memory.
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from papershelf.db.centroid_index import PaperCentroidIndex
+from papershelf.db.lexical_index import LexicalIndex
+from papershelf.db.paper_store import PaperStore
+from papershelf.db.vector_backend import VectorStoreBackend
+from papershelf.ingest.embedding_generator import EmbeddingGenerator
+from papershelf.ingest.ingestion_jobs import build_chunk_metadatas, find_existing_paper
+from papershelf.ingest.pdf_sources import PdfSource, find_pdf_sources, parse_source
+
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+def paper_id_from_hash(content_hash: str) -> str:
+    """
+    Derive a paper's doc_id_base from the hash of its file contents.
+
+    The ID is stable, so rerunning an interrupted ingestion overwrites
+    whatever the first run stored for the file instead of adding a copy.
+
+    Args:
+        content_hash: SHA-256 hash of the PDF contents
+
+    Returns:
+        UUID string derived from the hash
+    """
+    return str(uuid.uuid5(uuid.NAMESPACE_OID, content_hash))
+
+
+class IngestCheckpoint:
+    """Class for recording which files a bulk ingestion run has finished."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the checkpoint, loading the files finished by earlier runs.
+
+        Args:
+            path: Path to the checkpoint file (JSON lines)
+        """
+        self.path = path
+        self.finished: Dict[str, Dict[str, Any]] = {}
+
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A run killed mid-write can leave a partial last line
+                        continue
+                    self.finished[entry["key"]] = entry
+
+        self._file = open(path, "a")
+
+    def is_finished(self, key: str) -> bool:
+        """
+        Check whether a file was finished by this or an earlier run.
+
+        Args:
+            key: Key of the source
+
+        Returns:
+            True if the file does not need to be ingested again
+        """
+        return key in self.finished
+
+    def record(self, key: str, **details: Any) -> None:
+        """
+        Record that a file is finished.
+
+        Args:
+            key: Key of the source
+            **details: Extra details stored with the entry
+        """
+        entry = {"key": key, **details}
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        self.finished[key] = entry
+
+    def close(self) -> None:
+        """Close the checkpoint file."""
+        self._file.close()
+
+
+class BulkIngestPipeline:
+    """Class for ingesting many PDFs through a staged pipeline."""
+
+    def __init__(
+        self,
+        embedding_generator: EmbeddingGenerator,
+        vector_store: VectorStoreBackend,
+        paper_store: PaperStore,
+        lexical_index: Optional[LexicalIndex] = None,
+        centroid_index: Optional[PaperCentroidIndex] = None,
+        parse_workers: int = 2,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        embed_batch_size: int = 256,
+        queue_size: int = 8,
+        progress_interval: float = 5.0,
+        report: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Initialize the bulk ingestion pipeline.
+
+        Args:
+            embedding_generator: Embedding generator used to embed chunks
+            vector_store: Vector store the chunks are written to
+            paper_store: Store the paper metadata is written to
+            lexical_index: Optional full-text index the chunk text is written to
+            centroid_index: Optional index each paper's centroid embedding is written to
+            parse_workers: Number of processes parsing PDFs
+            chunk_size: Maximum size of each chunk in characters
+            chunk_overlap: Number of characters to overlap between chunks
+            embed_batch_size: Number of chunks, possibly from several papers,
+                gathered for each embedding call
+            queue_size: Number of papers each queue between stages can hold
+            progress_interval: Seconds between progress reports
+            report: Callable that receives progress lines (defaults to
+                printing to stderr)
+        """
+        self.embedding_generator = embedding_generator
+        self.vector_store = vector_store
+        self.paper_store = paper_store
+        self.lexical_index = lexical_index
+        self.centroid_index = centroid_index
+        self.parse_workers = parse_workers
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.embed_batch_size = embed_batch_size
+        self.queue_size = queue_size
+        self.progress_interval = progress_interval
+        self.report = report or (lambda line: print(line, file=sys.stderr, flush=True))
+
+        self._abort = threading.Event()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {}
+        self._error: Optional[BaseException] = None
+
+    def run(self, source_path: str, checkpoint_path: str) -> Dict[str, Any]:
+        """
+        Ingest every PDF in a directory or zip archive.
+
+        Files recorded in the checkpoint by an earlier run are skipped.
+
+        Args:
+            source_path: Path to a directory or zip archive
+            checkpoint_path: Path to the checkpoint file
+
+        Returns:
+            Dictionary with counts of files and chunks, failures, elapsed
+            time and throughput
+        """
+        sources = find_pdf_sources(source_path)
+        checkpoint = IngestCheckpoint(checkpoint_path)
+        pending = [source for source in sources if not checkpoint.is_finished(source.key)]
+
+        self._abort.clear()
+        self._error = None
+        self._stats = {
+            "files": len(sources),
+            "skipped": len(sources) - len(pending),
+            "ingested": 0,
+            "duplicates": 0,
+            "failed": 0,
+            "chunks": 0,
+            "errors": []
+        }
+        self.report(f"Found {len(sources)} PDFs, {len(pending)} to ingest ({self._stats['skipped']} already done)")
+
+        parsed_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        write_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        threads = [
+            threading.Thread(target=self._parse_stage, args=(pending, parsed_queue), name="ingest-parse"),
+            threading.Thread(target=self._embed_stage, args=(parsed_queue, write_queue), name="ingest-embed"),
+            threading.Thread(target=self._write_stage, args=(write_queue, checkpoint), name="ingest-write")
+        ]
+
+        start = time.monotonic()
+        try:
+            for thread in threads:
+                thread.start()
+            while any(thread.is_alive() for thread in threads):
+                threads[-1].join(self.progress_interval)
+                self.report(self._progress_line(len(pending), time.monotonic() - start))
+        except BaseException:
+            # Stop the stages (e.g. on Ctrl-C); finished files stay in the checkpoint
+            self._abort.set()
+            for thread in threads:
+                thread.join()
+            raise
+        finally:
+            checkpoint.close()
+
+        elapsed = time.monotonic() - start
+        stats = dict(self._stats)
+        stats["elapsed_seconds"] = elapsed
+        stats["files_per_second"] = stats["ingested"] / elapsed if elapsed > 0 else 0.0
+        stats["chunks_per_second"] = stats["chunks"] / elapsed if elapsed > 0 else 0.0
+
+        if self._error is not None:
+            raise RuntimeError(f"Bulk ingestion stopped: {self._error}") from self._error
+
+        return stats
+
+    def _progress_line(self, total: int, elapsed: float) -> str:
+        """Format a progress report."""
+        with self._lock:
+            stats = dict(self._stats)
+        done = stats["ingested"] + stats["duplicates"] + stats["failed"]
+        rate = elapsed if elapsed > 0 else 1.0
+        return (
+            f"{done}/{total} files ({stats['ingested']} ingested, {stats['duplicates']} duplicate, "
+            f"{stats['failed']} failed), {stats['chunks']} chunks, "
+            f"{stats['ingested'] / rate:.1f} files/s, {stats['chunks'] / rate:.0f} chunks/s"
+        )
+
+    def _count(self, **increments: int) -> None:
+        """Add to the run's counters."""
+        with self._lock:
+            for name, value in increments.items():
+                self._stats[name] += value
+
+    def _record_failure(self, key: str, error: str) -> None:
+        """Count a file that could not be ingested; it is retried on the next run."""
+        with self._lock:
+            self._stats["failed"] += 1
+            self._stats["errors"].append({"key": key, "error": error})
+        self.report(f"Failed to ingest {key}: {error}")
+
+    def _fail(self, error: BaseException) -> None:
+        """Stop every stage after an unexpected error."""
+        self._error = error
+        self._abort.set()
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        """
+        Put an item on a queue, waiting for space unless the run is aborted.
+
+        Returns:
+            True if the item was queued, False if the run was aborted
+        """
+        while not self._abort.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue) -> Any:
+        """Take an item from a queue, returning _DONE if the run is aborted."""
+        while not self._abort.is_set():
+            try:
+                return source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _parse_stage(self, sources: List[PdfSource], parsed_queue: queue.Queue) -> None:
+        """Parse PDFs in a process pool, keeping a bounded number in flight."""
+        executor = ProcessPoolExecutor(
+            max_workers=self.parse_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            remaining = iter(sources)
+            in_flight = set()
+            while not self._abort.is_set():
+                while len(in_flight) < 2 * self.parse_workers:
+                    source = next(remaining, None)
+                    if source is None:
+                        break
+                    in_flight.add(executor.submit(parse_source, source, self.chunk_size, self.chunk_overlap))
+                if not in_flight:
+                    break
+
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if not self._put(parsed_queue, future.result()):
+                        return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._put(parsed_queue, _DONE)
+
+    def _embed_stage(self, parsed_queue: queue.Queue, write_queue: queue.Queue) -> None:
+        """Embed parsed papers, batching chunks across papers that are ready."""
+        seen_hashes = set()
+        finished = False
+        try:
+            while not finished:
+                batch = []
+                batch_chunks = 0
+
+                # Wait for one paper, then add any others that are already parsed
+                item = self._get(parsed_queue)
+                while True:
+                    if item is _DONE:
+                        finished = True
+                        break
+
+                    if "error" in item:
+                        self._record_failure(item["key"], item["error"])
+                    elif not item["chunks"]:
+                        self._record_failure(item["key"], "No text could be extracted from the PDF")
+                    elif item["content_hash"] in seen_hashes:
+                        if not self._put(write_queue, {**item, "duplicate_of": None}):
+                            return
+                    else:
+                        seen_hashes.add(item["content_hash"])
+                        existing = find_existing_paper(self.paper_store, self.vector_store, item["content_hash"])
+                        if existing:
+                            if not self._put(write_queue, {**item, "duplicate_of": existing["doc_id_base"]}):
+                                return
+                        else:
+                            batch.append(item)
+                            batch_chunks += len(item["chunks"])
+
+                    if batch_chunks >= self.embed_batch_size:
+                        break
+                    try:
+                        item = parsed_queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                if not batch:
+                    continue
+
+                texts = [chunk for item in batch for chunk in item["chunks"]]
+                embeddings = self.embedding_generator.generate_embeddings(texts, as_numpy=True)
+
+                offset = 0
+                for item in batch:
+                    item["embeddings"] = embeddings[offset:offset + len(item["chunks"])]
+                    offset += len(item["chunks"])
+                    if not self._put(write_queue, item):
+                        return
+        except Exception as e:
+            self._fail(e)
+        finally:
+            self._put(write_queue, _DONE)
+
+    def _write_stage(self, write_queue: queue.Queue, checkpoint: IngestCheckpoint) -> None:
+        """Write embedded papers to the vector store and record them in the checkpoint."""
+        try:
+            while True:
+                item = self._get(write_queue)
+                if item is _DONE:
+                    return
+
+                if "duplicate_of" in item:
+                    checkpoint.record(
+                        item["key"],
+                        status="duplicate",
+                        content_hash=item["content_hash"],
+                        doc_id_base=item["duplicate_of"]
+                    )
+                    self._count(duplicates=1)
+                    continue
+
+                chunks = item["chunks"]
+                doc_id_base = paper_id_from_hash(item["content_hash"])
+                doc_ids = [f"{doc_id_base}_{i}" for i in range(len(chunks))]
+                chunk_metadatas = build_chunk_metadatas(doc_id_base, len(chunks))
+                self.vector_store.add_documents(
+                    document_ids=doc_ids,
+                    embeddings=item["embeddings"],
+                    texts=chunks,
+                    metadatas=chunk_metadatas
+                )
+                if self.lexical_index is not None:
+                    self.lexical_index.add_chunks(doc_ids, chunks, metadatas=chunk_metadatas)
+                if self.centroid_index is not None:
+                    self.centroid_index.add_paper(doc_id_base, item["embeddings"])
+                self.paper_store.add_paper(
+                    doc_id_base,
+                    item["metadata"],
+                    content_hash=item["content_hash"],
+                    total_chunks=len(chunks)
+                )
+
+                checkpoint.record(
+                    item["key"],
+                    status="ingested",
+                    content_hash=item["content_hash"],
+                    doc_id_base=doc_id_base,
+                    chunks=len(chunks)
+                )
+                self._count(ingested=1, chunks=len(chunks))
+        except Exception as e:
+            self._fail(e)
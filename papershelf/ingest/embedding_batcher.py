@@ -0,0 +1,174 @@
+"""
+Embedding batcher module for PaperShelf.
+
+This module provides a micro-batching wrapper around the embedding generator
+so that concurrent single-text requests share one model call.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from papershelf.ingest.embedding_generator import EmbeddingGenerator
+
+
+class BatchingEmbeddingGenerator:
+    """Class for batching concurrent embedding requests."""
+
+    def __init__(
+        self,
+        embedding_generator: EmbeddingGenerator,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 8.0
+    ):
+        """
+        Initialize the batching embedding generator.
+
+        Args:
+            embedding_generator: Embedding generator that encodes each batch
+            max_batch_size: Number of texts that triggers an immediate flush
+            max_wait_ms: Longest time the first request in a batch waits for
+                others to join before the batch is flushed
+        """
+        self.embedding_generator = embedding_generator
+        self.model_name = embedding_generator.model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.batches = 0
+        self.batched_texts = 0
+        self._queue: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def generate_embeddings(
+        self,
+        texts: Union[str, List[str]],
+        as_numpy: bool = False
+    ) -> Union[List[List[float]], np.ndarray]:
+        """
+        Generate embeddings for the given texts.
+
+        Blocks until the batch containing these texts has been encoded.
+        Requests that already fill a batch are encoded directly.
+
+        Args:
+            texts: A single text string or a list of text strings
+            as_numpy: Return a float32 array instead of Python lists
+
+        Returns:
+            List of embeddings (each embedding is a list of floats), or a
+            float32 array if as_numpy is set
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+
+        if len(texts) >= self.max_batch_size:
+            return self.embedding_generator.generate_embeddings(texts, as_numpy=as_numpy)
+
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((texts, future))
+        embeddings = future.result()
+
+        return embeddings if as_numpy else embeddings.tolist()
+
+    def _ensure_worker(self) -> None:
+        """Start the background batching thread if it is not running."""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run,
+                    name="embedding-batcher",
+                    daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        """Collect queued requests into batches and encode them."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            pending = [item]
+            count = len(item[0])
+            stop = False
+            deadline = time.monotonic() + self.max_wait_ms / 1000.0
+
+            while count < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                pending.append(item)
+                count += len(item[0])
+
+            self._flush(pending)
+            if stop:
+                return
+
+    def _flush(self, pending: List[Tuple[List[str], Future]]) -> None:
+        """
+        Encode a batch and hand each caller its own embeddings.
+
+        Args:
+            pending: Queued (texts, future) requests making up the batch
+        """
+        texts = [text for request_texts, _ in pending for text in request_texts]
+
+        try:
+            embeddings = self.embedding_generator.generate_embeddings(texts, as_numpy=True)
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.batched_texts += len(texts)
+
+        offset = 0
+        for request_texts, future in pending:
+            future.set_result(embeddings[offset:offset + len(request_texts)])
+            offset += len(request_texts)
+
+    def get_model_info(self) -> Dict[str, str]:
+        """
+        Get information about the embedding model.
+
+        Returns:
+            Dictionary with model information
+        """
+        return self.embedding_generator.get_model_info()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about batching.
+
+        Returns:
+            Dictionary with batching statistics
+        """
+        return {
+            "batches": self.batches,
+            "texts": self.batched_texts,
+            "average_batch_size": self.batched_texts / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms
+        }
+
+    def close(self) -> None:
+        """Stop the background batching thread after it flushes queued requests."""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                self._queue.put(None)
+                self._worker.join()
+            self._worker = None
@@ -0,0 +1,196 @@
+"""
+Embedding cache module for PaperShelf.
+
+This module provides a persistent SQLite cache of embeddings keyed by
+model name and a hash of the embedded text.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """Class for caching embeddings on disk with LRU eviction."""
+
+    # SQLite limits the number of parameters in a single statement
+    _LOOKUP_BATCH_SIZE = 500
+
+    def __init__(self, db_path: str = "./embedding_cache.db", max_entries: int = 500000):
+        """
+        Initialize the embedding cache.
+
+        Args:
+            db_path: Path to the SQLite database file
+            max_entries: Maximum number of embeddings kept before the least
+                recently used ones are evicted
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._create_tables_if_not_exist()
+
+    def _create_tables_if_not_exist(self):
+        """Create the necessary tables if they don't exist."""
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS embeddings (
+            model_name TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            dimension INTEGER NOT NULL,
+            embedding BLOB NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (model_name, text_hash)
+        )
+        ''')
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)"
+        )
+
+        # Number of entries, kept in the database so that every process
+        # sharing the cache evicts against the same count
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS state (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        ''')
+        self._conn.execute(
+            "INSERT OR IGNORE INTO state (key, value) SELECT 'entries', COUNT(*) FROM embeddings"
+        )
+        self._conn.commit()
+
+    def _count_entries(self) -> int:
+        """Read the number of entries in the cache."""
+        return self._conn.execute("SELECT value FROM state WHERE key = 'entries'").fetchone()[0]
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """
+        Hash a text for use as a cache key.
+
+        Args:
+            text: The text to hash
+
+        Returns:
+            SHA-256 hex digest of the UTF-8 encoded text
+        """
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached embeddings for a list of texts.
+
+        Args:
+            model_name: Name of the model that produced the embeddings
+            texts: Texts to look up
+
+        Returns:
+            List aligned with texts holding a float32 embedding for each hit
+            and None for each miss
+        """
+        hashes = [self.hash_text(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            unique_hashes = list(dict.fromkeys(hashes))
+            for i in range(0, len(unique_hashes), self._LOOKUP_BATCH_SIZE):
+                batch = unique_hashes[i:i + self._LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, embedding FROM embeddings "
+                    f"WHERE model_name = ? AND text_hash IN ({placeholders})",
+                    [model_name, *batch]
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32)
+
+            # Mark hits as recently used
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model_name = ? AND text_hash = ?",
+                    [(now, model_name, text_hash) for text_hash in found]
+                )
+                self._conn.commit()
+
+            results = [found.get(text_hash) for text_hash in hashes]
+            hits = sum(1 for result in results if result is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+
+        return results
+
+    def put_many(self, model_name: str, texts: List[str], embeddings: np.ndarray) -> None:
+        """
+        Store embeddings for a list of texts, evicting old entries if needed.
+
+        Args:
+            model_name: Name of the model that produced the embeddings
+            texts: Texts that were embedded
+            embeddings: Array of embeddings aligned with texts
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        now = time.time()
+        rows = [
+            (model_name, self.hash_text(text), embedding.shape[0], embedding.tobytes(), now)
+            for text, embedding in zip(texts, embeddings)
+        ]
+
+        with self._lock:
+            # Other processes may write to the same cache, so the count is
+            # read and updated inside one write transaction
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings "
+                    "(model_name, text_hash, dimension, embedding, last_used) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                added = self._conn.total_changes - before
+                entries = self._count_entries() + added
+
+                if entries > self.max_entries:
+                    entries -= self._conn.execute(
+                        "DELETE FROM embeddings WHERE rowid IN "
+                        "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                        (entries - self.max_entries,)
+                    ).rowcount
+
+                self._conn.execute("UPDATE state SET value = ? WHERE key = 'entries'", (entries,))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the cache.
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = self._count_entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "db_path": self.db_path
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -7,39 +7,160 @@ using sentence transformers.
 
 from typing import Dict, List, Optional, Union
 
+import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from papershelf.ingest.embedding_cache import EmbeddingCache
+from papershelf.ingest.embedding_pool import EncoderPool
+from papershelf.ingest.onnx_backend import OnnxEncoder
+
 
 class EmbeddingGenerator:
     """Class for generating embeddings from text."""
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        backend: str = "torch",
+        onnx_cache_dir: str = "./onnx_models",
+        onnx_quantize: bool = True,
+        num_processes: int = 1,
+        threads_per_process: int = 1,
+        sort_by_length: bool = True
+    ):
         """
         Initialize the embedding generator.
 
         Args:
             model_name: Name of the sentence transformer model to use
+            cache: Optional persistent cache of previously generated embeddings
+            batch_size: Number of texts the model encodes per forward pass
+            normalize_embeddings: Whether to scale embeddings to unit length
+            backend: Inference backend, "torch" or "onnx"
+            onnx_cache_dir: Directory where exported ONNX models are cached
+            onnx_quantize: Whether the ONNX backend uses int8 dynamic quantization
+            num_processes: Number of encoder processes; above 1, large text
+                lists are sharded across a process pool
+            threads_per_process: Number of compute threads pinned per encoder process
+            sort_by_length: Whether the ONNX backend encodes texts in batches of
+                similar token length (the torch backend always sorts by length)
         """
         self.model_name = model_name
-        self.model = SentenceTransformer(model_name)
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = batch_size
+        self.normalize_embeddings = normalize_embeddings
+
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Unknown embedding backend: {backend}")
+
+        if num_processes > 1:
+            self.model = EncoderPool(
+                model_name,
+                num_processes=num_processes,
+                threads_per_process=threads_per_process,
+                backend=backend,
+                onnx_cache_dir=onnx_cache_dir,
+                onnx_quantize=onnx_quantize,
+                sort_by_length=sort_by_length
+            )
+        elif backend == "torch":
+            self.model = SentenceTransformer(model_name)
+        else:
+            self.model = OnnxEncoder.from_pretrained(
+                model_name,
+                cache_dir=onnx_cache_dir,
+                quantize=onnx_quantize,
+                sort_by_length=sort_by_length
+            )
+
+        # Embeddings from different backends or normalization settings must
+        # not be served from the same cache entries
+        self._cache_key = model_name
+        if backend == "onnx":
+            self._cache_key += ":onnx-int8" if onnx_quantize else ":onnx"
+        if normalize_embeddings:
+            self._cache_key += ":normalized"
 
-    def generate_embeddings(self, texts: Union[str, List[str]]) -> List[List[float]]:
+    def generate_embeddings(
+        self,
+        texts: Union[str, List[str]],
+        as_numpy: bool = False
+    ) -> Union[List[List[float]], np.ndarray]:
         """
         Generate embeddings for the given texts.
 
+        When a cache is configured, only texts missing from it are passed to
+        the model, in a single batch.
+
         Args:
             texts: A single text string or a list of text strings
+            as_numpy: Return a contiguous float32 array of shape
+                (len(texts), dimension) instead of Python lists
 
         Returns:
-            List of embeddings (each embedding is a list of floats)
+            List of embeddings (each embedding is a list of floats), or a
+            float32 array if as_numpy is set
         """
         if isinstance(texts, str):
             texts = [texts]
-            
-        # Generate embeddings
-        embeddings = self.model.encode(texts, convert_to_tensor=False)
-        
-        return embeddings.tolist()
+
+        embeddings = self._encode_with_cache(texts) if self.cache is not None else self._encode(texts)
+
+        return embeddings if as_numpy else embeddings.tolist()
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts with the model.
+
+        Args:
+            texts: List of text strings
+
+        Returns:
+            Contiguous float32 array of embeddings
+        """
+        if not texts:
+            return np.empty((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        embeddings = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=self.normalize_embeddings,
+            convert_to_tensor=False
+        )
+
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    def _encode_with_cache(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts, reusing cached embeddings and caching new ones.
+
+        Args:
+            texts: List of text strings
+
+        Returns:
+            Contiguous float32 array of embeddings
+        """
+        cached = self.cache.get_many(self._cache_key, texts)
+        misses = list(dict.fromkeys(text for text, embedding in zip(texts, cached) if embedding is None))
+
+        if misses:
+            # Generate embeddings for cache misses only
+            encoded = self._encode(misses)
+            self.cache.put_many(self._cache_key, misses, encoded)
+            encoded_by_text = dict(zip(misses, encoded))
+            cached = [
+                embedding if embedding is not None else encoded_by_text[text]
+                for text, embedding in zip(texts, cached)
+            ]
+
+        if not cached:
+            return self._encode(texts)
+
+        return np.vstack(cached).astype(np.float32, copy=False)
 
     def get_model_info(self) -> Dict[str, str]:
         """
@@ -50,6 +171,12 @@ class EmbeddingGenerator:
         """
         return {
             "model_name": self.model_name,
+            "backend": self.backend,
             "model_dimension": str(self.model.get_sentence_embedding_dimension()),
             "model_max_seq_length": str(self.model.get_max_seq_length())
-        }
\ No newline at end of file
+        }
+
+    def close(self) -> None:
+        """Shut down the encoder processes, if the generator runs in pool mode."""
+        if isinstance(self.model, EncoderPool):
+            self.model.close()
@@ -0,0 +1,213 @@
+"""
+Embedding pool module for PaperShelf.
+
+This module provides a pool of encoder processes that large text lists are
+sharded across, for bulk ingestion on multi-core machines.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from papershelf.ingest.onnx_backend import ensure_onnx_model
+
+
+# Encoder loaded once in each worker process by _init_worker
+_worker_encoder = None
+
+
+def _init_worker(
+    model_name: str,
+    backend: str,
+    onnx_cache_dir: str,
+    onnx_quantize: bool,
+    num_threads: int,
+    sort_by_length: bool
+) -> None:
+    """
+    Load the encoder in a worker process with a pinned thread count.
+
+    Args:
+        model_name: Name of the sentence transformer model
+        backend: Inference backend, "torch" or "onnx"
+        onnx_cache_dir: Directory where exported ONNX models are cached
+        onnx_quantize: Whether the ONNX backend uses int8 dynamic quantization
+        num_threads: Number of compute threads the worker may use
+        sort_by_length: Whether the ONNX backend batches texts by token length
+    """
+    global _worker_encoder
+
+    # Keep the workers from oversubscribing the machine's cores
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(num_threads)
+
+    if backend == "onnx":
+        from papershelf.ingest.onnx_backend import OnnxEncoder
+
+        _worker_encoder = OnnxEncoder.from_pretrained(
+            model_name,
+            cache_dir=onnx_cache_dir,
+            quantize=onnx_quantize,
+            num_threads=num_threads,
+            sort_by_length=sort_by_length
+        )
+    else:
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        torch.set_num_threads(num_threads)
+        _worker_encoder = SentenceTransformer(model_name, device="cpu")
+
+
+def _encode_shard(sentences: List[str], batch_size: int, normalize_embeddings: bool) -> np.ndarray:
+    """
+    Encode one shard of sentences in a worker process.
+
+    Args:
+        sentences: Sentences in this shard
+        batch_size: Number of sentences per forward pass
+        normalize_embeddings: Whether to scale embeddings to unit length
+
+    Returns:
+        Float32 array of embeddings
+    """
+    embeddings = _worker_encoder.encode(
+        sentences,
+        batch_size=batch_size,
+        normalize_embeddings=normalize_embeddings,
+        convert_to_tensor=False
+    )
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def _model_dimensions() -> Tuple[int, int]:
+    """
+    Get the worker encoder's embedding dimension and maximum sequence length.
+
+    Returns:
+        Tuple of (dimension, max_seq_length)
+    """
+    return _worker_encoder.get_sentence_embedding_dimension(), _worker_encoder.get_max_seq_length()
+
+
+class EncoderPool:
+    """Class for encoding text across a pool of processes."""
+
+    def __init__(
+        self,
+        model_name: str,
+        num_processes: int,
+        threads_per_process: int = 1,
+        backend: str = "torch",
+        onnx_cache_dir: str = "./onnx_models",
+        onnx_quantize: bool = True,
+        min_shard_size: int = 64,
+        sort_by_length: bool = True
+    ):
+        """
+        Initialize the encoder pool.
+
+        Args:
+            model_name: Name of the sentence transformer model
+            num_processes: Number of encoder processes
+            threads_per_process: Number of compute threads pinned per process
+            backend: Inference backend, "torch" or "onnx"
+            onnx_cache_dir: Directory where exported ONNX models are cached
+            onnx_quantize: Whether the ONNX backend uses int8 dynamic quantization
+            min_shard_size: Smallest number of texts worth sending to its own process
+            sort_by_length: Whether the ONNX backend batches texts by token length
+        """
+        self.model_name = model_name
+        self.num_processes = num_processes
+        self.threads_per_process = threads_per_process
+        self.min_shard_size = min_shard_size
+        self._dimensions: Optional[Tuple[int, int]] = None
+
+        # Export once up front so workers don't race to write the same files
+        if backend == "onnx":
+            ensure_onnx_model(model_name, cache_dir=onnx_cache_dir, quantize=onnx_quantize)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=num_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_name, backend, onnx_cache_dir, onnx_quantize, threads_per_process, sort_by_length)
+        )
+
+    def _shards(self, count: int) -> List[Tuple[int, int]]:
+        """
+        Split a number of texts into contiguous shards, one per busy process.
+
+        Args:
+            count: Number of texts to encode
+
+        Returns:
+            List of (start, end) ranges covering every text in order
+        """
+        num_shards = max(1, min(self.num_processes, count // max(1, self.min_shard_size)))
+        size, remainder = divmod(count, num_shards)
+
+        shards = []
+        start = 0
+        for i in range(num_shards):
+            end = start + size + (1 if i < remainder else 0)
+            shards.append((start, end))
+            start = end
+        return shards
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        convert_to_tensor: bool = False
+    ) -> np.ndarray:
+        """
+        Encode sentences by sharding them across the pool.
+
+        Mirrors the parts of SentenceTransformer.encode used by PaperShelf.
+
+        Args:
+            sentences: A single sentence or a list of sentences
+            batch_size: Number of sentences per forward pass in each process
+            normalize_embeddings: Whether to scale embeddings to unit length
+            convert_to_tensor: Unsupported, must be False
+
+        Returns:
+            Float32 array of embeddings, in input order
+        """
+        if convert_to_tensor:
+            raise ValueError("The encoder pool only returns NumPy arrays")
+
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        futures = [
+            self._executor.submit(_encode_shard, sentences[start:end], batch_size, normalize_embeddings)
+            for start, end in self._shards(len(sentences))
+        ]
+        embeddings = np.vstack([future.result() for future in futures])
+
+        return embeddings[0] if single else embeddings
+
+    def _get_dimensions(self) -> Tuple[int, int]:
+        """Fetch and remember the model's dimensions from a worker."""
+        if self._dimensions is None:
+            self._dimensions = self._executor.submit(_model_dimensions).result()
+        return self._dimensions
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Get the dimension of the sentence embeddings."""
+        return self._get_dimensions()[0]
+
+    def get_max_seq_length(self) -> int:
+        """Get the maximum number of tokens per sentence."""
+        return self._get_dimensions()[1]
+
+    def close(self) -> None:
+        """Shut down the encoder processes, cancelling work that has not started."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
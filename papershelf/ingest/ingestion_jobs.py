@@ -0,0 +1,326 @@
+"""
+Ingestion jobs module for PaperShelf.
+
+This module provides a bounded pool of worker threads that take queued
+ingestion jobs from the durable job store and parse, embed and store the
+uploaded papers in the background.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from papershelf.db.centroid_index import PaperCentroidIndex
+from papershelf.db.job_store import JobStore
+from papershelf.db.lexical_index import LexicalIndex
+from papershelf.db.paper_store import PaperStore
+from papershelf.db.vector_backend import VectorStoreBackend
+from papershelf.ingest.embedding_generator import EmbeddingGenerator
+from papershelf.ingest.pdf_processor import PDFProcessor
+from papershelf.utils.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def build_chunk_metadatas(doc_id_base: str, total_chunks: int) -> List[Dict[str, Any]]:
+    """
+    Create the metadata stored with each chunk of a paper.
+
+    Paper-level metadata lives in the paper store, so chunks only record
+    which paper they belong to and where in it they are.
+
+    Args:
+        doc_id_base: ID shared by all chunks of the paper
+        total_chunks: Number of chunks in the paper
+
+    Returns:
+        List of metadata dictionaries, one per chunk
+    """
+    return [{"doc_id_base": doc_id_base, "chunk_index": i} for i in range(total_chunks)]
+
+
+def find_existing_paper(
+    paper_store: PaperStore,
+    vector_store: VectorStoreBackend,
+    content_hash: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Find a previously ingested paper by the hash of its file contents.
+
+    Args:
+        paper_store: Store of paper metadata
+        vector_store: Vector store, searched for papers ingested before
+            metadata was kept in the paper store
+        content_hash: SHA-256 hash of the PDF contents
+
+    Returns:
+        Dictionary with the paper's doc_id_base and metadata, or None
+    """
+    return paper_store.find_paper_by_hash(content_hash) or vector_store.find_paper_by_hash(content_hash)
+
+
+class IngestionWorkerPool:
+    """Class for processing ingestion jobs in background threads."""
+
+    def __init__(
+        self,
+        job_store: JobStore,
+        pdf_processor: PDFProcessor,
+        embedding_generator: EmbeddingGenerator,
+        vector_store: VectorStoreBackend,
+        paper_store: PaperStore,
+        lexical_index: Optional[LexicalIndex] = None,
+        centroid_index: Optional[PaperCentroidIndex] = None,
+        num_workers: int = 2,
+        embed_batch_size: int = 256,
+        poll_interval: float = 5.0,
+        progress_interval: float = 0.5,
+        lease_seconds: Optional[float] = None
+    ):
+        """
+        Initialize the ingestion worker pool.
+
+        Args:
+            job_store: Durable store the jobs are claimed from
+            pdf_processor: PDF processor used to parse papers
+            embedding_generator: Embedding generator used to embed chunks
+            vector_store: Vector store the chunks are written to
+            paper_store: Store the paper metadata is written to
+            lexical_index: Optional full-text index the chunk text is written to
+            centroid_index: Optional index each paper's centroid embedding is written to
+            num_workers: Number of jobs processed at the same time
+            embed_batch_size: Number of chunks embedded between progress updates
+            poll_interval: Seconds an idle worker waits before checking the
+                job store again without being notified
+            progress_interval: Minimum seconds between page progress writes
+            lease_seconds: Seconds a running job may go without a heartbeat
+                before it is requeued (None for JOB_LEASE_SECONDS)
+        """
+        self.job_store = job_store
+        self.pdf_processor = pdf_processor
+        self.embedding_generator = embedding_generator
+        self.vector_store = vector_store
+        self.paper_store = paper_store
+        self.lexical_index = lexical_index
+        self.centroid_index = centroid_index
+        self.num_workers = num_workers
+        self.embed_batch_size = embed_batch_size
+        self.poll_interval = poll_interval
+        self.progress_interval = progress_interval
+        self.lease_seconds = config.JOB_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        # Identifies this pool's leases among the pools of other processes
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self, resume: bool = True) -> None:
+        """
+        Start the worker threads.
+
+        Args:
+            resume: Requeue running jobs whose lease has expired, such as
+                those a previous server left running
+        """
+        if self._threads:
+            return
+
+        if resume:
+            self.job_store.requeue_interrupted(self.lease_seconds)
+
+        self._stopping.clear()
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._run, name=f"ingestion-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self) -> None:
+        """Wake idle workers because a job was queued."""
+        self._wakeup.set()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the worker threads once they finish their current job.
+
+        Jobs still running when the timeout expires stay in the running
+        state and are requeued once their lease expires.
+
+        Args:
+            timeout: Seconds to wait for each worker (None to wait indefinitely)
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self) -> None:
+        """Claim and process jobs until the pool is stopped."""
+        while not self._stopping.is_set():
+            try:
+                job = self.job_store.claim_next_job(self.worker_id)
+            except Exception:
+                # Keep the worker alive through transient database errors
+                job = None
+            if job is None:
+                try:
+                    # Pick up jobs of workers that died, in this or another process
+                    self.job_store.requeue_interrupted(self.lease_seconds)
+                except Exception:
+                    pass
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            try:
+                self.process_job(job)
+            except Exception:
+                # The job stays running until its lease expires and is retried
+                logger.exception("Failed to record the outcome of ingestion job %s", job["job_id"])
+
+    def process_job(self, job: Dict[str, Any]) -> None:
+        """
+        Ingest the PDF of a claimed job and record the outcome.
+
+        The job's lease is renewed while it runs. The uploaded file is
+        removed once the outcome is recorded, and kept if recording it fails
+        so the retried job can still read it; if the lease was lost, the job
+        belongs to another worker and is left untouched.
+
+        Args:
+            job: Job dictionary returned by the job store
+        """
+        job_id = job["job_id"]
+        done = threading.Event()
+        lease_lost = threading.Event()
+        keep_alive = threading.Thread(
+            target=self._keep_alive, args=(job_id, done, lease_lost), name=f"job-heartbeat-{job_id}", daemon=True
+        )
+        keep_alive.start()
+
+        try:
+            result, error = self._ingest(job), None
+        except Exception as e:
+            result, error = None, f"Error processing PDF: {str(e)}"
+        finally:
+            done.set()
+            keep_alive.join()
+
+        if lease_lost.is_set():
+            return
+
+        if error is None:
+            self.job_store.complete_job(job_id, result)
+        else:
+            self.job_store.fail_job(job_id, error)
+
+        if os.path.exists(job["file_path"]):
+            os.remove(job["file_path"])
+
+    def _keep_alive(self, job_id: str, done: threading.Event, lease_lost: threading.Event) -> None:
+        """Renew the lease of a job until it is done or the lease is lost."""
+        while not done.wait(self.lease_seconds / 4):
+            try:
+                if not self.job_store.heartbeat(job_id, self.worker_id):
+                    lease_lost.set()
+                    return
+            except Exception:
+                # A missed heartbeat is retried; the lease outlasts several
+                pass
+
+    def _ingest(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Parse, embed and store one uploaded PDF, reporting progress as it goes.
+
+        Args:
+            job: Job dictionary returned by the job store
+
+        Returns:
+            Dictionary describing the ingested paper
+        """
+        job_id = job["job_id"]
+        content_hash = job["content_hash"]
+        original_filename = job["original_filename"]
+
+        # Another job may have ingested the same file while this one waited
+        if content_hash:
+            existing = find_existing_paper(self.paper_store, self.vector_store, content_hash)
+            if existing:
+                existing_metadata = existing["metadata"]
+                return {
+                    "id": existing["doc_id_base"],
+                    "title": existing_metadata.get("title", "Unknown"),
+                    "author": existing_metadata.get("author", "Unknown"),
+                    "page_count": existing_metadata.get("page_count", 0),
+                    "original_filename": existing_metadata.get("original_filename", original_filename),
+                    "status": "duplicate"
+                }
+
+        last_update = [0.0]
+
+        def report_page(pages_parsed: int) -> None:
+            now = time.monotonic()
+            if now - last_update[0] >= self.progress_interval:
+                last_update[0] = now
+                self.job_store.update_progress(job_id, pages_parsed=pages_parsed)
+
+        # Parse the PDF in a single pass
+        parsed = self.pdf_processor.parse_pdf(job["file_path"], on_page=report_page)
+        metadata = parsed["metadata"]
+        # Add original filename to metadata
+        metadata["original_filename"] = original_filename
+        chunks = parsed["chunks"]
+        if not chunks:
+            raise ValueError("No text could be extracted from the PDF")
+        self.job_store.update_progress(
+            job_id,
+            total_pages=len(parsed["page_boundaries"]),
+            pages_parsed=len(parsed["page_boundaries"]),
+            total_chunks=len(chunks),
+            parsed_at=time.time()
+        )
+
+        # Generate embeddings in batches so progress can be reported
+        batches = []
+        for start in range(0, len(chunks), self.embed_batch_size):
+            batch = chunks[start:start + self.embed_batch_size]
+            batches.append(self.embedding_generator.generate_embeddings(batch, as_numpy=True))
+            self.job_store.update_progress(job_id, chunks_embedded=start + len(batch))
+        embeddings = np.concatenate(batches)
+        self.job_store.update_progress(job_id, embedded_at=time.time())
+
+        # Create document IDs from the job ID, so a retried job overwrites
+        # whatever an interrupted attempt already stored
+        doc_id_base = job_id
+        doc_ids = [f"{doc_id_base}_{i}" for i in range(len(chunks))]
+        chunk_metadatas = build_chunk_metadatas(doc_id_base, len(chunks))
+
+        # Store in vector database, the full-text index and the centroid index
+        self.vector_store.add_documents(
+            document_ids=doc_ids,
+            embeddings=embeddings,
+            texts=chunks,
+            metadatas=chunk_metadatas
+        )
+        if self.lexical_index is not None:
+            self.lexical_index.add_chunks(doc_ids, chunks, metadatas=chunk_metadatas)
+        if self.centroid_index is not None:
+            self.centroid_index.add_paper(doc_id_base, embeddings)
+
+        # The paper is only found as a duplicate once its chunks are stored
+        self.paper_store.add_paper(doc_id_base, metadata, content_hash=content_hash, total_chunks=len(chunks))
+
+        return {
+            "id": doc_id_base,
+            "title": metadata.get("title", "Unknown"),
+            "author": metadata.get("author", "Unknown"),
+            "page_count": metadata.get("page_count", 0),
+            "original_filename": original_filename,
+            "status": "success"
+        }
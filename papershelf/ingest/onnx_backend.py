@@ -0,0 +1,367 @@
+"""
+ONNX backend module for PaperShelf.
+
+This module exports sentence transformer models to ONNX, optionally applies
+int8 dynamic quantization, and encodes text with ONNX Runtime on the CPU.
+"""
+
+import argparse
+import inspect
+import json
+import os
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+CONFIG_FILE = "papershelf_onnx.json"
+
+
+def _import_onnxruntime():
+    """Import onnxruntime, which is an optional dependency."""
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError(
+            "The ONNX embedding backend requires onnxruntime. "
+            "Install it with `poetry install --extras onnx`."
+        ) from e
+    return onnxruntime
+
+
+def export_onnx_model(model_name: str, model_dir: str) -> None:
+    """
+    Export a sentence transformer model to ONNX.
+
+    Writes the transformer graph, its tokenizer and the pooling settings
+    needed to reproduce the model's sentence embeddings.
+
+    Args:
+        model_name: Name of the sentence transformer model to export
+        model_dir: Directory to write the exported model to
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize
+
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0].auto_model
+    pooling_config = model[1].get_config_dict()
+
+    if pooling_config.get("pooling_mode_mean_tokens"):
+        pooling_mode = "mean"
+    elif pooling_config.get("pooling_mode_cls_token"):
+        pooling_mode = "cls"
+    else:
+        raise ValueError(f"Unsupported pooling for ONNX export: {pooling_config}")
+
+    os.makedirs(model_dir, exist_ok=True)
+    model.tokenizer.save_pretrained(model_dir)
+
+    sample = model.tokenizer(["PaperShelf ONNX export"], return_tensors="pt")
+    input_names = list(sample.keys())
+
+    class _TransformerOutput(torch.nn.Module):
+        """Wrapper returning only the token embeddings."""
+
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(input_names, inputs))).last_hidden_state
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    # Newer torch releases default to the dynamo exporter; the TorchScript one
+    # handles dynamic axes for these models without extra dependencies
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs["dynamo"] = False
+
+    with torch.no_grad():
+        torch.onnx.export(
+            _TransformerOutput().eval(),
+            tuple(sample[name] for name in input_names),
+            os.path.join(model_dir, MODEL_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            **export_kwargs
+        )
+
+    with open(os.path.join(model_dir, CONFIG_FILE), "w") as f:
+        json.dump({
+            "model_name": model_name,
+            "pooling_mode": pooling_mode,
+            "normalize": any(isinstance(module, Normalize) for module in model),
+            "dimension": model.get_sentence_embedding_dimension(),
+            "max_seq_length": model.get_max_seq_length()
+        }, f)
+
+
+def quantize_onnx_model(model_dir: str) -> None:
+    """
+    Apply int8 dynamic quantization to an exported ONNX model.
+
+    Args:
+        model_dir: Directory containing the exported model
+    """
+    _import_onnxruntime()
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(
+        os.path.join(model_dir, MODEL_FILE),
+        os.path.join(model_dir, QUANTIZED_MODEL_FILE),
+        weight_type=QuantType.QInt8
+    )
+
+
+def ensure_onnx_model(model_name: str, cache_dir: str = "./onnx_models", quantize: bool = True) -> str:
+    """
+    Make sure an exported model exists in the local cache.
+
+    Args:
+        model_name: Name of the sentence transformer model
+        cache_dir: Directory where exported models are cached
+        quantize: Whether the int8 quantized model is needed
+
+    Returns:
+        Directory containing the exported model
+    """
+    model_dir = os.path.join(cache_dir, model_name.strip("/").replace("/", "__"))
+
+    if not os.path.exists(os.path.join(model_dir, CONFIG_FILE)):
+        export_onnx_model(model_name, model_dir)
+    if quantize and not os.path.exists(os.path.join(model_dir, QUANTIZED_MODEL_FILE)):
+        quantize_onnx_model(model_dir)
+
+    return model_dir
+
+
+class OnnxEncoder:
+    """Class for encoding text with an exported ONNX model."""
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = True,
+        num_threads: Optional[int] = None,
+        sort_by_length: bool = True
+    ):
+        """
+        Initialize the ONNX encoder.
+
+        Args:
+            model_dir: Directory containing an exported model
+            quantized: Whether to load the int8 quantized model
+            num_threads: Number of intra-op threads (None for the runtime default)
+            sort_by_length: Whether to batch sentences of similar token length
+                together to reduce padding
+        """
+        onnxruntime = _import_onnxruntime()
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(model_dir, CONFIG_FILE)) as f:
+            self.config = json.load(f)
+
+        self.model_dir = model_dir
+        self.quantized = quantized
+        self.sort_by_length = sort_by_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, QUANTIZED_MODEL_FILE if quantized else MODEL_FILE),
+            options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    @classmethod
+    def from_pretrained(
+        cls,
+        model_name: str,
+        cache_dir: str = "./onnx_models",
+        quantize: bool = True,
+        num_threads: Optional[int] = None,
+        sort_by_length: bool = True
+    ) -> "OnnxEncoder":
+        """
+        Load a model from the local cache, exporting it on first use.
+
+        Args:
+            model_name: Name of the sentence transformer model
+            cache_dir: Directory where exported models are cached
+            quantize: Whether to use an int8 dynamically quantized model
+            num_threads: Number of intra-op threads (None for the runtime default)
+            sort_by_length: Whether to batch sentences of similar token length together
+
+        Returns:
+            OnnxEncoder instance
+        """
+        model_dir = ensure_onnx_model(model_name, cache_dir=cache_dir, quantize=quantize)
+        return cls(model_dir, quantized=quantize, num_threads=num_threads, sort_by_length=sort_by_length)
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        convert_to_tensor: bool = False,
+        **kwargs: Any
+    ) -> np.ndarray:
+        """
+        Encode sentences into embeddings.
+
+        Mirrors the parts of SentenceTransformer.encode used by PaperShelf.
+
+        Args:
+            sentences: A single sentence or a list of sentences
+            batch_size: Number of sentences per inference run
+            normalize_embeddings: Whether to scale embeddings to unit length
+            convert_to_tensor: Unsupported, must be False
+
+        Returns:
+            Float32 array of embeddings
+        """
+        if convert_to_tensor:
+            raise ValueError("The ONNX backend only returns NumPy arrays")
+
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        features = self.tokenizer(
+            sentences,
+            truncation=True,
+            max_length=self.get_max_seq_length()
+        )
+        input_ids = features["input_ids"]
+
+        # Batch texts of similar token length together so little padding is
+        # needed, then write each batch back to its original positions
+        if self.sort_by_length:
+            order = np.argsort([len(ids) for ids in input_ids], kind="stable")
+        else:
+            order = np.arange(len(input_ids))
+
+        embeddings = np.empty((len(sentences), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(sentences), batch_size):
+            indices = order[start:start + batch_size]
+            embeddings[indices] = self._encode_batch(
+                {name: [features[name][i] for i in indices] for name in self.input_names}
+            )
+
+        if normalize_embeddings or self.config["normalize"]:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, features: Dict[str, List[List[int]]]) -> np.ndarray:
+        """
+        Pad one batch of tokenized sentences, run the model and pool token embeddings.
+
+        Args:
+            features: Model inputs for each sentence, without padding
+
+        Returns:
+            Float32 array of pooled embeddings
+        """
+        lengths = [len(ids) for ids in features["input_ids"]]
+        padded_length = max(lengths)
+
+        feeds = {}
+        for name, values in features.items():
+            pad_value = self.tokenizer.pad_token_id if name == "input_ids" else 0
+            array = np.full((len(values), padded_length), pad_value, dtype=np.int64)
+            for row, value in enumerate(values):
+                array[row, :len(value)] = value
+            feeds[name] = array
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        if self.config["pooling_mode"] == "cls":
+            return token_embeddings[:, 0]
+
+        mask = (np.arange(padded_length)[None, :] < np.array(lengths)[:, None]).astype(np.float32)[..., None]
+        summed = (token_embeddings * mask).sum(axis=1)
+        return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """Get the dimension of the sentence embeddings."""
+        return self.config["dimension"]
+
+    def get_max_seq_length(self) -> int:
+        """Get the maximum number of tokens per sentence."""
+        return self.config["max_seq_length"]
+
+
+def check_parity(reference, candidate, texts: List[str]) -> Dict[str, float]:
+    """
+    Measure how far a candidate backend drifts from a reference backend.
+
+    Args:
+        reference: Embedding generator used as ground truth (usually torch)
+        candidate: Embedding generator being checked (usually ONNX)
+        texts: Texts to embed with both generators
+
+    Returns:
+        Dictionary with the mean and minimum cosine similarity between the
+        two backends' embeddings and the largest cosine drift (1 - minimum)
+    """
+    expected = np.asarray(reference.generate_embeddings(texts, as_numpy=True))
+    actual = np.asarray(candidate.generate_embeddings(texts, as_numpy=True))
+
+    cosine = (expected * actual).sum(axis=1) / np.clip(
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1), 1e-12, None
+    )
+
+    return {
+        "texts": len(texts),
+        "mean_cosine": float(cosine.mean()),
+        "min_cosine": float(cosine.min()),
+        "max_cosine_drift": float(1.0 - cosine.min())
+    }
+
+
+def main():
+    """Report cosine drift of the ONNX backend against the torch backend."""
+    from papershelf.ingest.embedding_generator import EmbeddingGenerator
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Sentence transformer model name")
+    parser.add_argument("--cache-dir", default="./onnx_models", help="Directory for exported models")
+    parser.add_argument("--no-quantize", action="store_true", help="Check the unquantized model")
+    parser.add_argument("texts", nargs="*", help="Texts to embed (defaults to built-in samples)")
+    args = parser.parse_args()
+
+    texts = args.texts or [
+        "Transformers rely on self-attention to model long-range dependencies.",
+        "We evaluate on the ImageNet dataset and report top-1 accuracy.",
+        "Equation 3 defines the loss as the negative log-likelihood.",
+        "This work is licensed under a Creative Commons Attribution 4.0 License."
+    ]
+
+    reference = EmbeddingGenerator(model_name=args.model)
+    candidate = EmbeddingGenerator(
+        model_name=args.model,
+        backend="onnx",
+        onnx_cache_dir=args.cache_dir,
+        onnx_quantize=not args.no_quantize
+    )
+
+    for key, value in check_parity(reference, candidate, texts).items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,46 +5,182 @@ This module provides functionality to extract text from PDF files
 and prepare it for embedding generation.
 """
 
+import hashlib
 import os
-from typing import Dict, List, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from pypdf import PdfReader
 
 
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[str]:
+    """
+    Extract the text of pages [start, end) from a PDF file.
+
+    Runs inside a worker process, so it opens its own reader.
+
+    Args:
+        pdf_path: Path to the PDF file
+        start: Index of the first page to extract
+        end: Index one past the last page to extract
+
+    Returns:
+        List of page texts, in page order
+    """
+    reader = PdfReader(pdf_path)
+    return [reader.pages[i].extract_text() for i in range(start, end)]
+
+
 class PDFProcessor:
     """Class for processing PDF files and extracting text."""
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        max_workers: int = 1,
+        pages_per_task: int = 32,
+        max_tasks_per_worker: Optional[int] = 50
+    ):
         """
         Initialize the PDF processor.
 
         Args:
             chunk_size: The size of text chunks for processing
             chunk_overlap: The overlap between consecutive chunks
+            max_workers: Number of processes used for page extraction
+                (1 extracts pages in the calling process)
+            pages_per_task: Number of consecutive pages handed to a worker at once
+            max_tasks_per_worker: Number of tasks a worker runs before it is
+                replaced, which bounds pypdf memory growth (None or 0 to disable)
         """
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.max_workers = max_workers
+        self.pages_per_task = pages_per_task
+        # ProcessPoolExecutor rejects 0, so it also means no limit
+        self.max_tasks_per_worker = max_tasks_per_worker or None
+        self._executor: Optional[ProcessPoolExecutor] = None
 
-    def extract_text(self, pdf_path: str) -> str:
+    def _get_executor(self) -> ProcessPoolExecutor:
         """
-        Extract text from a PDF file.
+        Get the process pool used for parallel extraction, creating it if needed.
+
+        Returns:
+            ProcessPoolExecutor instance
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                max_tasks_per_child=self.max_tasks_per_worker
+            )
+        return self._executor
+
+    def _page_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        """
+        Split a document's pages into contiguous ranges for the worker pool.
+
+        Args:
+            page_count: Number of pages in the document
+
+        Returns:
+            List of (start, end) page ranges covering every page in order
+        """
+        step = max(1, self.pages_per_task)
+        return [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+    def extract_pages(self, pdf_path: str) -> List[str]:
+        """
+        Extract the text of each page of a PDF file.
+
+        When max_workers is greater than 1 and the document spans more than one
+        page range, the ranges are extracted in parallel across a process pool.
 
         Args:
             pdf_path: Path to the PDF file
 
         Returns:
-            Extracted text as a string
+            List of page texts, in page order
+        """
+        return list(self.iter_pages(pdf_path))
+
+    def iter_pages(self, pdf_path: str) -> Iterator[str]:
+        """
+        Lazily extract the text of each page of a PDF file.
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Yields:
+            Page texts, in page order
+        """
+        return self._iter_pages(self._open(pdf_path), pdf_path)
+
+    def _open(self, pdf_path: str) -> PdfReader:
+        """
+        Open a PDF file for reading.
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Returns:
+            PdfReader instance
         """
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
 
-        reader = PdfReader(pdf_path)
-        text = ""
-        
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-            
-        return text
+        return PdfReader(pdf_path)
+
+    def _iter_pages(self, reader: PdfReader, pdf_path: str) -> Iterator[str]:
+        """
+        Lazily extract the text of each page using an already opened reader.
+
+        In parallel mode at most two page ranges per worker are in flight, so
+        only a bounded number of extracted pages is held at any time.
+
+        Args:
+            reader: Reader opened on pdf_path
+            pdf_path: Path to the PDF file, passed to pool workers
+
+        Yields:
+            Page texts, in page order
+        """
+        ranges = self._page_ranges(len(reader.pages))
+
+        if self.max_workers <= 1 or len(ranges) <= 1:
+            for page in reader.pages:
+                yield page.extract_text()
+            return
+
+        executor = self._get_executor()
+        pending = deque()
+        ranges = iter(ranges)
+
+        for start, end in islice(ranges, 2 * self.max_workers):
+            pending.append(executor.submit(_extract_page_range, pdf_path, start, end))
+
+        while pending:
+            pages = pending.popleft().result()
+            for start, end in islice(ranges, 1):
+                pending.append(executor.submit(_extract_page_range, pdf_path, start, end))
+            yield from pages
+
+    def extract_text(self, pdf_path: str) -> str:
+        """
+        Extract text from a PDF file.
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Returns:
+            Extracted text as a string
+        """
+        return "".join(page + "\n" for page in self.iter_pages(pdf_path))
 
     def chunk_text(self, text: str) -> List[str]:
         """
@@ -56,15 +192,39 @@ class PDFProcessor:
         Returns:
             List of text chunks
         """
-        chunks = []
+        return list(self.iter_chunks([text], separator=""))
+
+    def iter_chunks(self, pages: Iterable[str], separator: str = "\n") -> Iterator[str]:
+        """
+        Incrementally split a stream of pages into chunks.
+
+        Chunks are chunk_size characters long, start every
+        chunk_size - chunk_overlap characters and run across page boundaries.
+        Only the text of the chunk being built is buffered.
+
+        Args:
+            pages: Iterable of page texts, in page order
+            separator: Text appended after each page
+
+        Yields:
+            Text chunks
+        """
+        step = self.chunk_size - self.chunk_overlap
+        buffer = ""
         start = 0
-        
-        while start < len(text):
-            end = min(start + self.chunk_size, len(text))
-            chunks.append(text[start:end])
-            start += self.chunk_size - self.chunk_overlap
-            
-        return chunks
+
+        for page in pages:
+            buffer = buffer[start:] + page + separator
+            start = 0
+
+            # Only emit a chunk once text after it is known to exist, so the
+            # final chunk is never a repeat of the previous chunk's overlap
+            while len(buffer) - start > self.chunk_size:
+                yield buffer[start:start + self.chunk_size]
+                start += step
+
+        if len(buffer) > start:
+            yield buffer[start:]
 
     def process_pdf(self, pdf_path: str) -> List[str]:
         """
@@ -76,25 +236,89 @@ class PDFProcessor:
         Returns:
             List of text chunks from the PDF
         """
-        text = self.extract_text(pdf_path)
-        chunks = self.chunk_text(text)
-        return chunks
+        return list(self.iter_chunks(self.iter_pages(pdf_path)))
 
-    def extract_metadata(self, pdf_path: str) -> Dict[str, str]:
+    def parse_pdf(self, pdf_path: str, on_page: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
         """
-        Extract metadata from a PDF file.
+        Parse a PDF file once and return its metadata, chunks and page map.
+
+        Equivalent to calling extract_metadata and process_pdf, but the file is
+        only opened and parsed a single time.
 
         Args:
             pdf_path: Path to the PDF file
+            on_page: Optional callback given the number of pages parsed so far,
+                called after each page
 
         Returns:
-            Dictionary of metadata
+            Dictionary with "metadata", "chunks" and "page_boundaries" (the
+            character offset in the extracted text where each page starts)
+        """
+        reader = self._open(pdf_path)
+        metadata = self._read_metadata(reader, pdf_path)
+        page_boundaries = []
+
+        def track_pages(pages: Iterable[str]) -> Iterator[str]:
+            offset = 0
+            for page in pages:
+                page_boundaries.append(offset)
+                offset += len(page) + 1
+                if on_page is not None:
+                    on_page(len(page_boundaries))
+                yield page
+
+        chunks = list(self.iter_chunks(track_pages(self._iter_pages(reader, pdf_path))))
+
+        return {
+            "metadata": metadata,
+            "chunks": chunks,
+            "page_boundaries": page_boundaries
+        }
+
+    def compute_content_hash(self, pdf_path: str) -> str:
+        """
+        Compute the SHA-256 hash of a PDF file's contents.
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Returns:
+            Hex digest of the file contents
         """
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
 
-        reader = PdfReader(pdf_path)
-        metadata = reader.metadata
+        digest = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+
+        return digest.hexdigest()
+
+    def extract_metadata(self, pdf_path: str) -> Dict[str, Any]:
+        """
+        Extract metadata from a PDF file.
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Returns:
+            Dictionary of metadata
+        """
+        return self._read_metadata(self._open(pdf_path), pdf_path)
+
+    def _read_metadata(self, reader: PdfReader, pdf_path: str) -> Dict[str, Any]:
+        """
+        Read metadata using an already opened reader.
+
+        Args:
+            reader: Reader opened on pdf_path
+            pdf_path: Path to the PDF file
+
+        Returns:
+            Dictionary of metadata
+        """
+        metadata = reader.metadata or {}
         
         result = {
             "title": metadata.get("/Title", os.path.basename(pdf_path)),
@@ -107,4 +331,10 @@ class PDFProcessor:
             "page_count": len(reader.pages)
         }
         
-        return result
\ No newline at end of file
+        return result
+
+    def close(self) -> None:
+        """Shut down the extraction worker pool, if one was started."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+PDF sources module for PaperShelf.
+
+This module finds the PDFs in a directory or zip archive and parses them one
+at a time. It only depends on the PDF processor, so the worker processes of
+a bulk ingestion run start quickly.
+"""
+
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from papershelf.ingest.pdf_processor import PDFProcessor
+
+
+class PdfSource(NamedTuple):
+    """A PDF to ingest, either a file or a member of a zip archive."""
+
+    key: str
+    path: str
+    member: Optional[str] = None
+
+
+def find_pdf_sources(path: str) -> List[PdfSource]:
+    """
+    List the PDFs in a directory (recursively) or a zip archive.
+
+    Args:
+        path: Path to a directory or zip archive
+
+    Returns:
+        List of sources, keyed by their path relative to the directory or
+        their name inside the archive
+    """
+    sources = []
+
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(".pdf"):
+                    file_path = os.path.join(root, name)
+                    sources.append(PdfSource(os.path.relpath(file_path, path), file_path))
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".pdf"):
+                    sources.append(PdfSource(info.filename, path, info.filename))
+    else:
+        raise ValueError(f"Not a directory or zip archive: {path}")
+
+    return sources
+
+
+def _parse_file(processor: PDFProcessor, source: PdfSource, pdf_path: str) -> Dict[str, Any]:
+    """Hash and parse one PDF file on disk."""
+    content_hash = processor.compute_content_hash(pdf_path)
+    parsed = processor.parse_pdf(pdf_path)
+
+    metadata = parsed["metadata"]
+    original_filename = os.path.basename(source.member or source.path)
+    metadata["original_filename"] = original_filename
+    metadata["file_path"] = os.path.join(source.path, source.member) if source.member else source.path
+
+    return {
+        "key": source.key,
+        "content_hash": content_hash,
+        "metadata": metadata,
+        "chunks": parsed["chunks"]
+    }
+
+
+def parse_source(source: PdfSource, chunk_size: int, chunk_overlap: int) -> Dict[str, Any]:
+    """
+    Parse one PDF in a worker process.
+
+    Archive members are extracted to a temporary file first.
+
+    Args:
+        source: The PDF to parse
+        chunk_size: Maximum size of each chunk in characters
+        chunk_overlap: Number of characters to overlap between chunks
+
+    Returns:
+        Dictionary with the source "key", "content_hash", "metadata" and
+        "chunks", or with the "key" and an "error" if parsing failed
+    """
+    processor = PDFProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    try:
+        if source.member is None:
+            return _parse_file(processor, source, source.path)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = os.path.join(temp_dir, os.path.basename(source.member))
+            with zipfile.ZipFile(source.path) as archive:
+                with archive.open(source.member) as src, open(pdf_path, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+            return _parse_file(processor, source, pdf_path)
+
+    except Exception as e:
+        return {"key": source.key, "error": str(e)}
@@ -1,17 +1,24 @@
 """
 Main entry point for the PaperShelf application.
 
-This module provides a convenient way to start the PaperShelf API server.
+This module provides a convenient way to start the PaperShelf API server
+and to bulk-ingest papers from the command line.
 """
 
+import argparse
+import os
+import sys
+from typing import List, Optional
+
 import uvicorn
 
-from papershelf.api.app import create_app
 from papershelf.utils.config import config
 
 
-def main():
+def serve() -> None:
     """Run the PaperShelf API server."""
+    from papershelf.api.app import create_app
+
     app = create_app()
     uvicorn.run(
         app,
@@ -21,5 +28,370 @@ def main():
     )
 
 
+def ingest(args: argparse.Namespace) -> int:
+    """
+    Ingest every PDF in a directory or zip archive.
+
+    Args:
+        args: Parsed command line arguments of the ingest command
+
+    Returns:
+        Process exit code
+    """
+    from papershelf.db.centroid_index import PaperCentroidIndex
+    from papershelf.db.lexical_index import LexicalIndex
+    from papershelf.db.paper_store import PaperStore
+    from papershelf.db.vector_backend import create_vector_store
+    from papershelf.ingest.bulk_ingest import BulkIngestPipeline
+    from papershelf.ingest.embedding_cache import EmbeddingCache
+    from papershelf.ingest.embedding_generator import EmbeddingGenerator
+
+    source = os.path.abspath(args.source)
+    checkpoint = args.checkpoint or f"{os.path.basename(source.rstrip(os.sep))}.ingest-checkpoint.jsonl"
+
+    embedding_cache = (
+        EmbeddingCache(config.EMBEDDING_CACHE_PATH, max_entries=config.EMBEDDING_CACHE_MAX_ENTRIES)
+        if config.EMBEDDING_CACHE_PATH else None
+    )
+    embedding_generator = EmbeddingGenerator(
+        model_name=config.EMBEDDING_MODEL,
+        cache=embedding_cache,
+        batch_size=config.EMBEDDING_BATCH_SIZE,
+        normalize_embeddings=config.EMBEDDING_NORMALIZE,
+        backend=config.EMBEDDING_BACKEND,
+        onnx_cache_dir=config.ONNX_CACHE_DIR,
+        onnx_quantize=config.ONNX_QUANTIZE,
+        num_processes=config.EMBEDDING_PROCESSES,
+        threads_per_process=config.EMBEDDING_THREADS_PER_PROCESS,
+        sort_by_length=config.EMBEDDING_SORT_BY_LENGTH
+    )
+    vector_store = create_vector_store(
+        config.VECTOR_BACKEND,
+        persist_directory=config.DB_PERSIST_DIRECTORY,
+        write_batch_size=config.VECTOR_WRITE_BATCH_SIZE or None,
+        hnsw_params=config.get_hnsw_params()
+    )
+
+    pipeline = BulkIngestPipeline(
+        embedding_generator=embedding_generator,
+        vector_store=vector_store,
+        paper_store=PaperStore(config.PAPER_DB_PATH),
+        lexical_index=LexicalIndex(config.LEXICAL_INDEX_PATH),
+        centroid_index=PaperCentroidIndex(config.CENTROID_INDEX_PATH),
+        parse_workers=args.parse_workers,
+        chunk_size=config.CHUNK_SIZE,
+        chunk_overlap=config.CHUNK_OVERLAP,
+        embed_batch_size=args.embed_batch_size,
+        queue_size=args.queue_size,
+        progress_interval=args.progress_interval
+    )
+
+    try:
+        stats = pipeline.run(source, checkpoint)
+    except KeyboardInterrupt:
+        print(f"Interrupted; rerun to resume from {checkpoint}", file=sys.stderr)
+        return 130
+    except (RuntimeError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    finally:
+        vector_store.close()
+        embedding_generator.close()
+        if embedding_cache is not None:
+            embedding_cache.close()
+
+    print(
+        f"Ingested {stats['ingested']} of {stats['files']} PDFs "
+        f"({stats['skipped']} already done, {stats['duplicates']} duplicate, {stats['failed']} failed), "
+        f"{stats['chunks']} chunks in {stats['elapsed_seconds']:.1f}s "
+        f"({stats['files_per_second']:.1f} files/s, {stats['chunks_per_second']:.0f} chunks/s)"
+    )
+    return 1 if stats["failed"] else 0
+
+
+def backfill_papers() -> int:
+    """
+    Add papers ingested with per-chunk metadata to the papers catalog.
+
+    Returns:
+        Process exit code
+    """
+    from papershelf.db.paper_store import PaperStore
+    from papershelf.db.vector_backend import create_vector_store
+
+    paper_store = PaperStore(config.PAPER_DB_PATH)
+    vector_store = create_vector_store(config.VECTOR_BACKEND, persist_directory=config.DB_PERSIST_DIRECTORY)
+    added = paper_store.backfill_from_vector_store(vector_store)
+    print(f"Added {added} papers to the catalog ({paper_store.count_papers()} in total)")
+    return 0
+
+
+def backfill_lexical_index() -> int:
+    """
+    Add the text of every chunk in the vector database to the lexical index.
+
+    Returns:
+        Process exit code
+    """
+    from papershelf.db.lexical_index import LexicalIndex
+    from papershelf.db.vector_backend import create_vector_store
+
+    lexical_index = LexicalIndex(config.LEXICAL_INDEX_PATH)
+    vector_store = create_vector_store(config.VECTOR_BACKEND, persist_directory=config.DB_PERSIST_DIRECTORY)
+    indexed = lexical_index.backfill_from_vector_store(vector_store)
+    print(f"Indexed {indexed} chunks ({lexical_index.count()} in total)")
+    return 0
+
+
+def backfill_centroids() -> int:
+    """
+    Compute the centroid embedding of every paper in the vector database.
+
+    Returns:
+        Process exit code
+    """
+    from papershelf.db.centroid_index import PaperCentroidIndex
+    from papershelf.db.vector_backend import create_vector_store
+
+    centroid_index = PaperCentroidIndex(config.CENTROID_INDEX_PATH)
+    vector_store = create_vector_store(config.VECTOR_BACKEND, persist_directory=config.DB_PERSIST_DIRECTORY)
+    stored = centroid_index.backfill_from_vector_store(vector_store)
+    print(f"Stored centroids of {stored} papers ({centroid_index.count()} in total)")
+    return 0
+
+
+def tune_index(args: argparse.Namespace) -> int:
+    """
+    Report recall@k and search latency of candidate HNSW settings.
+
+    Args:
+        args: Parsed command line arguments of the tune-index command
+
+    Returns:
+        Process exit code
+    """
+    from papershelf.db.index_tuning import tune_index as run_tuning
+    from papershelf.db.vector_backend import create_vector_store
+
+    try:
+        report = run_tuning(
+            create_vector_store(config.VECTOR_BACKEND, persist_directory=config.DB_PERSIST_DIRECTORY),
+            m_values=args.m,
+            construction_ef_values=args.construction_ef,
+            search_ef_values=args.search_ef,
+            k=args.k,
+            num_queries=args.queries,
+            max_chunks=args.max_chunks,
+            num_threads=args.build_threads
+        )
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    print(
+        f"{report['chunks']} chunks, {report['queries']} held-out queries, "
+        f"current index {report['current']}"
+    )
+    print(f"Exact search: p50 {report['exact']['p50_ms']:.2f} ms, p99 {report['exact']['p99_ms']:.2f} ms")
+    recall_header = f"recall@{report['k']}"
+    print(
+        f"{'M':>4} {'construction_ef':>15} {'search_ef':>9} {recall_header:>9} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'build s':>8}"
+    )
+    for result in report["results"]:
+        print(
+            f"{result['M']:>4} {result['construction_ef']:>15} {result['search_ef']:>9} "
+            f"{result['recall']:>9.4f} {result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f} "
+            f"{result['build_seconds']:>8.1f}"
+        )
+    return 0
+
+
+def benchmark_two_stage(args: argparse.Namespace) -> int:
+    """
+    Report recall@k and search latency of two-stage retrieval.
+
+    Args:
+        args: Parsed command line arguments of the benchmark-two-stage command
+
+    Returns:
+        Process exit code
+    """
+    from papershelf.db.centroid_index import PaperCentroidIndex
+    from papershelf.db.index_tuning import benchmark_two_stage as run_benchmark
+    from papershelf.db.vector_backend import create_vector_store
+
+    try:
+        report = run_benchmark(
+            create_vector_store(config.VECTOR_BACKEND, persist_directory=config.DB_PERSIST_DIRECTORY),
+            PaperCentroidIndex(config.CENTROID_INDEX_PATH),
+            paper_counts=args.papers,
+            k=args.k,
+            num_queries=args.queries,
+            max_chunks=args.max_chunks
+        )
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    print(
+        f"{report['papers']} papers, {report['queries']} queries sampled from {report['chunks']} chunks, "
+        f"{config.VECTOR_BACKEND} backend"
+    )
+    print(f"Full search: p50 {report['full']['p50_ms']:.2f} ms, p99 {report['full']['p99_ms']:.2f} ms")
+    recall_header = f"recall@{report['k']}"
+    print(f"{'papers':>6} {recall_header:>9} {'p50 ms':>8} {'p99 ms':>8} {'centroid p50 ms':>15}")
+    for result in report["results"]:
+        print(
+            f"{result['papers']:>6} {result['recall']:>9.4f} {result['p50_ms']:>8.3f} "
+            f"{result['p99_ms']:>8.3f} {result['centroid_p50_ms']:>15.3f}"
+        )
+    return 0
+
+
+def rebuild_index() -> int:
+    """
+    Rebuild the vector index: with the configured HNSW settings for the
+    chroma backend, or without deleted rows for the numpy backend.
+
+    Returns:
+        Process exit code
+    """
+    from papershelf.db.vector_backend import create_vector_store
+
+    vector_store = create_vector_store(
+        config.VECTOR_BACKEND,
+        persist_directory=config.DB_PERSIST_DIRECTORY,
+        hnsw_params=config.get_hnsw_params()
+    )
+    if config.VECTOR_BACKEND == "numpy":
+        removed = vector_store.compact()
+        print(f"Compacted the vectors file, removing {removed} deleted rows")
+    else:
+        copied = vector_store.rebuild_index()
+        print(f"Rebuilt the index of {copied} chunks with {vector_store.get_index_params()}")
+    return 0
+
+
+def _int_list(text: str) -> List[int]:
+    """Parse a comma-separated list of integers from the command line."""
+    try:
+        return [int(value) for value in text.split(",") if value.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got {text!r}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the PaperShelf command line interface.
+
+    Without a command, the API server is started.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv)
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(prog="papershelf", description="PaperShelf academic paper RAG system")
+    subparsers = parser.add_subparsers(dest="command")
+
+    subparsers.add_parser("serve", help="Run the API server (the default)")
+
+    ingest_parser = subparsers.add_parser("ingest", help="Ingest every PDF in a directory or zip archive")
+    ingest_parser.add_argument("source", help="Directory (searched recursively) or zip archive of PDFs")
+    ingest_parser.add_argument(
+        "--checkpoint",
+        help="Checkpoint file recording finished PDFs (default: <source name>.ingest-checkpoint.jsonl)"
+    )
+    ingest_parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=max(1, (os.cpu_count() or 2) - 1),
+        help="Number of processes parsing PDFs"
+    )
+    ingest_parser.add_argument(
+        "--embed-batch-size",
+        type=int,
+        default=256,
+        help="Number of chunks gathered across papers for each embedding call"
+    )
+    ingest_parser.add_argument("--queue-size", type=int, default=8, help="Papers buffered between pipeline stages")
+    ingest_parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress reports")
+
+    subparsers.add_parser(
+        "backfill-papers",
+        help="Add papers ingested before the papers catalog existed to the catalog"
+    )
+    subparsers.add_parser(
+        "backfill-lexical-index",
+        help="Add chunks ingested before the lexical index existed to the index"
+    )
+
+    subparsers.add_parser(
+        "backfill-centroids",
+        help="Compute the centroid embedding of every paper for two-stage retrieval"
+    )
+
+    tune_parser = subparsers.add_parser(
+        "tune-index",
+        help="Measure recall@k and search latency of candidate HNSW settings on the stored chunks"
+    )
+    tune_parser.add_argument("--m", type=_int_list, default=[8, 16, 32], help="Values of M to try")
+    tune_parser.add_argument(
+        "--construction-ef", type=_int_list, default=[100, 200], help="Values of construction_ef to try"
+    )
+    tune_parser.add_argument(
+        "--search-ef", type=_int_list, default=[10, 20, 50, 100], help="Values of search_ef to try"
+    )
+    tune_parser.add_argument("--k", type=int, default=10, help="Number of neighbours compared per query")
+    tune_parser.add_argument("--queries", type=int, default=200, help="Number of chunks held out as queries")
+    tune_parser.add_argument("--max-chunks", type=int, help="Maximum number of chunks read (default: all)")
+    tune_parser.add_argument(
+        "--build-threads",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Threads used to build each candidate index"
+    )
+
+    benchmark_parser = subparsers.add_parser(
+        "benchmark-two-stage",
+        help="Measure recall@k and search latency of two-stage retrieval on the stored chunks"
+    )
+    benchmark_parser.add_argument(
+        "--papers", type=_int_list, default=[5, 10, 20, 50], help="Numbers of papers searched in the second stage"
+    )
+    benchmark_parser.add_argument("--k", type=int, default=10, help="Number of neighbours compared per query")
+    benchmark_parser.add_argument("--queries", type=int, default=200, help="Number of chunks used as queries")
+    benchmark_parser.add_argument(
+        "--max-chunks", type=int, help="Maximum number of chunks the queries are sampled from (default: all)"
+    )
+
+    subparsers.add_parser(
+        "rebuild-index",
+        help="Rebuild the vector index with the HNSW_* settings, or compact the numpy backend (stop the server first)"
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        return ingest(args)
+    if args.command == "backfill-papers":
+        return backfill_papers()
+    if args.command == "backfill-lexical-index":
+        return backfill_lexical_index()
+    if args.command == "backfill-centroids":
+        return backfill_centroids()
+    if args.command == "tune-index":
+        return tune_index(args)
+    if args.command == "benchmark-two-stage":
+        return benchmark_two_stage(args)
+    if args.command == "rebuild-index":
+        return rebuild_index()
+
+    serve()
+    return 0
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
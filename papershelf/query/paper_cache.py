@@ -0,0 +1,107 @@
+"""
+Paper metadata cache module for PaperShelf.
+
+This module provides a bounded, thread-safe in-memory LRU cache in front of
+the paper metadata store, so joining metadata onto retrieved chunks does not
+hit the database for papers that are queried often.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from papershelf.db.paper_store import PaperStore
+
+
+class PaperMetadataCache:
+    """Class for caching paper metadata in memory."""
+
+    def __init__(self, paper_store: PaperStore, capacity: int = 4096):
+        """
+        Initialize the paper metadata cache.
+
+        Args:
+            paper_store: Store the metadata is loaded from
+            capacity: Maximum number of papers kept in the cache
+        """
+        self.paper_store = paper_store
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, doc_id_bases: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the metadata of several papers, loading the uncached ones with one query.
+
+        Papers missing from the store are not cached, so a paper whose
+        metadata is written after its chunks is found on a later lookup.
+
+        Args:
+            doc_id_bases: IDs of the papers
+
+        Returns:
+            Dictionary mapping each ID that exists to the paper's metadata
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        missing = []
+
+        with self._lock:
+            for doc_id_base in dict.fromkeys(doc_id_bases):
+                entry = self._entries.get(doc_id_base)
+                if entry is None:
+                    missing.append(doc_id_base)
+                    self.misses += 1
+                else:
+                    self._entries.move_to_end(doc_id_base)
+                    found[doc_id_base] = entry
+                    self.hits += 1
+
+        if not missing:
+            return found
+
+        loaded = self.paper_store.get_papers(missing)
+        found.update(loaded)
+
+        if self.capacity > 0:
+            with self._lock:
+                for doc_id_base, metadata in loaded.items():
+                    self._entries[doc_id_base] = metadata
+                    self._entries.move_to_end(doc_id_base)
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+
+        return found
+
+    def invalidate(self, doc_id_base: str) -> None:
+        """
+        Remove a paper from the cache, e.g. after it is deleted.
+
+        Args:
+            doc_id_base: ID of the paper
+        """
+        with self._lock:
+            self._entries.pop(doc_id_base, None)
+
+    def clear(self) -> None:
+        """Remove all cached papers."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the cache.
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "capacity": self.capacity
+            }
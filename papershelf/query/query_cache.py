@@ -0,0 +1,111 @@
+"""
+Query embedding cache module for PaperShelf.
+
+This module provides a bounded, thread-safe in-memory LRU cache of query
+embeddings so repeated questions skip the embedding model.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class QueryEmbeddingCache:
+    """Class for caching query embeddings in memory."""
+
+    def __init__(self, capacity: int = 1024, ttl: Optional[float] = 3600.0):
+        """
+        Initialize the query embedding cache.
+
+        Args:
+            capacity: Maximum number of queries kept in the cache
+            ttl: Seconds an embedding stays valid (None for no expiry)
+        """
+        self.capacity = capacity
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        Normalize a query so trivially different spellings share an entry.
+
+        Args:
+            query: The query text
+
+        Returns:
+            The query with whitespace collapsed and case folded
+        """
+        return " ".join(query.split()).casefold()
+
+    def get(self, query: str) -> Optional[List[float]]:
+        """
+        Get the cached embedding for a query.
+
+        Args:
+            query: The query text
+
+        Returns:
+            The cached embedding, or None if missing or expired
+        """
+        key = self.normalize(query)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, query: str, embedding: List[float]) -> None:
+        """
+        Store the embedding for a query, evicting the least recently used entry if full.
+
+        Args:
+            query: The query text
+            embedding: Embedding of the query
+        """
+        if self.capacity <= 0:
+            return
+
+        key = self.normalize(query)
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached embeddings."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the cache.
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "ttl": self.ttl
+            }
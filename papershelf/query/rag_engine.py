@@ -5,16 +5,57 @@ This module provides functionality to query the vector database and generate
 responses using LangGraph for RAG functionality.
 """
 
+import logging
 import os
-from typing import Dict, List, Optional, Union, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union, Any
 from dataclasses import dataclass
 
 from langchain_openai import ChatOpenAI
 from langchain.schema import Document
 from langgraph.graph import END, StateGraph
 
+from papershelf.db.centroid_index import PaperCentroidIndex
+from papershelf.db.lexical_index import LexicalIndex
+from papershelf.db.paper_store import PaperStore
+from papershelf.db.vector_backend import VectorStoreBackend
 from papershelf.db.vector_store import VectorStore
 from papershelf.ingest.embedding_generator import EmbeddingGenerator
+from papershelf.query.paper_cache import PaperMetadataCache
+from papershelf.query.query_cache import QueryEmbeddingCache
+
+
+# Ways the RAG engine can retrieve documents
+RETRIEVAL_MODES = ("vector", "lexical", "hybrid", "two_stage")
+
+logger = logging.getLogger(__name__)
+
+
+def reciprocal_rank_fusion(ranked_lists: List[List[Dict]], n_results: int, k: int = 60) -> List[Dict]:
+    """
+    Merge ranked lists of documents with reciprocal rank fusion.
+
+    Each document scores the sum of 1 / (k + rank) over the lists it appears
+    in, so documents ranked well by several retrievers rise to the top
+    without having to compare their raw scores.
+
+    Args:
+        ranked_lists: Lists of documents, best first, identified by "id"
+        n_results: Number of documents to return
+        k: Smoothing constant; larger values flatten the rank weighting
+
+    Returns:
+        The best n_results documents, each with its fused "score"
+    """
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Dict] = {}
+    for ranked in ranked_lists:
+        for rank, doc in enumerate(ranked, start=1):
+            scores[doc["id"]] = scores.get(doc["id"], 0.0) + 1.0 / (k + rank)
+            documents.setdefault(doc["id"], doc)
+
+    best = sorted(scores, key=scores.get, reverse=True)[:n_results]
+    return [{**documents[doc_id], "score": scores[doc_id]} for doc_id in best]
 
 
 class RAGEngine:
@@ -22,12 +63,23 @@ class RAGEngine:
 
     def __init__(
         self,
-        vector_store: Optional[VectorStore] = None,
+        vector_store: Optional[VectorStoreBackend] = None,
         embedding_generator: Optional[EmbeddingGenerator] = None,
         model_name: str = "gpt-3.5-turbo",
         temperature: float = 0.0,
         max_tokens: int = 500,
-        top_k: int = 5
+        top_k: int = 5,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        paper_cache: Optional[PaperMetadataCache] = None,
+        lexical_index: Optional[LexicalIndex] = None,
+        retrieval_mode: str = "vector",
+        hybrid_candidates: int = 20,
+        rrf_k: int = 60,
+        lexical_workers: int = 4,
+        generation_concurrency: int = 4,
+        centroid_index: Optional[PaperCentroidIndex] = None,
+        two_stage_papers: int = 10,
+        paper_store: Optional[PaperStore] = None
     ):
         """
         Initialize the RAG engine.
@@ -39,13 +91,64 @@ class RAGEngine:
             temperature: Temperature for the LLM
             max_tokens: Maximum tokens for the LLM response
             top_k: Number of documents to retrieve
+            query_cache: Optional in-memory cache of query embeddings
+            paper_cache: Optional cached lookup of paper metadata, joined onto
+                retrieved chunks that only carry their paper's ID
+            lexical_index: Optional BM25 index of chunk text, required for the
+                lexical and hybrid retrieval modes
+            retrieval_mode: Default retrieval mode: "vector", "lexical",
+                "hybrid" (both searches merged by reciprocal rank fusion) or
+                "two_stage" (vector search within the papers whose centroids
+                are closest to the query)
+            hybrid_candidates: Number of candidates each search contributes
+                to the fusion in hybrid mode (at least top_k)
+            rrf_k: Smoothing constant of reciprocal rank fusion
+            lexical_workers: Number of threads running lexical searches
+                while queries are embedded and searched by vector
+            generation_concurrency: Maximum number of LLM calls made at the
+                same time when answering a batch of queries
+            centroid_index: Optional index of paper centroid embeddings,
+                required for the two_stage retrieval mode
+            two_stage_papers: Number of papers whose chunks are searched in
+                two_stage mode
+            paper_store: Optional store of paper metadata, used to check that
+                every paper has a centroid before searching by centroids
         """
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {retrieval_mode}")
+
         self.vector_store = vector_store or VectorStore()
         self.embedding_generator = embedding_generator or EmbeddingGenerator()
         self.model_name = model_name
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.top_k = top_k
+        self.query_cache = query_cache
+        self.paper_cache = paper_cache
+        self.lexical_index = lexical_index
+        self.retrieval_mode = retrieval_mode
+        self.hybrid_candidates = hybrid_candidates
+        self.rrf_k = rrf_k
+        self.centroid_index = centroid_index
+        self.two_stage_papers = two_stage_papers
+        self.paper_store = paper_store
+        self._missing_centroids = 0
+        # Versions of the paper store and centroid index the count was taken at
+        self._centroid_versions: Optional[Tuple[int, int]] = None
+
+        # Lexical searches run here while the query is embedded and searched
+        # on the calling thread
+        self._lexical_executor = (
+            ThreadPoolExecutor(max_workers=lexical_workers, thread_name_prefix="papershelf-lexical")
+            if lexical_index is not None else None
+        )
+
+        # Answers for batches of queries are generated here, which bounds the
+        # number of concurrent LLM calls across all batches
+        self._generation_executor = ThreadPoolExecutor(
+            max_workers=generation_concurrency,
+            thread_name_prefix="papershelf-generate"
+        )
 
         # Initialize LLM
         self.llm = ChatOpenAI(
@@ -68,6 +171,7 @@ class RAGEngine:
         @dataclass
         class GraphState:
             query: str
+            retrieval_mode: Optional[str] = None
             retrieved_documents: Optional[List[Dict]] = None
             answer: Optional[str] = None
 
@@ -76,84 +180,391 @@ class RAGEngine:
 
         # Define the nodes
         def retrieve_documents(state: GraphState) -> Dict[str, Any]:
-            """Retrieve relevant documents from the vector store."""
-            query = state.query
+            """Retrieve relevant documents from the vector store and/or lexical index."""
+            return {"retrieved_documents": self.retrieve(state.query, retrieval_mode=state.retrieval_mode)}
+
+        def generate_answer(state: GraphState) -> Dict[str, Any]:
+            """Generate an answer based on the retrieved documents."""
+            return {"answer": self._generate_answer(state.query, state.retrieved_documents)}
+
+        # Add nodes to the graph
+        graph.add_node("retrieve_documents", retrieve_documents)
+        graph.add_node("generate_answer", generate_answer)
+
+        # Add edges
+        graph.add_edge("retrieve_documents", "generate_answer")
+        graph.add_edge("generate_answer", END)
+
+        # Set the entry point
+        graph.set_entry_point("retrieve_documents")
+
+        return graph.compile()
+
+    def _generate_answer(self, query_text: str, documents: List[Dict]) -> str:
+        """
+        Generate an answer to a query from the retrieved documents.
 
-            # Generate embedding for the query
-            query_embedding = self.embedding_generator.generate_embeddings(query)[0]
+        Args:
+            query_text: The query text
+            documents: Documents retrieved for the query
+
+        Returns:
+            The LLM's answer
+        """
+        # Prepare context from retrieved documents
+        context = "\n\n".join([f"Document {i+1}:\n{doc['text']}" for i, doc in enumerate(documents)])
+
+        # Generate prompt
+        prompt = f"""
+        You are an academic assistant helping with research papers.
+        Answer the following question based on the provided context from academic papers.
+        If the answer cannot be derived from the context, say "I don't have enough information to answer this question."
+
+        Context:
+        {context}
+
+        Question: {query_text}
 
-            # Query the vector store
-            results = self.vector_store.query(
-                query_embedding=query_embedding,
-                n_results=self.top_k
+        Answer:
+        """
+
+        # Generate answer
+        return self.llm.invoke(prompt).content
+
+    def _resolve_retrieval_mode(self, retrieval_mode: Optional[str]) -> str:
+        """
+        Pick the retrieval mode to use for a query.
+
+        Args:
+            retrieval_mode: Requested mode, or None for the engine's default
+
+        Returns:
+            The mode, which is "vector" whenever the index it needs is missing
+        """
+        mode = retrieval_mode or self.retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        if mode in ("lexical", "hybrid") and self.lexical_index is None:
+            return "vector"
+        if mode == "two_stage" and self.centroid_index is None:
+            return "vector"
+        return mode
+
+    def retrieve(self, query_text: str, retrieval_mode: Optional[str] = None) -> List[Dict]:
+        """
+        Retrieve the documents most relevant to a query.
+
+        Args:
+            query_text: The query text
+            retrieval_mode: "vector", "lexical", "hybrid" or "two_stage" (None
+                for the engine's default); without the index a mode needs it
+                falls back to vector search
+
+        Returns:
+            List of the top_k documents with their "id", "text" and "metadata"
+            (and the fused "score" in hybrid mode)
+        """
+        mode = self._resolve_retrieval_mode(retrieval_mode)
+
+        if mode == "vector":
+            documents = self._vector_search(query_text, self.top_k)
+        elif mode == "two_stage":
+            documents = self._two_stage_search_batch([query_text], self.top_k)[0]
+        elif mode == "lexical":
+            documents = self._lexical_search(query_text, self.top_k)
+        else:
+            candidates = max(self.top_k, self.hybrid_candidates)
+            # BM25 needs no embedding, so it runs while the query is embedded
+            lexical = self._lexical_executor.submit(self._lexical_search, query_text, candidates)
+            vector_documents = self._vector_search(query_text, candidates)
+            documents = reciprocal_rank_fusion(
+                [vector_documents, lexical.result()],
+                n_results=self.top_k,
+                k=self.rrf_k
             )
 
-            # Format the retrieved documents
-            retrieved_documents = []
-            for i in range(len(results["ids"][0])):
-                retrieved_documents.append({
-                    "id": results["ids"][0][i],
-                    "text": results["documents"][0][i],
-                    "metadata": results["metadatas"][0][i] if results["metadatas"] else {}
-                })
+        return self._attach_paper_metadata(documents)
 
-            return {"retrieved_documents": retrieved_documents}
+    def retrieve_batch(self, query_texts: List[str], retrieval_mode: Optional[str] = None) -> List[List[Dict]]:
+        """
+        Retrieve the most relevant documents for each of several queries.
 
-        def generate_answer(state: GraphState) -> Dict[str, Any]:
-            """Generate an answer based on the retrieved documents."""
-            query = state.query
-            retrieved_documents = state.retrieved_documents
+        The queries are embedded in one pass and searched in one call to the
+        vector store (one call per query in two_stage mode, since each query
+        searches its own papers); lexical searches run concurrently on the
+        lexical pool.
 
-            # Prepare context from retrieved documents
-            context = "\n\n".join([f"Document {i+1}:\n{doc['text']}" for i, doc in enumerate(retrieved_documents)])
+        Args:
+            query_texts: The query texts
+            retrieval_mode: "vector", "lexical", "hybrid" or "two_stage" (None
+                for the engine's default)
 
-            # Generate prompt
-            prompt = f"""
-            You are an academic assistant helping with research papers.
-            Answer the following question based on the provided context from academic papers.
-            If the answer cannot be derived from the context, say "I don't have enough information to answer this question."
+        Returns:
+            One list of documents per query, as returned by retrieve
+        """
+        mode = self._resolve_retrieval_mode(retrieval_mode)
+        if not query_texts:
+            return []
+
+        if mode == "vector":
+            batches = self._vector_search_batch(query_texts, self.top_k)
+        elif mode == "two_stage":
+            batches = self._two_stage_search_batch(query_texts, self.top_k)
+        elif mode == "lexical":
+            batches = list(self._lexical_executor.map(
+                self._lexical_search, query_texts, [self.top_k] * len(query_texts)
+            ))
+        else:
+            candidates = max(self.top_k, self.hybrid_candidates)
+            lexical = [
+                self._lexical_executor.submit(self._lexical_search, query_text, candidates)
+                for query_text in query_texts
+            ]
+            vector_batches = self._vector_search_batch(query_texts, candidates)
+            batches = [
+                reciprocal_rank_fusion([vector_documents, future.result()], n_results=self.top_k, k=self.rrf_k)
+                for vector_documents, future in zip(vector_batches, lexical)
+            ]
+
+        # One metadata lookup covers the documents of every query
+        self._attach_paper_metadata([doc for documents in batches for doc in documents])
+        return batches
+
+    def _vector_search(self, query_text: str, n_results: int) -> List[Dict]:
+        """Search the vector store with the query's embedding."""
+        results = self.vector_store.query(
+            query_embedding=self._embed_query(query_text),
+            n_results=n_results
+        )
+        return self._format_results(results)
 
-            Context:
-            {context}
+    def _vector_search_batch(self, query_texts: List[str], n_results: int) -> List[List[Dict]]:
+        """Search the vector store with the embeddings of several queries at once."""
+        results = self.vector_store.query_batch(
+            query_embeddings=self._embed_queries(query_texts),
+            n_results=n_results
+        )
+        return [self._format_results(results, index) for index in range(len(query_texts))]
 
-            Question: {query}
+    def _two_stage_search_batch(self, query_texts: List[str], n_results: int) -> List[List[Dict]]:
+        """
+        Search the chunks of the papers closest to each query.
 
-            Answer:
-            """
+        The first stage ranks papers by the similarity of their centroid to
+        the query; the second searches only the chunks of the best
+        two_stage_papers papers. A query for which no centroids exist yet
+        searches all chunks, and so does every query while some papers have
+        no centroid, since the first stage could never pick them.
 
-            # Generate answer
-            answer = self.llm.invoke(prompt).content
+        Args:
+            query_texts: The query texts
+            n_results: Number of documents to return per query
 
-            return {"answer": answer}
+        Returns:
+            One list of documents per query
+        """
+        if not self._centroids_complete():
+            return self._vector_search_batch(query_texts, n_results)
 
-        # Add nodes to the graph
-        graph.add_node("retrieve_documents", retrieve_documents)
-        graph.add_node("generate_answer", generate_answer)
+        embeddings = self._embed_queries(query_texts)
+        papers = self.centroid_index.search(embeddings, n_papers=self.two_stage_papers)
 
-        # Add edges
-        graph.add_edge("retrieve_documents", "generate_answer")
-        graph.add_edge("generate_answer", END)
+        batches = []
+        for embedding, doc_id_bases in zip(embeddings, papers):
+            where = {"doc_id_base": {"$in": doc_id_bases}} if doc_id_bases else None
+            results = self.vector_store.query(query_embedding=embedding, n_results=n_results, where=where)
+            batches.append(self._format_results(results))
+        return batches
 
-        # Set the entry point
-        graph.set_entry_point("retrieve_documents")
+    def _centroids_complete(self) -> bool:
+        """
+        Check that every paper in the paper store has a centroid.
 
-        return graph.compile()
+        The papers are only counted again once the paper store or the
+        centroid index has changed.
+        """
+        if self.paper_store is None:
+            return True
+
+        versions = (self.paper_store.get_version(), self.centroid_index.get_version())
+        if versions == self._centroid_versions:
+            return self._missing_centroids == 0
+
+        missing = self.paper_store.count_papers() - self.centroid_index.count()
+        if missing > 0 and missing != self._missing_centroids:
+            logger.warning(
+                "%d papers have no centroid, so two_stage retrieval searches all chunks; "
+                "run `papershelf backfill-centroids` to add them",
+                missing
+            )
+        self._missing_centroids = max(missing, 0)
+        self._centroid_versions = versions
+        return missing <= 0
+
+    def _lexical_search(self, query_text: str, n_results: int) -> List[Dict]:
+        """Search the lexical index for the query's terms."""
+        return self._format_results(self.lexical_index.search(query_text, n_results=n_results))
+
+    @staticmethod
+    def _format_results(results: Dict, index: int = 0) -> List[Dict]:
+        """
+        Convert search results to a list of documents.
 
-    def query(self, query_text: str) -> Dict[str, Any]:
+        Args:
+            results: Results in the nested-list layout of VectorStore.query
+            index: Position of the query whose results are converted
+
+        Returns:
+            List of documents with their "id", "text" and "metadata"
+        """
+        documents = []
+        for i in range(len(results["ids"][index])):
+            documents.append({
+                "id": results["ids"][index][i],
+                "text": results["documents"][index][i],
+                "metadata": (results["metadatas"][index][i] if results["metadatas"] else None) or {}
+            })
+        return documents
+
+    def _attach_paper_metadata(self, documents: List[Dict]) -> List[Dict]:
+        """
+        Join paper-level metadata onto retrieved chunks.
+
+        Chunks only store their paper's doc_id_base and chunk index; the
+        title, author and other paper metadata are looked up once per paper
+        through the paper cache. Chunks ingested before paper metadata was
+        stored separately already carry it and are left as they are.
+
+        Args:
+            documents: Retrieved documents with their chunk metadata
+
+        Returns:
+            The documents, with paper metadata merged into their metadata
+        """
+        if self.paper_cache is None:
+            return documents
+
+        doc_id_bases = [
+            doc["metadata"]["doc_id_base"] for doc in documents
+            if "doc_id_base" in doc["metadata"] and "title" not in doc["metadata"]
+        ]
+        if not doc_id_bases:
+            return documents
+
+        papers = self.paper_cache.get_many(doc_id_bases)
+        for doc in documents:
+            paper = papers.get(doc["metadata"].get("doc_id_base"))
+            if paper is not None and "title" not in doc["metadata"]:
+                doc["metadata"] = {**paper, **doc["metadata"]}
+
+        return documents
+
+    def _embed_query(self, query_text: str) -> List[float]:
+        """
+        Get the embedding for a query, using the query cache if configured.
+
+        Args:
+            query_text: The query text
+
+        Returns:
+            Embedding of the query
+        """
+        if self.query_cache is not None:
+            cached = self.query_cache.get(query_text)
+            if cached is not None:
+                return cached
+
+        query_embedding = self.embedding_generator.generate_embeddings(query_text)[0]
+
+        if self.query_cache is not None:
+            self.query_cache.put(query_text, query_embedding)
+
+        return query_embedding
+
+    def _embed_queries(self, query_texts: List[str]) -> List[List[float]]:
+        """
+        Get the embeddings for several queries, encoding the uncached ones in one pass.
+
+        Args:
+            query_texts: The query texts
+
+        Returns:
+            Embedding of each query, in order
+        """
+        embeddings: List[Optional[List[float]]] = [None] * len(query_texts)
+        if self.query_cache is not None:
+            for i, query_text in enumerate(query_texts):
+                embeddings[i] = self.query_cache.get(query_text)
+
+        missing = list(dict.fromkeys(
+            query_text for query_text, embedding in zip(query_texts, embeddings) if embedding is None
+        ))
+        if missing:
+            encoded = dict(zip(missing, self.embedding_generator.generate_embeddings(missing)))
+            for i, query_text in enumerate(query_texts):
+                if embeddings[i] is None:
+                    embeddings[i] = encoded[query_text]
+            if self.query_cache is not None:
+                for query_text, embedding in encoded.items():
+                    self.query_cache.put(query_text, embedding)
+
+        return embeddings
+
+    def query(self, query_text: str, retrieval_mode: Optional[str] = None) -> Dict[str, Any]:
         """
         Query the RAG engine.
 
         Args:
             query_text: The query text
+            retrieval_mode: "vector", "lexical", "hybrid" or "two_stage" (None
+                for the engine's default)
 
         Returns:
             Dictionary with query results
         """
+        inputs = {"query": query_text}
+        if retrieval_mode is not None:
+            inputs["retrieval_mode"] = retrieval_mode
+
         # Run the graph
-        result = self.graph.invoke({"query": query_text})
+        result = self.graph.invoke(inputs)
 
         return {
             "query": query_text,
             "answer": result["answer"],
             "retrieved_documents": result["retrieved_documents"]
         }
+
+    def query_batch(self, query_texts: List[str], retrieval_mode: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Query the RAG engine with several queries at once.
+
+        Retrieval is batched across the queries (see retrieve_batch), and the
+        answers are generated concurrently, at most generation_concurrency
+        LLM calls at a time.
+
+        Args:
+            query_texts: The query texts
+            retrieval_mode: "vector", "lexical", "hybrid" or "two_stage" (None
+                for the engine's default)
+
+        Returns:
+            List with the query results of each query, in order
+        """
+        batches = self.retrieve_batch(query_texts, retrieval_mode=retrieval_mode)
+        answers = self._generation_executor.map(self._generate_answer, query_texts, batches)
+
+        return [
+            {
+                "query": query_text,
+                "answer": answer,
+                "retrieved_documents": documents
+            }
+            for query_text, answer, documents in zip(query_texts, answers, batches)
+        ]
+
+    def close(self) -> None:
+        """Shut down the thread pools used for lexical searches and batch answers."""
+        if self._lexical_executor is not None:
+            self._lexical_executor.shutdown(wait=True)
+        self._generation_executor.shutdown(wait=True)
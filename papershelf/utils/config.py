@@ -21,22 +21,72 @@ class Config:
     # API settings
     API_HOST = os.getenv("API_HOST", "0.0.0.0")
     API_PORT = int(os.getenv("API_PORT", "8000"))
+    WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
 
     # Database settings
     DB_PERSIST_DIRECTORY = os.getenv("DB_PERSIST_DIRECTORY", "./chroma_db")
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
     CHAT_HISTORY_DB_PATH = os.getenv("CHAT_HISTORY_DB_PATH", "./chat_history.db")
+    VECTOR_WRITE_BATCH_SIZE = int(os.getenv("VECTOR_WRITE_BATCH_SIZE", "0"))
+    PAPER_DB_PATH = os.getenv("PAPER_DB_PATH", "./papers.db")
+    PAPER_CACHE_SIZE = int(os.getenv("PAPER_CACHE_SIZE", "4096"))
+    LEXICAL_INDEX_PATH = os.getenv("LEXICAL_INDEX_PATH", "./lexical_index.db")
+    CENTROID_INDEX_PATH = os.getenv("CENTROID_INDEX_PATH", "./paper_centroids.db")
+
+    # HNSW index settings, applied when the vector collection is created
+    HNSW_M = int(os.getenv("HNSW_M", "16"))
+    HNSW_CONSTRUCTION_EF = int(os.getenv("HNSW_CONSTRUCTION_EF", "100"))
+    HNSW_SEARCH_EF = int(os.getenv("HNSW_SEARCH_EF", "10"))
+    HNSW_BATCH_SIZE = int(os.getenv("HNSW_BATCH_SIZE", "100"))
+    HNSW_SYNC_THRESHOLD = int(os.getenv("HNSW_SYNC_THRESHOLD", "1000"))
 
     # Embedding settings
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+    ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", "./onnx_models")
+    ONNX_QUANTIZE = os.getenv("ONNX_QUANTIZE", "true").lower() in ("1", "true", "yes")
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+    EMBEDDING_NORMALIZE = os.getenv("EMBEDDING_NORMALIZE", "false").lower() in ("1", "true", "yes")
+    EMBEDDING_SORT_BY_LENGTH = os.getenv("EMBEDDING_SORT_BY_LENGTH", "true").lower() in ("1", "true", "yes")
+    EMBEDDING_PROCESSES = int(os.getenv("EMBEDDING_PROCESSES", "1"))
+    EMBEDDING_THREADS_PER_PROCESS = int(os.getenv("EMBEDDING_THREADS_PER_PROCESS", "1"))
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache.db")
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "500000"))
 
     # LLM settings
     LLM_MODEL = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
     LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.0"))
     LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "500"))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+
+    # Query settings
+    QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+    QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "3600"))
+    QUERY_BATCH_MAX_SIZE = int(os.getenv("QUERY_BATCH_MAX_SIZE", "32"))
+    QUERY_BATCH_MAX_WAIT_MS = float(os.getenv("QUERY_BATCH_MAX_WAIT_MS", "8"))
+    QUERY_EXECUTOR_THREADS = int(os.getenv("QUERY_EXECUTOR_THREADS", "8"))
+    RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector")
+    HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+    HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+    LEXICAL_SEARCH_WORKERS = int(os.getenv("LEXICAL_SEARCH_WORKERS", "4"))
+    TWO_STAGE_PAPERS = int(os.getenv("TWO_STAGE_PAPERS", "10"))
+    MAX_BATCH_QUERIES = int(os.getenv("MAX_BATCH_QUERIES", "32"))
 
     # PDF processing settings
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
     CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+    PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "1"))
+    PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "32"))
+    # 0 or an empty value never recycles workers
+    PDF_WORKER_MAX_TASKS = int(os.getenv("PDF_WORKER_MAX_TASKS", "50") or "0") or None
+
+    # Ingestion job settings
+    JOB_DB_PATH = os.getenv("JOB_DB_PATH", "./ingestion_jobs.db")
+    UPLOAD_DIR = os.getenv("UPLOAD_DIR", "./uploads")
+    MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "200"))
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+    JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    INGEST_EXECUTOR_THREADS = int(os.getenv("INGEST_EXECUTOR_THREADS", "4"))
 
     # PDF export settings
     PDF_EXPORT_DIR = os.getenv("PDF_EXPORT_DIR", "./pdf_exports")
@@ -44,6 +94,22 @@ class Config:
     # OpenAI API settings
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
+    @classmethod
+    def get_hnsw_params(cls) -> Dict[str, int]:
+        """
+        Get the HNSW index settings in the form VectorStore accepts.
+
+        Returns:
+            Dictionary of HNSW parameters
+        """
+        return {
+            "M": cls.HNSW_M,
+            "construction_ef": cls.HNSW_CONSTRUCTION_EF,
+            "search_ef": cls.HNSW_SEARCH_EF,
+            "batch_size": cls.HNSW_BATCH_SIZE,
+            "sync_threshold": cls.HNSW_SYNC_THRESHOLD
+        }
+
     @classmethod
     def get_all(cls) -> Dict[str, Any]:
         """
@@ -55,22 +121,65 @@ class Config:
         return {
             "api": {
                 "host": cls.API_HOST,
-                "port": cls.API_PORT
+                "port": cls.API_PORT,
+                "warmup_on_startup": cls.WARMUP_ON_STARTUP
             },
             "database": {
-                "persist_directory": cls.DB_PERSIST_DIRECTORY
+                "persist_directory": cls.DB_PERSIST_DIRECTORY,
+                "vector_backend": cls.VECTOR_BACKEND,
+                "write_batch_size": cls.VECTOR_WRITE_BATCH_SIZE,
+                "paper_db_path": cls.PAPER_DB_PATH,
+                "paper_cache_size": cls.PAPER_CACHE_SIZE,
+                "lexical_index_path": cls.LEXICAL_INDEX_PATH,
+                "centroid_index_path": cls.CENTROID_INDEX_PATH,
+                "hnsw": cls.get_hnsw_params()
             },
             "embedding": {
-                "model": cls.EMBEDDING_MODEL
+                "model": cls.EMBEDDING_MODEL,
+                "backend": cls.EMBEDDING_BACKEND,
+                "onnx_cache_dir": cls.ONNX_CACHE_DIR,
+                "onnx_quantize": cls.ONNX_QUANTIZE,
+                "batch_size": cls.EMBEDDING_BATCH_SIZE,
+                "normalize": cls.EMBEDDING_NORMALIZE,
+                "sort_by_length": cls.EMBEDDING_SORT_BY_LENGTH,
+                "processes": cls.EMBEDDING_PROCESSES,
+                "threads_per_process": cls.EMBEDDING_THREADS_PER_PROCESS,
+                "cache_path": cls.EMBEDDING_CACHE_PATH,
+                "cache_max_entries": cls.EMBEDDING_CACHE_MAX_ENTRIES
             },
             "llm": {
                 "model": cls.LLM_MODEL,
                 "temperature": cls.LLM_TEMPERATURE,
-                "max_tokens": cls.LLM_MAX_TOKENS
+                "max_tokens": cls.LLM_MAX_TOKENS,
+                "max_concurrency": cls.LLM_MAX_CONCURRENCY
+            },
+            "query": {
+                "cache_size": cls.QUERY_CACHE_SIZE,
+                "cache_ttl": cls.QUERY_CACHE_TTL,
+                "batch_max_size": cls.QUERY_BATCH_MAX_SIZE,
+                "batch_max_wait_ms": cls.QUERY_BATCH_MAX_WAIT_MS,
+                "executor_threads": cls.QUERY_EXECUTOR_THREADS,
+                "retrieval_mode": cls.RETRIEVAL_MODE,
+                "hybrid_candidates": cls.HYBRID_CANDIDATES,
+                "hybrid_rrf_k": cls.HYBRID_RRF_K,
+                "lexical_search_workers": cls.LEXICAL_SEARCH_WORKERS,
+                "two_stage_papers": cls.TWO_STAGE_PAPERS,
+                "max_batch_queries": cls.MAX_BATCH_QUERIES
             },
             "pdf_processing": {
                 "chunk_size": cls.CHUNK_SIZE,
-                "chunk_overlap": cls.CHUNK_OVERLAP
+                "chunk_overlap": cls.CHUNK_OVERLAP,
+                "extract_workers": cls.PDF_EXTRACT_WORKERS,
+                "pages_per_task": cls.PDF_PAGES_PER_TASK,
+                "worker_max_tasks": cls.PDF_WORKER_MAX_TASKS
+            },
+            "ingestion": {
+                "job_db_path": cls.JOB_DB_PATH,
+                "upload_dir": cls.UPLOAD_DIR,
+                "max_upload_mb": cls.MAX_UPLOAD_MB,
+                "workers": cls.INGEST_WORKERS,
+                "job_lease_seconds": cls.JOB_LEASE_SECONDS,
+                "executor_threads": cls.INGEST_EXECUTOR_THREADS
             }
         }
 
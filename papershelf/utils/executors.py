@@ -0,0 +1,67 @@
+"""
+Executors module for PaperShelf.
+
+This module provides named thread pools for running blocking work (model
+inference, database calls, file I/O) off the async event loop.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class BlockingExecutor:
+    """Class for a named thread pool that runs blocking calls for async code."""
+
+    def __init__(self, name: str, max_workers: int):
+        """
+        Initialize the executor.
+
+        The threads are created on first use, and the pool is recreated if it
+        is used again after shutdown.
+
+        Args:
+            name: Prefix for the names of the pool's threads
+            max_workers: Maximum number of calls run at the same time
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The underlying thread pool."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+            return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking call in the pool and wait for it without blocking the event loop.
+
+        Args:
+            func: The blocking callable
+            *args: Positional arguments for the callable
+            **kwargs: Keyword arguments for the callable
+
+        Returns:
+            The callable's return value
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the thread pool.
+
+        Args:
+            wait: Whether to wait for running calls to finish
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
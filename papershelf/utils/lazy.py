@@ -0,0 +1,69 @@
+"""
+Lazy service module for PaperShelf.
+
+This module provides a thread-safe proxy that defers building an expensive
+object (an embedding model, a database client) until it is first used.
+"""
+
+import threading
+from typing import Any, Callable, Optional
+
+
+class LazyService:
+    """Class for building a service on first use."""
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        """
+        Initialize the lazy service.
+
+        Args:
+            name: Name of the service, used in readiness reports
+            factory: Callable that builds the service
+        """
+        self._name = name
+        self._factory = factory
+        self._instance: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        """Name of the service."""
+        return self._name
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the service has been built."""
+        return self._instance is not None
+
+    def get(self) -> Any:
+        """
+        Get the service, building it if this is the first use.
+
+        Concurrent first calls wait for a single build instead of each
+        building their own copy.
+
+        Returns:
+            The built service
+        """
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def close(self) -> None:
+        """Close the service if it was built and supports closing."""
+        with self._lock:
+            instance, self._instance = self._instance, None
+        if instance is not None and hasattr(instance, "close"):
+            instance.close()
+
+    def __getattr__(self, attribute: str) -> Any:
+        # Only called for attributes not found on the proxy itself
+        if attribute.startswith("_"):
+            raise AttributeError(attribute)
+        return getattr(self.get(), attribute)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyService {self._name} ({state})>"
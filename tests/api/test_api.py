@@ -6,6 +6,7 @@ including uploading papers and querying the system.
 """
 
 import os
+import hashlib
 import json
 import tempfile
 from unittest.mock import patch, MagicMock
@@ -15,53 +16,265 @@ from fastapi import UploadFile
 from fastapi.testclient import TestClient
 
 from papershelf.api.app import app, create_app
+from papershelf.utils.config import config
+
+
+def file_sha256(path: str) -> str:
+    """Compute the SHA-256 hex digest of a file."""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
 
 
 class TestAPI:
     """Test cases for the API endpoints."""
 
+    def test_query_encoder_is_not_ingest_pool(self):
+        """Test that query embeddings use an in-process encoder rather than the ingest process pool."""
+        from papershelf.api import app as app_module
+
+        with patch.object(config, "EMBEDDING_PROCESSES", 4), \
+                patch("papershelf.api.app.EmbeddingGenerator") as mock_generator_class:
+            app_module._build_embedding_generator()
+            app_module._build_query_encoder()
+
+        ingest_call, query_call = mock_generator_class.call_args_list
+        assert ingest_call[1]["num_processes"] == 4
+        assert query_call[1]["num_processes"] == 1
+
+        # Batched query embeddings go through the query encoder
+        query_encoder = MagicMock()
+        with patch.object(app_module, "query_encoder", query_encoder):
+            batcher = app_module._build_query_embedding_generator()
+        assert batcher.embedding_generator is query_encoder
+        assert batcher.embedding_generator is not app_module.embedding_generator
+        batcher.close()
+
     def test_root_endpoint(self, api_client):
         """Test the root endpoint."""
         response = api_client.get("/")
         assert response.status_code == 200
         assert response.json() == {"message": "Welcome to PaperShelf API"}
 
+    @patch('papershelf.api.app.paper_store')
+    @patch('papershelf.api.app.ingestion_pool')
+    @patch('papershelf.api.app.job_store')
     @patch('papershelf.api.app.pdf_processor')
     @patch('papershelf.api.app.embedding_generator')
     @patch('papershelf.api.app.vector_store')
-    def test_upload_endpoint(self, mock_vector_store, mock_embedding_generator, mock_pdf_processor, api_client, sample_pdf_path):
-        """Test the upload endpoint."""
+    def test_upload_endpoint(self, mock_vector_store, mock_embedding_generator, mock_pdf_processor, mock_job_store, mock_ingestion_pool, mock_paper_store, api_client, sample_pdf_path):
+        """Test that uploading a PDF queues an ingestion job."""
         # Set up mocks
-        mock_pdf_processor.extract_metadata.return_value = {
-            "title": "Test Paper",
-            "author": "Test Author",
-            "page_count": 10,
-            "file_path": sample_pdf_path
+        mock_paper_store.find_paper_by_hash.return_value = None
+        mock_vector_store.find_paper_by_hash.return_value = None
+        mock_job_store.find_active_job.return_value = None
+        mock_job_store.create_job.return_value = "job-1"
+
+        with tempfile.TemporaryDirectory() as upload_dir:
+            with patch.object(config, "UPLOAD_DIR", upload_dir):
+                # Test uploading a PDF
+                with open(sample_pdf_path, "rb") as f:
+                    response = api_client.post(
+                        "/upload",
+                        files={"file": ("test.pdf", f, "application/pdf")}
+                    )
+
+            # Check the response
+            assert response.status_code == 202
+            data = response.json()
+            assert data["job_id"] == "job-1"
+            assert data["state"] == "queued"
+            assert data["status_url"] == "/jobs/job-1"
+
+            # The upload is kept for the job to ingest
+            upload_path, original_filename, content_hash = mock_job_store.create_job.call_args[0]
+            assert os.path.dirname(upload_path) == upload_dir
+            assert os.path.exists(upload_path)
+            assert original_filename == "test.pdf"
+            assert content_hash == file_sha256(sample_pdf_path)
+
+        # Check that no parsing or embedding happened in the request
+        mock_ingestion_pool.notify.assert_called_once()
+        mock_pdf_processor.parse_pdf.assert_not_called()
+        mock_embedding_generator.generate_embeddings.assert_not_called()
+        mock_vector_store.add_documents.assert_not_called()
+
+    @patch('papershelf.api.app.paper_store')
+    @patch('papershelf.api.app.ingestion_pool')
+    @patch('papershelf.api.app.job_store')
+    @patch('papershelf.api.app.pdf_processor')
+    @patch('papershelf.api.app.vector_store')
+    def test_upload_endpoint_active_job(self, mock_vector_store, mock_pdf_processor, mock_job_store, mock_ingestion_pool, mock_paper_store, api_client, sample_pdf_path):
+        """Test that uploading a PDF that is already queued returns the existing job."""
+        mock_paper_store.find_paper_by_hash.return_value = None
+        mock_vector_store.find_paper_by_hash.return_value = None
+        mock_job_store.find_active_job.return_value = {"job_id": "job-1", "state": "running"}
+
+        with tempfile.TemporaryDirectory() as upload_dir:
+            with patch.object(config, "UPLOAD_DIR", upload_dir):
+                with open(sample_pdf_path, "rb") as f:
+                    response = api_client.post(
+                        "/upload",
+                        files={"file": ("test.pdf", f, "application/pdf")}
+                    )
+
+            # The second copy of the file is not kept
+            assert os.listdir(upload_dir) == []
+
+        assert response.status_code == 202
+        assert response.json()["job_id"] == "job-1"
+        assert response.json()["state"] == "running"
+        mock_job_store.create_job.assert_not_called()
+        mock_ingestion_pool.notify.assert_not_called()
+
+    @patch('papershelf.api.app.job_store')
+    def test_get_job_endpoint(self, mock_job_store, api_client):
+        """Test getting the status of an ingestion job."""
+        mock_job_store.get_job.return_value = {
+            "job_id": "job-1",
+            "state": "running",
+            "file_path": "./uploads/abc_test.pdf",
+            "progress": {"pages_parsed": 3, "total_pages": None, "chunks_embedded": 0, "total_chunks": None}
         }
-        mock_pdf_processor.process_pdf.return_value = ["Chunk 1", "Chunk 2"]
-        mock_embedding_generator.generate_embeddings.return_value = [[0.1, 0.2], [0.3, 0.4]]
-        
-        # Test uploading a PDF
-        with open(sample_pdf_path, "rb") as f:
-            response = api_client.post(
-                "/upload",
-                files={"file": ("test.pdf", f, "application/pdf")}
-            )
-        
+
+        response = api_client.get("/jobs/job-1")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["state"] == "running"
+        assert data["progress"]["pages_parsed"] == 3
+        assert "file_path" not in data
+        mock_job_store.get_job.assert_called_once_with("job-1")
+
+    @patch('papershelf.api.app.job_store')
+    def test_get_job_endpoint_not_found(self, mock_job_store, api_client):
+        """Test getting an ingestion job that does not exist."""
+        mock_job_store.get_job.return_value = None
+
+        response = api_client.get("/jobs/missing")
+
+        assert response.status_code == 404
+
+    @patch('papershelf.api.app.paper_store')
+    def test_list_papers_endpoint(self, mock_paper_store, api_client):
+        """Test listing papers with pagination, sorting and filters."""
+        mock_paper_store.list_papers.return_value = {
+            "papers": [{"doc_id_base": "paper-1", "title": "Test Paper"}],
+            "next_cursor": "abc"
+        }
+
+        response = api_client.get("/papers?limit=1&sort=title&order=desc&author=smith&cursor=xyz")
+
+        assert response.status_code == 200
+        assert response.json()["next_cursor"] == "abc"
+        mock_paper_store.list_papers.assert_called_once_with(
+            limit=1, cursor="xyz", sort_by="title", descending=True, title=None, author="smith"
+        )
+
+        # Unknown sort orders are rejected before reaching the store
+        assert api_client.get("/papers?sort=page_count").status_code == 422
+
+        mock_paper_store.list_papers.side_effect = ValueError("Invalid cursor")
+        assert api_client.get("/papers?cursor=bad").status_code == 400
+
+    @patch('papershelf.api.app.paper_store')
+    def test_get_paper_endpoint(self, mock_paper_store, api_client):
+        """Test getting the metadata of a paper."""
+        mock_paper_store.get_paper.return_value = {"doc_id_base": "paper-1", "title": "Test Paper"}
+        assert api_client.get("/papers/paper-1").json()["title"] == "Test Paper"
+
+        mock_paper_store.get_paper.return_value = None
+        assert api_client.get("/papers/missing").status_code == 404
+
+    @patch('papershelf.api.app.paper_store')
+    @patch('papershelf.api.app.vector_store')
+    def test_get_paper_chunks_endpoint(self, mock_vector_store, mock_paper_store, api_client):
+        """Test listing the chunks of a paper."""
+        mock_paper_store.get_paper.return_value = {"doc_id_base": "paper-1", "title": "Test Paper"}
+        mock_vector_store.get_paper_chunks.return_value = [
+            {"id": "paper-1_0", "document": "Text 1", "metadata": {"chunk_index": 0}},
+            {"id": "paper-1_1", "document": "Text 2", "metadata": {"chunk_index": 1}}
+        ]
+
+        response = api_client.get("/papers/paper-1/chunks?include_text=false")
+
+        assert response.status_code == 200
+        assert response.json()["chunk_count"] == 2
+        assert response.json()["paper"]["title"] == "Test Paper"
+        mock_vector_store.get_paper_chunks.assert_called_once_with("paper-1", include_documents=False)
+
+        mock_vector_store.get_paper_chunks.return_value = []
+        assert api_client.get("/papers/missing/chunks").status_code == 404
+
+    @patch('papershelf.api.app.centroid_index')
+    @patch('papershelf.api.app.lexical_index')
+    @patch('papershelf.api.app.paper_cache')
+    @patch('papershelf.api.app.paper_store')
+    @patch('papershelf.api.app.vector_store')
+    def test_delete_paper_endpoint(
+        self, mock_vector_store, mock_paper_store, mock_paper_cache, mock_lexical_index, mock_centroid_index,
+        api_client
+    ):
+        """Test deleting a paper, its chunks and its metadata."""
+        mock_vector_store.delete_paper.return_value = 12
+        mock_paper_store.delete_paper.return_value = True
+
+        response = api_client.delete("/papers/paper-1")
+
+        assert response.status_code == 200
+        assert response.json() == {"id": "paper-1", "deleted_chunks": 12}
+        mock_vector_store.delete_paper.assert_called_once_with("paper-1")
+        mock_paper_store.delete_paper.assert_called_once_with("paper-1")
+        mock_paper_cache.invalidate.assert_called_once_with("paper-1")
+        mock_lexical_index.delete_paper.assert_called_once_with("paper-1")
+        mock_centroid_index.delete_paper.assert_called_once_with("paper-1")
+
+        mock_vector_store.delete_paper.return_value = 0
+        mock_paper_store.delete_paper.return_value = False
+        assert api_client.delete("/papers/missing").status_code == 404
+
+    @patch('papershelf.api.app.paper_store')
+    @patch('papershelf.api.app.pdf_processor')
+    @patch('papershelf.api.app.embedding_generator')
+    @patch('papershelf.api.app.vector_store')
+    def test_upload_endpoint_duplicate(self, mock_vector_store, mock_embedding_generator, mock_pdf_processor, mock_paper_store, api_client, sample_pdf_path):
+        """Test that re-uploading the same PDF returns the existing paper."""
+        # Set up mocks
+        mock_paper_store.find_paper_by_hash.return_value = {
+            "doc_id_base": "existing-id",
+            "metadata": {
+                "title": "Test Paper",
+                "author": "Test Author",
+                "page_count": 10,
+                "original_filename": "test.pdf",
+                "content_hash": "abc123"
+            }
+        }
+
+        with tempfile.TemporaryDirectory() as upload_dir:
+            with patch.object(config, "UPLOAD_DIR", upload_dir):
+                # Test uploading a PDF
+                with open(sample_pdf_path, "rb") as f:
+                    response = api_client.post(
+                        "/upload",
+                        files={"file": ("test.pdf", f, "application/pdf")}
+                    )
+
+            # The duplicate upload is not kept
+            assert os.listdir(upload_dir) == []
+
         # Check the response
         assert response.status_code == 200
         data = response.json()
-        assert "id" in data
+        assert data["id"] == "existing-id"
         assert data["title"] == "Test Paper"
-        assert data["author"] == "Test Author"
-        assert data["page_count"] == 10
-        assert data["status"] == "success"
-        
-        # Check that the mocks were called correctly
-        mock_pdf_processor.extract_metadata.assert_called_once()
-        mock_pdf_processor.process_pdf.assert_called_once()
-        mock_embedding_generator.generate_embeddings.assert_called_once_with(["Chunk 1", "Chunk 2"])
-        mock_vector_store.add_documents.assert_called_once()
+        assert data["status"] == "duplicate"
+
+        # Check that no parse or embed work was done
+        mock_paper_store.find_paper_by_hash.assert_called_once_with(file_sha256(sample_pdf_path))
+        mock_vector_store.find_paper_by_hash.assert_not_called()
+        mock_pdf_processor.parse_pdf.assert_not_called()
+        mock_embedding_generator.generate_embeddings.assert_not_called()
+        mock_vector_store.add_documents.assert_not_called()
 
     def test_upload_endpoint_invalid_file(self, api_client):
         """Test the upload endpoint with an invalid file type."""
@@ -81,6 +294,39 @@ class TestAPI:
             assert response.status_code == 400
             assert "File must be a PDF" in response.json()["detail"]
 
+    @patch('papershelf.api.app.job_store')
+    def test_upload_endpoint_not_a_pdf(self, mock_job_store, api_client):
+        """Test that a file named .pdf without PDF contents is rejected."""
+        with tempfile.TemporaryDirectory() as upload_dir:
+            with patch.object(config, "UPLOAD_DIR", upload_dir):
+                response = api_client.post(
+                    "/upload",
+                    files={"file": ("test.pdf", b"This is not a PDF file", "application/pdf")}
+                )
+
+            # The rejected upload is not kept
+            assert os.listdir(upload_dir) == []
+
+        assert response.status_code == 400
+        assert "not a valid PDF" in response.json()["detail"]
+        mock_job_store.create_job.assert_not_called()
+
+    @patch('papershelf.api.app.job_store')
+    def test_upload_endpoint_too_large(self, mock_job_store, api_client, sample_pdf_path):
+        """Test that uploads over the size limit are rejected."""
+        with tempfile.TemporaryDirectory() as upload_dir:
+            with patch.object(config, "UPLOAD_DIR", upload_dir), patch.object(config, "MAX_UPLOAD_MB", 0):
+                with open(sample_pdf_path, "rb") as f:
+                    response = api_client.post(
+                        "/upload",
+                        files={"file": ("test.pdf", f, "application/pdf")}
+                    )
+
+            assert os.listdir(upload_dir) == []
+
+        assert response.status_code == 413
+        mock_job_store.create_job.assert_not_called()
+
     @patch('papershelf.api.app.rag_engine')
     def test_query_endpoint(self, mock_rag_engine, api_client):
         """Test the query endpoint."""
@@ -108,7 +354,68 @@ class TestAPI:
         assert len(data["retrieved_documents"]) == 2
         
         # Check that the mock was called correctly
-        mock_rag_engine.query.assert_called_once_with("test query")
+        mock_rag_engine.query.assert_called_once_with("test query", retrieval_mode=None)
+
+    @patch('papershelf.api.app.chat_history_db')
+    @patch('papershelf.api.app.rag_engine')
+    def test_query_endpoint_saves_history(self, mock_rag_engine, mock_chat_history_db, api_client):
+        """Test that queries with a session cookie are saved to the chat history."""
+        retrieved_documents = [{"id": "doc1", "text": "Document 1", "metadata": {}}]
+        mock_rag_engine.query.return_value = {
+            "query": "test query",
+            "answer": "This is a test answer.",
+            "retrieved_documents": retrieved_documents
+        }
+
+        api_client.cookies.set("session_id", "session-1")
+        try:
+            response = api_client.post("/query", json={"query": "test query"})
+        finally:
+            api_client.cookies.clear()
+
+        assert response.status_code == 200
+        mock_chat_history_db.add_chat_entry.assert_called_once_with(
+            session_id="session-1",
+            query="test query",
+            answer="This is a test answer.",
+            retrieved_documents=retrieved_documents
+        )
+
+    @patch('papershelf.api.app.rag_engine')
+    def test_query_endpoint_retrieval_mode(self, mock_rag_engine, api_client):
+        """Test choosing the retrieval mode per query."""
+        mock_rag_engine.query.return_value = {"query": "test query", "answer": "Answer.", "retrieved_documents": []}
+
+        response = api_client.post("/query", json={"query": "test query", "retrieval_mode": "lexical"})
+
+        assert response.status_code == 200
+        mock_rag_engine.query.assert_called_once_with("test query", retrieval_mode="lexical")
+
+        response = api_client.post("/query", json={"query": "test query", "retrieval_mode": "fuzzy"})
+        assert response.status_code == 422
+
+    @patch('papershelf.api.app.chat_history_db')
+    @patch('papershelf.api.app.rag_engine')
+    def test_query_batch_endpoint(self, mock_rag_engine, mock_chat_history_db, api_client):
+        """Test answering several queries in one request."""
+        mock_rag_engine.query_batch.return_value = [
+            {"query": "first", "answer": "Answer 1", "retrieved_documents": []},
+            {"query": "second", "answer": "Answer 2", "retrieved_documents": []}
+        ]
+        api_client.cookies.set("session_id", "session-1")
+        try:
+            response = api_client.post("/query/batch", json={"queries": ["first", "second"]})
+        finally:
+            api_client.cookies.clear()
+
+        assert response.status_code == 200
+        assert [result["answer"] for result in response.json()["results"]] == ["Answer 1", "Answer 2"]
+        mock_rag_engine.query_batch.assert_called_once_with(["first", "second"], retrieval_mode=None)
+        assert mock_chat_history_db.add_chat_entry.call_count == 2
+
+        # Empty and oversized batches are rejected
+        assert api_client.post("/query/batch", json={"queries": []}).status_code == 422
+        assert api_client.post("/query/batch", json={"queries": ["q"] * 1000}).status_code == 422
 
     @patch('papershelf.api.app.rag_engine')
     def test_query_endpoint_error(self, mock_rag_engine, api_client):
@@ -169,4 +476,29 @@ class TestAPI:
         
         # Check that we got a FastAPI app
         assert test_app is not None
-        assert test_app.title == "PaperShelf API"
\ No newline at end of file
+        assert test_app.title == "PaperShelf API"
+
+        # Each call builds a separate app with the same routes
+        assert test_app is not app
+        assert test_app.url_path_for("readiness") == app.url_path_for("readiness") == "/ready"
+
+    @patch('papershelf.api.app.rag_engine')
+    @patch('papershelf.api.app.embedding_generator')
+    @patch('papershelf.api.app.vector_store')
+    def test_ready_endpoint(self, mock_vector_store, mock_embedding_generator, mock_rag_engine, api_client):
+        """Test the readiness endpoint."""
+        mock_vector_store.loaded = True
+        mock_embedding_generator.loaded = False
+        mock_rag_engine.loaded = False
+
+        # Not ready while the model is still loading
+        response = api_client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+        assert response.json()["services"]["vector_store"] is True
+
+        # Ready once the model is loaded
+        mock_embedding_generator.loaded = True
+        response = api_client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Tests for the upload spooling module.
+
+This module tests streaming uploads to disk with size limits, PDF header
+validation and incremental hashing, and cutting off oversized upload
+requests before their body is parsed.
+"""
+
+import asyncio
+import hashlib
+import io
+import os
+import tempfile
+
+import pytest
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from papershelf.api.upload_spool import MULTIPART_OVERHEAD_BYTES, UploadSizeLimitMiddleware, spool_upload
+
+
+def make_upload(data: bytes) -> UploadFile:
+    """Create an in-memory upload."""
+    return UploadFile(file=io.BytesIO(data), filename="test.pdf")
+
+
+class TestSpoolUpload:
+    """Test cases for the spool_upload function."""
+
+    def test_spool_in_chunks(self):
+        """Test that a PDF is written in chunks and hashed incrementally."""
+        data = b"%PDF-1.7\n" + os.urandom(5000)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "upload.pdf")
+            spooled = asyncio.run(spool_upload(make_upload(data), path, max_bytes=10000, chunk_size=7))
+
+            with open(path, "rb") as f:
+                assert f.read() == data
+
+        assert spooled["path"] == path
+        assert spooled["size"] == len(data)
+        assert spooled["content_hash"] == hashlib.sha256(data).hexdigest()
+
+    def test_leading_bytes_before_header(self):
+        """Test that a PDF marker after a little leading junk is accepted."""
+        data = b"\x00" * 100 + b"%PDF-1.4\n" + b"x" * 2000
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "upload.pdf")
+            spooled = asyncio.run(spool_upload(make_upload(data), path, max_bytes=10000, chunk_size=64))
+
+        assert spooled["size"] == len(data)
+
+    @pytest.mark.parametrize("data", [b"not a pdf", b"x" * 5000])
+    def test_rejects_non_pdf(self, data):
+        """Test that files without the PDF marker are rejected and removed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "upload.pdf")
+
+            with pytest.raises(HTTPException) as exc_info:
+                asyncio.run(spool_upload(make_upload(data), path, max_bytes=10000, chunk_size=64))
+
+            assert exc_info.value.status_code == 400
+            assert not os.path.exists(path)
+
+    def test_rejects_oversized_upload(self):
+        """Test that uploads over the limit are rejected and removed."""
+        data = b"%PDF-1.7\n" + b"x" * 5000
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "upload.pdf")
+
+            with pytest.raises(HTTPException) as exc_info:
+                asyncio.run(spool_upload(make_upload(data), path, max_bytes=1000, chunk_size=64))
+
+            assert exc_info.value.status_code == 413
+            assert not os.path.exists(path)
+
+
+@pytest.fixture
+def limited_client() -> TestClient:
+    """Fixture that returns a client of an app whose uploads are limited to 1000 bytes."""
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=1000)
+    app.state.calls = 0
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        app.state.calls += 1
+        return {"size": len(await file.read())}
+
+    return TestClient(app)
+
+
+class TestUploadSizeLimitMiddleware:
+    """Test cases for the UploadSizeLimitMiddleware class."""
+
+    def test_accepts_small_upload(self, limited_client):
+        """Test that uploads within the limit reach the endpoint."""
+        response = limited_client.post("/upload", files={"file": ("test.pdf", b"%PDF-1.7\n", "application/pdf")})
+
+        assert response.status_code == 200
+        assert response.json() == {"size": 9}
+
+    def test_rejects_content_length(self, limited_client):
+        """Test that a request declaring a body over the limit is rejected before it is read."""
+        data = b"x" * (1000 + MULTIPART_OVERHEAD_BYTES + 1)
+        response = limited_client.post("/upload", files={"file": ("test.pdf", data, "application/pdf")})
+
+        assert response.status_code == 413
+        assert "upload limit" in response.json()["detail"]
+        assert limited_client.app.state.calls == 0
+
+    def test_cuts_off_streamed_body(self, limited_client):
+        """Test that a body without a Content-Length is cut off once it passes the limit."""
+        boundary = "papershelf"
+        chunks = [
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"test.pdf\"\r\n\r\n".encode(),
+            *[b"x" * 8192] * 20,
+            f"\r\n--{boundary}--\r\n".encode()
+        ]
+
+        response = limited_client.post(
+            "/upload",
+            content=iter(chunks),
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+        )
+
+        assert response.status_code == 413
+        assert limited_client.app.state.calls == 0
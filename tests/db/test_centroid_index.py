@@ -0,0 +1,89 @@
+"""
+Tests for the paper centroid index module.
+
+This module tests storing one centroid embedding per paper and picking the
+papers closest to a query.
+"""
+
+import os
+import tempfile
+from typing import Generator
+
+import numpy as np
+import pytest
+
+from papershelf.db.centroid_index import PaperCentroidIndex
+
+
+@pytest.fixture
+def centroid_index() -> Generator[PaperCentroidIndex, None, None]:
+    """Fixture that returns a PaperCentroidIndex backed by a temporary database."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield PaperCentroidIndex(os.path.join(temp_dir, "paper_centroids.db"))
+
+
+class TestPaperCentroidIndex:
+    """Test cases for the PaperCentroidIndex class."""
+
+    def test_compute_centroid(self):
+        """Test that chunks count equally and the centroid has unit length."""
+        centroid = PaperCentroidIndex.compute_centroid([[10.0, 0.0], [0.0, 1.0]])
+
+        assert centroid.dtype == np.float32
+        assert np.allclose(centroid, [np.sqrt(0.5), np.sqrt(0.5)])
+
+    def test_search(self, centroid_index):
+        """Test that papers are ranked by the similarity of their centroid to each query."""
+        centroid_index.add_paper("paper1", [[1.0, 0.0, 0.0], [0.9, 0.1, 0.0]])
+        centroid_index.add_paper("paper2", [[0.0, 1.0, 0.0]])
+        centroid_index.add_paper("paper3", [[0.0, 0.0, 1.0], [0.1, 0.0, 1.0]])
+
+        papers = centroid_index.search([[1.0, 0.2, 0.0], [0.0, 0.1, 1.0]], n_papers=2)
+
+        assert papers == [["paper1", "paper2"], ["paper3", "paper2"]]
+        assert centroid_index.search([0.0, 1.0, 0.0], n_papers=10)[0][0] == "paper2"
+        assert centroid_index.count() == 3
+
+    def test_search_empty(self, centroid_index):
+        """Test that searching an empty index returns no papers."""
+        assert centroid_index.search([[1.0, 0.0]], n_papers=5) == [[]]
+
+        # Papers without chunks get no centroid
+        centroid_index.add_paper("paper1", [])
+        assert centroid_index.count() == 0
+
+    def test_add_paper_replaces_and_delete(self, centroid_index):
+        """Test that changes are seen by the next search, including from another instance."""
+        other = PaperCentroidIndex(centroid_index.db_path)
+        centroid_index.add_paper("paper1", [[1.0, 0.0]])
+        centroid_index.add_paper("paper2", [[0.0, 1.0]])
+        assert other.search([[1.0, 0.0]], n_papers=1) == [["paper1"]]
+
+        other.add_paper("paper1", [[-1.0, 0.0]])
+        assert centroid_index.search([[1.0, 0.0]], n_papers=2) == [["paper2", "paper1"]]
+
+        version = centroid_index.get_version()
+        assert other.delete_paper("paper2") is True
+        assert other.delete_paper("paper2") is False
+        assert centroid_index.get_version() == version + 1
+        assert centroid_index.search([[1.0, 0.0]], n_papers=5) == [["paper1"]]
+
+    def test_backfill_from_vector_store(self, centroid_index, vector_store):
+        """Test computing centroids of papers ingested before the index existed."""
+        vector_store.add_documents(
+            document_ids=["paper1_0", "paper1_1", "paper2_0"],
+            embeddings=[[2.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]],
+            texts=["a", "b", "c"],
+            metadatas=[
+                {"doc_id_base": "paper1", "chunk_index": 0},
+                {"doc_id_base": "paper1", "chunk_index": 1},
+                {"doc_id_base": "paper2", "chunk_index": 0}
+            ]
+        )
+
+        assert centroid_index.backfill_from_vector_store(vector_store, batch_size=1) == 2
+        assert centroid_index.search([[1.0, 1.0, 0.0]], n_papers=1) == [["paper1"]]
+
+        # Running it again replaces the centroids instead of duplicating them
+        centroid_index.backfill_from_vector_store(vector_store)
+        assert centroid_index.count() == 2
@@ -0,0 +1,112 @@
+"""
+Tests for the index tuning module.
+
+This module tests measuring recall and latency of HNSW settings against
+exact search, and of two-stage retrieval against full search, over the
+embeddings in the vector store.
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+from papershelf.db.centroid_index import PaperCentroidIndex
+from papershelf.db.index_tuning import (
+    benchmark_two_stage,
+    evaluate_hnsw,
+    exact_neighbors,
+    load_embeddings,
+    tune_index
+)
+from papershelf.db.numpy_vector_store import NumpyVectorStore
+
+
+@pytest.fixture
+def embeddings() -> np.ndarray:
+    """Fixture that returns random embeddings."""
+    return np.random.default_rng(0).normal(size=(300, 16)).astype(np.float32)
+
+
+class TestIndexTuning:
+    """Test cases for the index tuning functions."""
+
+    def test_exact_neighbors(self):
+        """Test that exact search ranks by cosine similarity."""
+        corpus = np.array([[1.0, 0.0], [0.0, 1.0], [2.0, 2.1], [-1.0, 0.0]], dtype=np.float32)
+
+        neighbors, latencies = exact_neighbors(corpus, np.array([[1.0, 1.0]], dtype=np.float32), k=2)
+
+        assert neighbors.tolist() == [[2, 1]]
+        assert len(latencies) == 1
+
+    def test_tune_index(self, vector_store, embeddings):
+        """Test that larger search_ef values reach exact recall."""
+        vector_store.add_documents(
+            document_ids=[f"doc{i}" for i in range(len(embeddings))],
+            embeddings=embeddings,
+            texts=["Text"] * len(embeddings)
+        )
+        assert load_embeddings(vector_store, max_chunks=10, batch_size=4).shape == (10, 16)
+
+        report = tune_index(
+            vector_store,
+            m_values=[4, 8],
+            construction_ef_values=[50],
+            search_ef_values=[5, 300],
+            k=5,
+            num_queries=20
+        )
+
+        assert report["chunks"] == 280
+        assert report["current"] == {"space": "cosine"}
+        assert [(r["M"], r["search_ef"]) for r in report["results"]] == [(4, 5), (4, 300), (8, 5), (8, 300)]
+        assert report["results"][1]["recall"] == pytest.approx(1.0)
+        assert all(r["p99_ms"] >= r["p50_ms"] for r in report["results"])
+
+    def test_tune_index_needs_enough_chunks(self, vector_store, embeddings):
+        """Test that tuning is refused when there are too few chunks to hold out queries."""
+        vector_store.add_documents(document_ids=["doc1"], embeddings=embeddings[:1], texts=["Text"])
+
+        with pytest.raises(ValueError, match="Need more than"):
+            tune_index(vector_store, [16], [100], [10])
+
+    def test_evaluate_hnsw_without_hnswlib(self, embeddings, monkeypatch):
+        """Test that a missing hnswlib is reported with how to install it."""
+        monkeypatch.setitem(sys.modules, "hnswlib", None)
+
+        with pytest.raises(ImportError, match="chroma-hnswlib"):
+            evaluate_hnsw(embeddings, embeddings[:2], exact_neighbors(embeddings, embeddings[:2], 5), 8, 50, [10])
+
+    def test_benchmark_two_stage(self, embeddings):
+        """Test that searching the chunks of every paper matches full search."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vector_store = NumpyVectorStore(persist_directory=temp_dir)
+            centroid_index = PaperCentroidIndex(os.path.join(temp_dir, "paper_centroids.db"))
+            with pytest.raises(ValueError, match="backfill-centroids"):
+                benchmark_two_stage(vector_store, centroid_index, [1])
+
+            for paper in range(10):
+                paper_embeddings = embeddings[paper * 30:(paper + 1) * 30]
+                vector_store.add_documents(
+                    document_ids=[f"paper{paper}_{i}" for i in range(30)],
+                    embeddings=paper_embeddings,
+                    texts=["Text"] * 30,
+                    metadatas=[{"doc_id_base": f"paper{paper}", "chunk_index": i} for i in range(30)]
+                )
+                centroid_index.add_paper(f"paper{paper}", paper_embeddings)
+
+            report = benchmark_two_stage(vector_store, centroid_index, [1, 10], k=5, num_queries=20)
+
+            assert (report["chunks"], report["papers"], report["queries"]) == (300, 10, 20)
+            assert [r["papers"] for r in report["results"]] == [1, 10]
+            assert report["results"][0]["recall"] < 1.0
+            assert report["results"][1]["recall"] == pytest.approx(1.0)
+
+            # Queries are sampled from the first max_chunks chunks read
+            report = benchmark_two_stage(vector_store, centroid_index, [10], k=5, num_queries=20, max_chunks=50)
+            assert report["chunks"] == 50
+            assert report["results"][0]["recall"] == pytest.approx(1.0)
+            vector_store.close()
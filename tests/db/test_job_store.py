@@ -0,0 +1,175 @@
+"""
+Tests for the ingestion job store module.
+
+This module tests creating, claiming, updating and resuming ingestion jobs
+in the durable SQLite job table.
+"""
+
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Generator
+
+import pytest
+
+from papershelf.db.job_store import COMPLETED, FAILED, QUEUED, RUNNING, JobStore
+
+
+@pytest.fixture
+def job_store() -> Generator[JobStore, None, None]:
+    """Fixture that returns a JobStore backed by a temporary database."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield JobStore(os.path.join(temp_dir, "jobs.db"))
+
+
+class TestJobStore:
+    """Test cases for the JobStore class."""
+
+    def test_create_and_get_job(self, job_store):
+        """Test that a new job is queued with empty progress."""
+        job_id = job_store.create_job("/uploads/a.pdf", "a.pdf", "hash-a")
+
+        job = job_store.get_job(job_id)
+        assert job["job_id"] == job_id
+        assert job["state"] == QUEUED
+        assert job["file_path"] == "/uploads/a.pdf"
+        assert job["original_filename"] == "a.pdf"
+        assert job["content_hash"] == "hash-a"
+        assert job["progress"] == {
+            "pages_parsed": 0,
+            "total_pages": None,
+            "chunks_embedded": 0,
+            "total_chunks": None
+        }
+        assert job["timings"]["created_at"] is not None
+        assert job["timings"]["total_seconds"] is None
+
+    def test_get_missing_job(self, job_store):
+        """Test that an unknown job ID returns None."""
+        assert job_store.get_job("missing") is None
+
+    def test_claim_next_job_in_order(self, job_store):
+        """Test that jobs are claimed oldest first and only once."""
+        first = job_store.create_job("/uploads/a.pdf", "a.pdf")
+        second = job_store.create_job("/uploads/b.pdf", "b.pdf")
+
+        claimed = job_store.claim_next_job()
+        assert claimed["job_id"] == first
+        assert claimed["state"] == RUNNING
+        assert claimed["attempts"] == 1
+        assert claimed["timings"]["queued_seconds"] >= 0
+
+        assert job_store.claim_next_job()["job_id"] == second
+        assert job_store.claim_next_job() is None
+
+    def test_progress_and_completion(self, job_store):
+        """Test recording progress, timings and the result of a job."""
+        job_id = job_store.create_job("/uploads/a.pdf", "a.pdf")
+        job_store.claim_next_job()
+
+        job_store.update_progress(job_id, pages_parsed=4, total_pages=4, total_chunks=10, parsed_at=1.0)
+        job_store.update_progress(job_id, chunks_embedded=10)
+        job_store.complete_job(job_id, {"id": "paper-1", "status": "success"})
+
+        job = job_store.get_job(job_id)
+        assert job["state"] == COMPLETED
+        assert job["progress"] == {
+            "pages_parsed": 4,
+            "total_pages": 4,
+            "chunks_embedded": 10,
+            "total_chunks": 10
+        }
+        assert job["result"] == {"id": "paper-1", "status": "success"}
+        assert job["timings"]["total_seconds"] >= 0
+
+    def test_update_progress_rejects_unknown_fields(self, job_store):
+        """Test that only progress columns can be updated."""
+        job_id = job_store.create_job("/uploads/a.pdf", "a.pdf")
+
+        with pytest.raises(ValueError):
+            job_store.update_progress(job_id, state=COMPLETED)
+
+    def test_fail_job(self, job_store):
+        """Test that a failed job keeps its error."""
+        job_id = job_store.create_job("/uploads/a.pdf", "a.pdf")
+        job_store.claim_next_job()
+        job_store.fail_job(job_id, "Error processing PDF: broken")
+
+        job = job_store.get_job(job_id)
+        assert job["state"] == FAILED
+        assert job["error"] == "Error processing PDF: broken"
+        assert job["result"] is None
+
+    def test_find_active_job(self, job_store):
+        """Test finding a queued or running job for the same file."""
+        job_id = job_store.create_job("/uploads/a.pdf", "a.pdf", "hash-a")
+
+        assert job_store.find_active_job("hash-a")["job_id"] == job_id
+        assert job_store.find_active_job("hash-b") is None
+
+        job_store.claim_next_job()
+        job_store.complete_job(job_id, {"id": "paper-1"})
+        assert job_store.find_active_job("hash-a") is None
+
+    def test_requeue_interrupted(self, job_store):
+        """Test that running jobs whose lease expired are requeued with their progress reset."""
+        job_id = job_store.create_job("/uploads/a.pdf", "a.pdf")
+        job_store.claim_next_job("worker-1")
+        job_store.update_progress(job_id, pages_parsed=3)
+
+        # A new store on the same file sees the job left running, but only
+        # requeues it once the lease has expired
+        restarted = JobStore(job_store.db_path)
+        assert restarted.requeue_interrupted(lease_seconds=60) == 0
+        time.sleep(0.01)
+        assert restarted.requeue_interrupted(lease_seconds=0) == 1
+
+        job = restarted.get_job(job_id)
+        assert job["state"] == QUEUED
+        assert job["claimed_by"] is None
+        assert job["progress"]["pages_parsed"] == 0
+        assert restarted.claim_next_job("worker-2")["attempts"] == 2
+
+    def test_heartbeat(self, job_store):
+        """Test that heartbeats renew the lease of the claiming worker only."""
+        job_id = job_store.create_job("/uploads/a.pdf", "a.pdf")
+        assert job_store.claim_next_job("worker-1")["claimed_by"] == "worker-1"
+
+        time.sleep(0.2)
+        assert job_store.heartbeat(job_id, "worker-1") is True
+        assert job_store.heartbeat(job_id, "worker-2") is False
+        assert job_store.requeue_interrupted(lease_seconds=0.1) == 0
+
+        time.sleep(0.2)
+        assert job_store.requeue_interrupted(lease_seconds=0.1) == 1
+        assert job_store.heartbeat(job_id, "worker-1") is False
+
+    def test_adds_lease_columns(self, job_store):
+        """Test that a database created before jobs were leased gains the lease columns."""
+        conn = sqlite3.connect(job_store.db_path)
+        conn.execute("DROP TABLE ingestion_jobs")
+        conn.execute(
+            "CREATE TABLE ingestion_jobs (job_id TEXT PRIMARY KEY, state TEXT NOT NULL, file_path TEXT NOT NULL, "
+            "original_filename TEXT NOT NULL, content_hash TEXT, total_pages INTEGER, "
+            "pages_parsed INTEGER NOT NULL DEFAULT 0, total_chunks INTEGER, "
+            "chunks_embedded INTEGER NOT NULL DEFAULT 0, attempts INTEGER NOT NULL DEFAULT 0, result TEXT, "
+            "error TEXT, created_at REAL NOT NULL, started_at REAL, parsed_at REAL, embedded_at REAL, "
+            "finished_at REAL)"
+        )
+        conn.commit()
+        conn.close()
+
+        upgraded = JobStore(job_store.db_path)
+        upgraded.create_job("/uploads/a.pdf", "a.pdf")
+        assert upgraded.claim_next_job("worker-1")["claimed_by"] == "worker-1"
+
+    def test_list_jobs(self, job_store):
+        """Test listing jobs, optionally by state."""
+        first = job_store.create_job("/uploads/a.pdf", "a.pdf")
+        job_store.create_job("/uploads/b.pdf", "b.pdf")
+        job_store.claim_next_job()
+
+        assert len(job_store.list_jobs()) == 2
+        assert [job["job_id"] for job in job_store.list_jobs(state=RUNNING)] == [first]
+        assert len(job_store.list_jobs(limit=1)) == 1
@@ -0,0 +1,112 @@
+"""
+Tests for the lexical index module.
+
+This module tests indexing chunk text in SQLite FTS5 and ranking chunks
+against a query by BM25.
+"""
+
+import os
+import tempfile
+from typing import Generator
+
+import pytest
+
+from papershelf.db.lexical_index import LexicalIndex
+
+
+@pytest.fixture
+def lexical_index() -> Generator[LexicalIndex, None, None]:
+    """Fixture that returns a LexicalIndex backed by a temporary database."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield LexicalIndex(os.path.join(temp_dir, "lexical_index.db"))
+
+
+TEXTS = [
+    "We evaluate on the ImageNet dataset and report top-1 accuracy.",
+    "Equation 3 defines the scaled dot-product attention used by the transformer.",
+    "Residual connections make very deep networks trainable."
+]
+
+
+def add_paper(lexical_index: LexicalIndex, doc_id_base: str, texts=TEXTS) -> None:
+    """Index the given texts as the chunks of one paper."""
+    lexical_index.add_chunks(
+        [f"{doc_id_base}_{i}" for i in range(len(texts))],
+        texts,
+        metadatas=[{"doc_id_base": doc_id_base, "chunk_index": i} for i in range(len(texts))]
+    )
+
+
+class TestLexicalIndex:
+    """Test cases for the LexicalIndex class."""
+
+    def test_search(self, lexical_index):
+        """Test that chunks containing the query's exact terms are found."""
+        add_paper(lexical_index, "paper1")
+
+        results = lexical_index.search("ImageNet accuracy", n_results=2)
+
+        assert results["ids"] == [["paper1_0"]]
+        assert results["documents"][0][0] == TEXTS[0]
+        assert results["metadatas"][0][0] == {"doc_id_base": "paper1", "chunk_index": 0}
+        assert results["scores"][0][0] > 0
+
+    def test_search_ranks_by_bm25(self, lexical_index):
+        """Test that chunks matching more of the query rank higher."""
+        add_paper(lexical_index, "paper1")
+
+        results = lexical_index.search("attention transformer networks", n_results=5)
+
+        assert results["ids"][0] == ["paper1_1", "paper1_2"]
+        assert results["scores"][0][0] > results["scores"][0][1]
+
+    def test_search_stems_terms(self, lexical_index):
+        """Test that different forms of a word match each other."""
+        add_paper(lexical_index, "paper1")
+
+        results = lexical_index.search("evaluating connection")
+
+        assert sorted(results["ids"][0]) == ["paper1_0", "paper1_2"]
+
+    def test_search_ignores_query_syntax(self, lexical_index):
+        """Test that punctuation and FTS5 operators in queries are treated as plain text."""
+        add_paper(lexical_index, "paper1")
+
+        assert lexical_index.search('"dot-product" AND (NEAR* -:')["ids"][0][0] == "paper1_1"
+        assert lexical_index.search("?!")["ids"] == [[]]
+        assert LexicalIndex.build_match_query("Top-1 top-1") == '"top" OR "1"'
+
+    def test_add_chunks_replaces(self, lexical_index):
+        """Test that indexing a chunk again replaces its text."""
+        add_paper(lexical_index, "paper1")
+        lexical_index.add_chunks(["paper1_0"], ["CIFAR-10 results"], [{"doc_id_base": "paper1", "chunk_index": 0}])
+
+        assert lexical_index.count() == 3
+        assert lexical_index.search("ImageNet")["ids"] == [[]]
+        assert lexical_index.search("CIFAR")["ids"] == [["paper1_0"]]
+
+    def test_delete_paper(self, lexical_index):
+        """Test that deleting a paper removes all of its chunks from the index."""
+        add_paper(lexical_index, "paper1")
+        add_paper(lexical_index, "paper2", texts=["ImageNet again"])
+
+        assert lexical_index.delete_paper("paper1") == 3
+        assert lexical_index.delete_paper("paper1") == 0
+        assert lexical_index.count() == 1
+        assert lexical_index.search("ImageNet")["ids"] == [["paper2_0"]]
+
+    def test_backfill_from_vector_store(self, lexical_index, vector_store, sample_embeddings):
+        """Test indexing chunks that were ingested before the index existed."""
+        vector_store.add_documents(
+            document_ids=["paper1_0", "paper1_1", "paper1_2"],
+            embeddings=sample_embeddings,
+            texts=TEXTS,
+            metadatas=[{"doc_id_base": "paper1", "chunk_index": i} for i in range(3)]
+        )
+
+        assert lexical_index.backfill_from_vector_store(vector_store, batch_size=2) == 3
+        assert lexical_index.search("Residual")["ids"] == [["paper1_2"]]
+
+        # Running it again replaces the chunks instead of duplicating them
+        lexical_index.backfill_from_vector_store(vector_store)
+        assert lexical_index.count() == 3
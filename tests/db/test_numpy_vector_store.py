@@ -0,0 +1,229 @@
+"""
+Tests for the NumPy vector store module.
+
+This module tests exact search over memory-mapped embeddings, replacing
+and deleting chunks, and sharing one store between several instances.
+"""
+
+import tempfile
+from typing import Generator
+
+import numpy as np
+import pytest
+
+from papershelf.db import numpy_vector_store
+from papershelf.db.numpy_vector_store import NumpyVectorStore
+from papershelf.db.vector_backend import create_vector_store
+from papershelf.db.vector_store import VectorStore
+
+
+@pytest.fixture
+def persist_directory() -> Generator[str, None, None]:
+    """Fixture that returns a temporary directory for the store's files."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+@pytest.fixture
+def store(persist_directory) -> Generator[NumpyVectorStore, None, None]:
+    """Fixture that returns a NumpyVectorStore in a temporary directory."""
+    store = NumpyVectorStore(persist_directory=persist_directory)
+    yield store
+    store.close()
+
+
+def add_paper(store: NumpyVectorStore, doc_id_base: str, embeddings, **metadata) -> None:
+    """Add the given embeddings as the chunks of one paper."""
+    store.add_documents(
+        document_ids=[f"{doc_id_base}_{i}" for i in range(len(embeddings))],
+        embeddings=embeddings,
+        texts=[f"{doc_id_base} chunk {i}" for i in range(len(embeddings))],
+        metadatas=[{"doc_id_base": doc_id_base, "chunk_index": i, **metadata} for i in range(len(embeddings))]
+    )
+
+
+class TestNumpyVectorStore:
+    """Test cases for the NumpyVectorStore class."""
+
+    def test_query_is_exact(self, store):
+        """Test that queries return the true nearest neighbours by cosine distance."""
+        embeddings = np.random.default_rng(0).normal(size=(500, 16)).astype(np.float32)
+        add_paper(store, "paper1", embeddings)
+        queries = np.random.default_rng(1).normal(size=(3, 16)).astype(np.float32)
+
+        results = store.query_batch(queries, n_results=5)
+
+        normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        for i, query in enumerate(queries):
+            similarities = normalized @ (query / np.linalg.norm(query))
+            expected = np.argsort(-similarities)[:5]
+            assert results["ids"][i] == [f"paper1_{row}" for row in expected]
+            assert np.allclose(results["distances"][i], 1 - similarities[expected], atol=1e-5)
+        assert results["metadatas"][0][0]["doc_id_base"] == "paper1"
+        assert results["documents"][0][0].startswith("paper1 chunk")
+
+        single = store.query(queries[0], n_results=5)
+        assert single["ids"] == [results["ids"][0]]
+
+    def test_query_empty_store(self, store, sample_embeddings):
+        """Test that querying an empty store returns empty results."""
+        assert store.query(sample_embeddings[0])["ids"] == [[]]
+
+    def test_add_documents_replaces(self, store, sample_embeddings):
+        """Test that adding an existing ID replaces the chunk and leaves a tombstone."""
+        add_paper(store, "paper1", sample_embeddings)
+        store.add_documents(["paper1_0"], [sample_embeddings[2]], ["new text"], [{"doc_id_base": "paper1"}])
+
+        assert store.get_document_by_id("paper1_0")["document"] == "new text"
+        stats = store.get_collection_stats()
+        assert stats["count"] == 3
+        assert stats["tombstones"] == 1
+        assert store.query(sample_embeddings[2], n_results=5)["ids"][0].count("paper1_0") == 1
+
+    def test_add_documents_duplicate_ids_in_batch(self, store, sample_embeddings):
+        """Test that the last copy of an ID repeated within one call wins."""
+        store.add_documents(["a", "a"], sample_embeddings[:2], ["first", "second"])
+
+        assert store.get_document_by_id("a")["document"] == "second"
+        assert store.get_collection_stats()["count"] == 1
+
+    def test_where_filter(self, store, sample_embeddings):
+        """Test that equality and $in filters on metadata restrict the results."""
+        add_paper(store, "paper1", sample_embeddings, source="arxiv")
+        add_paper(store, "paper2", sample_embeddings, source="acl")
+
+        results = store.query(sample_embeddings[0], n_results=10, where={"doc_id_base": "paper2"})
+        assert sorted(results["ids"][0]) == ["paper2_0", "paper2_1", "paper2_2"]
+
+        results = store.query(sample_embeddings[0], n_results=10, where={"source": {"$eq": "arxiv"}})
+        assert sorted(results["ids"][0]) == ["paper1_0", "paper1_1", "paper1_2"]
+
+        results = store.query_batch(
+            sample_embeddings[:2],
+            n_results=2,
+            where={"$and": [{"doc_id_base": {"$in": ["paper2", "paper3"]}}, {"chunk_index": {"$in": [0, 2]}}]}
+        )
+        assert [sorted(ids) for ids in results["ids"]] == [["paper2_0", "paper2_2"], ["paper2_0", "paper2_2"]]
+        assert store.query(sample_embeddings[0], where={"doc_id_base": "paper3"})["ids"] == [[]]
+
+        with pytest.raises(ValueError):
+            store.query(sample_embeddings[0], where={"chunk_index": {"$gt": 1}})
+
+    def test_paper_chunks_and_delete(self, store, sample_embeddings):
+        """Test reading, finding and deleting the chunks of a paper."""
+        add_paper(store, "paper1", sample_embeddings, content_hash="abc")
+        add_paper(store, "paper2", sample_embeddings)
+
+        chunks = store.get_paper_chunks("paper1")
+        assert [chunk["id"] for chunk in chunks] == ["paper1_0", "paper1_1", "paper1_2"]
+        assert chunks[1]["document"] == "paper1 chunk 1"
+        # Content hashes are kept in the paper store, not on chunks
+        assert store.find_paper_by_hash("abc") is None
+
+        assert store.delete_paper("paper1") == 3
+        assert store.delete_paper("paper1") == 0
+        assert store.delete_document("paper2_0") is True
+        assert store.delete_document("paper2_0") is False
+        assert store.get_paper_chunks("paper1") == []
+        assert sorted(store.query(sample_embeddings[0], n_results=10)["ids"][0]) == ["paper2_1", "paper2_2"]
+
+    def test_iter_chunks(self, store, sample_embeddings):
+        """Test paging through chunks with their texts and normalized embeddings."""
+        add_paper(store, "paper1", sample_embeddings)
+        store.delete_document("paper1_1")
+
+        chunks = list(store.iter_chunks(batch_size=1, include_documents=True, include_embeddings=True))
+
+        assert [chunk["id"] for chunk in chunks] == ["paper1_0", "paper1_2"]
+        assert chunks[0]["document"] == "paper1 chunk 0"
+        expected = np.asarray(sample_embeddings[2]) / np.linalg.norm(sample_embeddings[2])
+        assert np.allclose(chunks[1]["embedding"], expected, atol=1e-6)
+
+    def test_grows_past_capacity(self, store, monkeypatch):
+        """Test that the vectors file grows when it is full and keeps earlier rows."""
+        monkeypatch.setattr(numpy_vector_store, "INITIAL_CAPACITY", 4)
+        embeddings = np.eye(10, dtype=np.float32)
+        for i in range(10):
+            store.add_documents([f"doc{i}"], embeddings[i:i + 1], [f"text {i}"])
+
+        assert store.get_collection_stats()["capacity"] >= 10
+        for i in range(10):
+            assert store.query(embeddings[i], n_results=1)["ids"] == [[f"doc{i}"]]
+
+    def test_compact(self, store, sample_embeddings):
+        """Test that compacting drops deleted rows and keeps search results."""
+        add_paper(store, "paper1", sample_embeddings)
+        add_paper(store, "paper2", sample_embeddings)
+        store.delete_paper("paper1")
+        before = store.query(sample_embeddings[0], n_results=3)
+
+        assert store.compact() == 3
+        assert store.compact() == 0
+
+        stats = store.get_collection_stats()
+        assert stats["rows"] == 3
+        assert stats["tombstones"] == 0
+        assert store.query(sample_embeddings[0], n_results=3)["ids"] == before["ids"]
+        assert store.get_document_by_id("paper2_2")["document"] == "paper2 chunk 2"
+
+    def test_shared_between_instances(self, persist_directory, sample_embeddings):
+        """Test that writes by one instance are seen by another sharing the directory."""
+        reader = NumpyVectorStore(persist_directory=persist_directory)
+        writer = NumpyVectorStore(persist_directory=persist_directory)
+
+        assert reader.query(sample_embeddings[0])["ids"] == [[]]
+        add_paper(writer, "paper1", sample_embeddings)
+        assert len(reader.query(sample_embeddings[0])["ids"][0]) == 3
+
+        writer.delete_paper("paper1")
+        add_paper(writer, "paper2", sample_embeddings[:1])
+        writer.compact()
+        assert reader.query(sample_embeddings[0])["ids"] == [["paper2_0"]]
+
+    def test_query_racing_compaction(self, persist_directory, sample_embeddings, monkeypatch):
+        """Test that a query overlapping a compaction in another instance is retried."""
+        reader = NumpyVectorStore(persist_directory=persist_directory)
+        writer = NumpyVectorStore(persist_directory=persist_directory)
+        add_paper(writer, "paper1", sample_embeddings)
+        add_paper(writer, "paper2", sample_embeddings)
+        writer.delete_paper("paper1")
+
+        refresh = reader._refresh
+        calls = []
+
+        def refresh_then_compact():
+            view = refresh()
+            if not calls:
+                writer.compact()
+            calls.append(view)
+            return view
+
+        monkeypatch.setattr(reader, "_refresh", refresh_then_compact)
+        results = reader.query(sample_embeddings[0], n_results=3, where={"doc_id_base": "paper2"})
+
+        assert len(calls) == 2
+        assert results["ids"][0][0] == "paper2_0"
+        assert all(metadata["doc_id_base"] == "paper2" for metadata in results["metadatas"][0])
+
+    def test_background_writes(self, store, sample_embeddings):
+        """Test writing with wait=False and reading the write statistics."""
+        future = store.add_documents(["a", "b", "c"], sample_embeddings, ["x", "y", "z"], wait=False)
+        future.result()
+
+        assert store.get_write_stats()["documents"] == 3
+        assert store.get_collection_stats()["count"] == 3
+
+    def test_dimension_mismatch(self, store, sample_embeddings):
+        """Test that embeddings of a different dimension are rejected."""
+        store.add_documents(["a"], [sample_embeddings[0]], ["x"])
+
+        with pytest.raises(ValueError):
+            store.add_documents(["b"], [[0.1, 0.2]], ["y"])
+        assert store.get_collection_stats()["count"] == 1
+
+    def test_create_vector_store(self, persist_directory):
+        """Test creating each backend by name."""
+        assert isinstance(create_vector_store("numpy", persist_directory=persist_directory), NumpyVectorStore)
+        assert isinstance(create_vector_store("chroma", persist_directory=persist_directory), VectorStore)
+        with pytest.raises(ValueError):
+            create_vector_store("faiss", persist_directory=persist_directory)
@@ -0,0 +1,168 @@
+"""
+Tests for the paper metadata store module.
+
+This module tests storing, looking up and deleting paper-level metadata in
+the SQLite papers table.
+"""
+
+import os
+import tempfile
+from typing import Generator
+
+import pytest
+
+from papershelf.db.paper_store import PaperStore
+
+
+@pytest.fixture
+def paper_store() -> Generator[PaperStore, None, None]:
+    """Fixture that returns a PaperStore backed by a temporary database."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield PaperStore(os.path.join(temp_dir, "papers.db"))
+
+
+METADATA = {
+    "title": "Attention Is All You Need",
+    "author": "Vaswani et al.",
+    "subject": "",
+    "keywords": "transformers",
+    "creator": "LaTeX",
+    "producer": "pdfTeX",
+    "file_path": "/uploads/abc_attention.pdf",
+    "original_filename": "attention.pdf",
+    "page_count": 15
+}
+
+
+class TestPaperStore:
+    """Test cases for the PaperStore class."""
+
+    def test_add_and_get_paper(self, paper_store):
+        """Test that a paper's metadata is stored once and read back."""
+        paper_store.add_paper("paper-1", METADATA, content_hash="hash-1", total_chunks=42)
+
+        paper = paper_store.get_paper("paper-1")
+        assert paper["doc_id_base"] == "paper-1"
+        assert paper["title"] == "Attention Is All You Need"
+        assert paper["original_filename"] == "attention.pdf"
+        assert paper["page_count"] == 15
+        assert paper["total_chunks"] == 42
+        assert paper["content_hash"] == "hash-1"
+
+        assert paper_store.get_paper("missing") is None
+
+    def test_add_paper_replaces(self, paper_store):
+        """Test that storing a paper again replaces its metadata."""
+        paper_store.add_paper("paper-1", METADATA, total_chunks=1)
+        paper_store.add_paper("paper-1", {**METADATA, "title": "New Title"}, total_chunks=2)
+
+        paper = paper_store.get_paper("paper-1")
+        assert paper["title"] == "New Title"
+        assert paper["total_chunks"] == 2
+
+    def test_get_papers(self, paper_store):
+        """Test fetching several papers with one call."""
+        paper_store.add_paper("paper-1", METADATA)
+        paper_store.add_paper("paper-2", {**METADATA, "title": "Second"})
+
+        papers = paper_store.get_papers(["paper-1", "paper-2", "missing"])
+
+        assert set(papers) == {"paper-1", "paper-2"}
+        assert papers["paper-2"]["title"] == "Second"
+        assert paper_store.get_papers([]) == {}
+
+    def test_find_paper_by_hash(self, paper_store):
+        """Test looking up a paper by the hash of its contents."""
+        paper_store.add_paper("paper-1", METADATA, content_hash="hash-1")
+
+        paper = paper_store.find_paper_by_hash("hash-1")
+        assert paper["doc_id_base"] == "paper-1"
+        assert paper["metadata"]["title"] == "Attention Is All You Need"
+
+        assert paper_store.find_paper_by_hash("unknown") is None
+
+    def test_delete_paper(self, paper_store):
+        """Test deleting a paper's metadata."""
+        paper_store.add_paper("paper-1", METADATA, content_hash="hash-1")
+        version = paper_store.get_version()
+
+        assert paper_store.delete_paper("paper-1") is True
+        assert paper_store.get_paper("paper-1") is None
+        assert paper_store.find_paper_by_hash("hash-1") is None
+        assert paper_store.delete_paper("paper-1") is False
+        # Only the delete that removed a paper changes the version
+        assert paper_store.get_version() == version + 1
+
+    def test_list_papers_pages(self, paper_store):
+        """Test that following cursors visits every paper once, in order."""
+        titles = ["delta", "Alpha", "charlie", "Bravo", "echo"]
+        for i, title in enumerate(titles):
+            paper_store.add_paper(f"paper-{i}", {**METADATA, "title": title})
+
+        for descending in (False, True):
+            listed = []
+            cursor = None
+            while True:
+                page = paper_store.list_papers(limit=2, cursor=cursor, sort_by="title", descending=descending)
+                assert len(page["papers"]) <= 2
+                listed.extend(paper["title"] for paper in page["papers"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+
+            assert listed == sorted(titles, key=str.lower, reverse=descending)
+
+    def test_list_papers_ties(self, paper_store):
+        """Test that papers sharing a sort key are split across pages without loss."""
+        for i in range(5):
+            paper_store.add_paper(f"paper-{i}", {**METADATA, "author": "Same Author"})
+
+        first = paper_store.list_papers(limit=3, sort_by="author")
+        second = paper_store.list_papers(limit=3, cursor=first["next_cursor"], sort_by="author")
+
+        ids = [paper["doc_id_base"] for paper in first["papers"] + second["papers"]]
+        assert ids == [f"paper-{i}" for i in range(5)]
+        assert second["next_cursor"] is None
+
+    def test_list_papers_filters(self, paper_store):
+        """Test filtering the catalog by title and author."""
+        paper_store.add_paper("paper-1", {**METADATA, "title": "Deep Residual Learning", "author": "He"})
+        paper_store.add_paper("paper-2", {**METADATA, "title": "Residual 100% Networks", "author": "Zagoruyko"})
+        paper_store.add_paper("paper-3", {**METADATA, "title": "Attention", "author": "Vaswani"})
+
+        def titles(**filters):
+            return [paper["title"] for paper in paper_store.list_papers(sort_by="title", **filters)["papers"]]
+
+        assert titles(title="residual") == ["Deep Residual Learning", "Residual 100% Networks"]
+        assert titles(title="residual", author="zag") == ["Residual 100% Networks"]
+        # LIKE wildcards in the filter are matched literally
+        assert titles(title="100%") == ["Residual 100% Networks"]
+        assert titles(title="_") == []
+
+    def test_list_papers_validation(self, paper_store):
+        """Test that unknown sort orders and malformed cursors are rejected."""
+        with pytest.raises(ValueError):
+            paper_store.list_papers(sort_by="page_count")
+        with pytest.raises(ValueError):
+            paper_store.list_papers(cursor="not-a-cursor")
+
+    def test_backfill_from_vector_store(self, paper_store, vector_store, sample_embeddings):
+        """Test adding papers whose chunks carry a full copy of their metadata."""
+        vector_store.add_documents(
+            document_ids=["old_0", "old_1", "new_0"],
+            embeddings=sample_embeddings,
+            texts=["Text 1", "Text 2", "Text 3"],
+            metadatas=[
+                {**METADATA, "doc_id_base": "old", "chunk_index": 0, "total_chunks": 2, "content_hash": "hash-old"},
+                {**METADATA, "doc_id_base": "old", "chunk_index": 1, "total_chunks": 2, "content_hash": "hash-old"},
+                {"doc_id_base": "new", "chunk_index": 0}
+            ]
+        )
+
+        assert paper_store.backfill_from_vector_store(vector_store, batch_size=1) == 1
+        assert paper_store.get_paper("old")["total_chunks"] == 2
+        assert paper_store.find_paper_by_hash("hash-old")["doc_id_base"] == "old"
+        assert paper_store.count_papers() == 1
+
+        # Running it again adds nothing
+        assert paper_store.backfill_from_vector_store(vector_store) == 0
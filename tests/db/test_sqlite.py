@@ -0,0 +1,33 @@
+"""
+Tests for the SQLite helpers module.
+
+This module tests opening the connections shared by the SQLite stores.
+"""
+
+import os
+import sqlite3
+import tempfile
+
+from papershelf.db.sqlite import connect_sqlite
+
+
+class TestConnectSqlite:
+    """Test cases for connect_sqlite."""
+
+    def test_rows_by_name_and_writer_timeout(self):
+        """Test that rows are returned by column name and writers wait for each other."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "test.db")
+            writer = connect_sqlite(path)
+            writer.execute("CREATE TABLE items (name TEXT)")
+            writer.execute("INSERT INTO items (name) VALUES ('first')")
+            writer.commit()
+
+            reader = connect_sqlite(path)
+            row = reader.execute("SELECT name FROM items").fetchone()
+            assert isinstance(row, sqlite3.Row)
+            assert row["name"] == "first"
+            assert reader.execute("PRAGMA busy_timeout").fetchone()[0] == 30000
+
+            reader.close()
+            writer.close()
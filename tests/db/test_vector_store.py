@@ -7,10 +7,16 @@ from the vector database.
 
 import os
 import tempfile
+import numpy as np
 import pytest
 from unittest.mock import patch, MagicMock
 
-from papershelf.db.vector_store import VectorStore
+from papershelf.db.vector_store import (
+    COLLECTION_NAME,
+    REBUILD_COLLECTION_NAME,
+    REPLACED_COLLECTION_NAME,
+    VectorStore
+)
 
 
 class TestVectorStore:
@@ -31,6 +37,82 @@ class TestVectorStore:
             # Check that the directory was created
             assert os.path.exists(custom_dir)
 
+    def test_hnsw_params(self):
+        """Test that index parameters apply when the collection is created."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = VectorStore(persist_directory=temp_dir, hnsw_params={"M": 8, "search_ef": 50, "batch_size": 0})
+            assert store.get_index_params() == {"space": "cosine", "M": 8, "search_ef": 50}
+            assert store.get_collection_stats()["index"]["M"] == 8
+
+            # An existing collection keeps the parameters it was built with
+            reopened = VectorStore(persist_directory=temp_dir, hnsw_params={"M": 32})
+            assert reopened.get_index_params()["M"] == 8
+
+            with pytest.raises(ValueError, match="Unknown HNSW parameters"):
+                VectorStore(persist_directory=temp_dir, hnsw_params={"ef": 10})
+
+    def test_rebuild_index(self, vector_store, sample_embeddings):
+        """Test rebuilding the collection with new index parameters."""
+        vector_store.add_documents(
+            document_ids=["doc1", "doc2", "doc3"],
+            embeddings=sample_embeddings,
+            texts=["Text 1", "Text 2", "Text 3"],
+            metadatas=[{"doc_id_base": "paper1", "chunk_index": 0}, {}, {"page": 3}]
+        )
+
+        assert vector_store.rebuild_index({"search_ef": 64}, batch_size=2) == 3
+
+        assert vector_store.get_index_params() == {"space": "cosine", "search_ef": 64}
+        assert vector_store.collection.count() == 3
+        assert vector_store.get_document_by_id("doc3")["metadata"] == {"page": 3}
+        results = vector_store.query(query_embedding=sample_embeddings[1], n_results=1)
+        assert results["ids"] == [["doc2"]]
+
+        # Parameters not given keep their value
+        vector_store.rebuild_index({"M": 8})
+        assert vector_store.get_index_params() == {"space": "cosine", "search_ef": 64, "M": 8}
+
+    def test_rebuild_index_recovery(self, vector_store, sample_embeddings):
+        """Test that interrupted rebuilds never lose the chunks."""
+        vector_store.add_documents(
+            document_ids=["doc1", "doc2", "doc3"],
+            embeddings=sample_embeddings,
+            texts=["Text 1", "Text 2", "Text 3"]
+        )
+        chunks = list(vector_store.iter_chunks(include_documents=True, include_embeddings=True))
+        client = vector_store.client
+
+        # Stopped while copying: the incomplete target is rebuilt from the live collection
+        VectorStore._copy_chunks(client.create_collection(REBUILD_COLLECTION_NAME), chunks[:1])
+        assert vector_store.rebuild_index({"search_ef": 64}) == 3
+        assert [collection.name for collection in client.list_collections()] == [COLLECTION_NAME]
+
+        # Stopped while swapping: the complete target replaces the live collection
+        VectorStore._copy_chunks(client.create_collection(REBUILD_COLLECTION_NAME), chunks)
+        vector_store.collection.modify(name=REPLACED_COLLECTION_NAME)
+        reopened = VectorStore(persist_directory=vector_store.persist_directory)
+        assert [collection.name for collection in client.list_collections()] == [COLLECTION_NAME]
+        assert reopened.collection.count() == 3
+        assert reopened.get_document_by_id("doc2")["document"] == "Text 2"
+
+    def test_iter_chunks(self, vector_store, sample_embeddings):
+        """Test paging through the chunks matching a filter."""
+        vector_store.add_documents(
+            document_ids=["doc3", "doc1", "doc2"],
+            embeddings=sample_embeddings,
+            texts=["Text 3", "Text 1", "Text 2"],
+            metadatas=[{"page": 1}, {"page": 1}, {"page": 2}]
+        )
+
+        chunks = list(vector_store.iter_chunks(batch_size=1, include_documents=True))
+        assert [chunk["id"] for chunk in chunks] == ["doc1", "doc2", "doc3"]
+        assert chunks[0]["document"] == "Text 1"
+        assert "embedding" not in chunks[0]
+
+        chunks = list(vector_store.iter_chunks(where={"page": 1}, batch_size=1, include_embeddings=True))
+        assert [chunk["id"] for chunk in chunks] == ["doc1", "doc3"]
+        assert len(chunks[1]["embedding"]) == len(sample_embeddings[0])
+
     def test_add_documents(self, vector_store, sample_embeddings):
         """Test adding documents to the vector store."""
         # Prepare test data
@@ -98,6 +180,35 @@ class TestVectorStore:
         assert len(results["ids"]) == 1  # One query
         assert len(results["ids"][0]) <= 2  # Up to 2 results
 
+    def test_add_and_query_numpy(self, vector_store, sample_embeddings):
+        """Test adding and querying with float32 arrays."""
+        embeddings = np.array(sample_embeddings, dtype=np.float32)
+
+        vector_store.add_documents(
+            document_ids=["doc1", "doc2", "doc3"],
+            embeddings=embeddings,
+            texts=["Text 1", "Text 2", "Text 3"],
+            metadatas=[{"page": 1}, {"page": 2}, {"page": 3}]
+        )
+
+        results = vector_store.query(query_embedding=embeddings[0], n_results=1)
+
+        assert results["ids"][0] == ["doc1"]
+
+    def test_query_batch(self, vector_store, sample_embeddings):
+        """Test querying with several embeddings in one call."""
+        embeddings = np.array(sample_embeddings, dtype=np.float32)
+        vector_store.add_documents(
+            document_ids=["doc1", "doc2", "doc3"],
+            embeddings=embeddings,
+            texts=["Text 1", "Text 2", "Text 3"]
+        )
+
+        results = vector_store.query_batch(query_embeddings=embeddings[[2, 0]], n_results=1)
+
+        assert results["ids"] == [["doc3"], ["doc1"]]
+        assert results["documents"] == [["Text 3"], ["Text 1"]]
+
     def test_query_with_filter(self, vector_store, sample_embeddings):
         """Test querying with a filter condition."""
         # Add some documents with metadata
@@ -156,6 +267,53 @@ class TestVectorStore:
         doc = vector_store.get_document_by_id("non_existent_id")
         assert doc is None
 
+    def test_find_paper_by_hash(self, vector_store, sample_embeddings):
+        """Test looking up a paper by the hash of its contents."""
+        vector_store.add_documents(
+            document_ids=["paper1_0", "paper1_1", "paper2_0"],
+            embeddings=sample_embeddings,
+            texts=["Text 1", "Text 2", "Text 3"],
+            metadatas=[
+                {"doc_id_base": "paper1", "content_hash": "hash1", "chunk_index": 0},
+                {"doc_id_base": "paper1", "content_hash": "hash1", "chunk_index": 1},
+                {"doc_id_base": "paper2", "content_hash": "hash2", "chunk_index": 0}
+            ]
+        )
+
+        # Check that the matching paper is found
+        paper = vector_store.find_paper_by_hash("hash1")
+        assert paper is not None
+        assert paper["doc_id_base"] == "paper1"
+        assert paper["metadata"]["content_hash"] == "hash1"
+
+        # Test with an unknown hash
+        assert vector_store.find_paper_by_hash("unknown") is None
+
+    def test_get_and_delete_paper(self, vector_store, sample_embeddings):
+        """Test listing and deleting all chunks of a paper at once."""
+        vector_store.add_documents(
+            document_ids=["paper1_1", "paper1_0", "paper2_0"],
+            embeddings=sample_embeddings,
+            texts=["Text 2", "Text 1", "Text 3"],
+            metadatas=[
+                {"doc_id_base": "paper1", "chunk_index": 1},
+                {"doc_id_base": "paper1", "chunk_index": 0},
+                {"doc_id_base": "paper2", "chunk_index": 0}
+            ]
+        )
+
+        chunks = vector_store.get_paper_chunks("paper1")
+        assert [chunk["id"] for chunk in chunks] == ["paper1_0", "paper1_1"]
+        assert chunks[0]["document"] == "Text 1"
+        assert "document" not in vector_store.get_paper_chunks("paper1", include_documents=False)[0]
+
+        assert vector_store.delete_paper("paper1") == 2
+        assert vector_store.get_paper_chunks("paper1") == []
+        assert vector_store.collection.count() == 1
+
+        # Deleting an unknown paper removes nothing
+        assert vector_store.delete_paper("paper1") == 0
+
     def test_delete_document(self, vector_store, sample_embeddings):
         """Test deleting a document from the vector store."""
         # Add a document
@@ -206,4 +364,77 @@ class TestVectorStore:
         # Check specific values
         assert stats["count"] == 3
         assert stats["collection_name"] == "academic_papers"
-        assert stats["persist_directory"] == vector_store.persist_directory
\ No newline at end of file
+        assert stats["persist_directory"] == vector_store.persist_directory
+    def test_add_documents_in_batches(self, sample_embeddings):
+        """Test that large writes are split into batches of the configured size."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = VectorStore(persist_directory=temp_dir, write_batch_size=2)
+            embeddings = np.random.rand(5, len(sample_embeddings[0])).astype(np.float32)
+
+            store.collection = MagicMock(wraps=store.collection)
+            store.add_documents(
+                document_ids=[f"doc{i}" for i in range(5)],
+                embeddings=embeddings,
+                texts=[f"Text {i}" for i in range(5)],
+                metadatas=[{"page": i} for i in range(5)]
+            )
+
+            assert [len(call[1]["ids"]) for call in store.collection.upsert.call_args_list] == [2, 2, 1]
+            assert store.collection.count() == 5
+
+            stats = store.get_write_stats()
+            assert stats["batches"] == 3
+            assert stats["documents"] == 5
+            assert stats["write_batch_size"] == 2
+            assert stats["max_batch_ms"] >= stats["p50_batch_ms"] > 0
+
+    def test_write_batch_size_capped_by_client(self):
+        """Test that the batch size never exceeds the client's limit."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = VectorStore(persist_directory=temp_dir, write_batch_size=10 ** 9)
+            assert store.write_batch_size == store.client.max_batch_size
+
+            assert VectorStore(persist_directory=temp_dir).write_batch_size == store.client.max_batch_size
+
+    def test_add_documents_is_idempotent(self, vector_store, sample_embeddings):
+        """Test that writing the same IDs again overwrites instead of duplicating."""
+        for text in ("First version", "Second version"):
+            vector_store.add_documents(
+                document_ids=["doc1", "doc2", "doc3"],
+                embeddings=sample_embeddings,
+                texts=[text, "Text 2", "Text 3"],
+                metadatas=[{"page": 1}, {}, {"page": 3}]
+            )
+
+        assert vector_store.collection.count() == 3
+        doc = vector_store.get_document_by_id("doc1")
+        assert doc["document"] == "Second version"
+        assert vector_store.get_document_by_id("doc2")["metadata"] == {}
+
+    def test_add_documents_in_background(self, vector_store, sample_embeddings):
+        """Test background writes, flushing and error reporting."""
+        future = vector_store.add_documents(
+            document_ids=["doc1", "doc2", "doc3"],
+            embeddings=sample_embeddings,
+            texts=["Text 1", "Text 2", "Text 3"],
+            wait=False
+        )
+        vector_store.flush()
+
+        assert future.done()
+        assert vector_store.collection.count() == 3
+        assert vector_store.get_write_stats()["pending_writes"] == 0
+
+        vector_store.collection = MagicMock()
+        vector_store.collection.upsert.side_effect = Exception("disk full")
+        future = vector_store.add_documents(
+            document_ids=["doc4"],
+            embeddings=[sample_embeddings[0]],
+            texts=["Text 4"],
+            wait=False
+        )
+        with pytest.raises(Exception, match="disk full"):
+            vector_store.flush()
+        assert isinstance(future.exception(), Exception)
+
+        vector_store.close()
@@ -0,0 +1,199 @@
+"""
+Tests for the bulk ingestion module.
+
+This module tests the checkpoint file and running the staged ingestion
+pipeline over directories and zip archives.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import Generator
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from reportlab.pdfgen import canvas
+
+from papershelf.db.lexical_index import LexicalIndex
+from papershelf.db.numpy_vector_store import NumpyVectorStore
+from papershelf.ingest.bulk_ingest import BulkIngestPipeline, IngestCheckpoint
+
+
+def write_pdf(path: str, text: str, pages: int = 2) -> None:
+    """Write a small PDF with the given text on each page."""
+    pdf = canvas.Canvas(path)
+    for page in range(pages):
+        pdf.drawString(72, 720, f"{text} (page {page + 1})")
+        pdf.showPage()
+    pdf.save()
+
+
+@pytest.fixture
+def library() -> Generator[str, None, None]:
+    """Fixture that returns a directory of PDFs, with one duplicate and one broken file."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.makedirs(os.path.join(temp_dir, "nested"))
+        write_pdf(os.path.join(temp_dir, "a.pdf"), "Attention is all you need")
+        write_pdf(os.path.join(temp_dir, "nested", "b.PDF"), "Deep residual learning")
+        shutil.copy(os.path.join(temp_dir, "a.pdf"), os.path.join(temp_dir, "nested", "copy_of_a.pdf"))
+        with open(os.path.join(temp_dir, "broken.pdf"), "wb") as f:
+            f.write(b"not really a pdf")
+        with open(os.path.join(temp_dir, "notes.txt"), "w") as f:
+            f.write("not a pdf")
+        yield temp_dir
+
+
+def make_pipeline(**kwargs) -> BulkIngestPipeline:
+    """Create a pipeline with mocked embedding, storage and indexing services."""
+    embedding_generator = MagicMock()
+    embedding_generator.generate_embeddings.side_effect = (
+        lambda texts, as_numpy: np.ones((len(texts), 2), dtype=np.float32)
+    )
+    vector_store = MagicMock()
+    vector_store.find_paper_by_hash.return_value = None
+    paper_store = MagicMock()
+    paper_store.find_paper_by_hash.return_value = None
+
+    return BulkIngestPipeline(**{
+        "embedding_generator": embedding_generator,
+        "vector_store": vector_store,
+        "paper_store": paper_store,
+        "lexical_index": MagicMock(),
+        "centroid_index": MagicMock(),
+        "parse_workers": 1,
+        "progress_interval": 0.5,
+        "report": lambda line: None,
+        **kwargs
+    })
+
+
+class TestIngestCheckpoint:
+    """Test cases for the IngestCheckpoint class."""
+
+    def test_record_and_reload(self):
+        """Test that finished files are remembered across runs."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "checkpoint.jsonl")
+
+            checkpoint = IngestCheckpoint(path)
+            checkpoint.record("a.pdf", status="ingested", chunks=3)
+            checkpoint.close()
+
+            # Simulate a run killed while writing an entry
+            with open(path, "a") as f:
+                f.write('{"key": "b.p')
+
+            reloaded = IngestCheckpoint(path)
+            assert reloaded.is_finished("a.pdf")
+            assert not reloaded.is_finished("b.pdf")
+            assert reloaded.finished["a.pdf"]["chunks"] == 3
+            reloaded.close()
+
+
+class TestBulkIngestPipeline:
+    """Test cases for the BulkIngestPipeline class."""
+
+    def test_run(self, library):
+        """Test ingesting a directory, with duplicates and failures."""
+        pipeline = make_pipeline()
+        checkpoint_path = os.path.join(library, "checkpoint.jsonl")
+
+        stats = pipeline.run(library, checkpoint_path)
+
+        assert stats["files"] == 4
+        assert stats["ingested"] == 2
+        assert stats["duplicates"] == 1
+        assert stats["failed"] == 1
+        assert stats["errors"][0]["key"] == "broken.pdf"
+        assert stats["chunks"] == sum(
+            len(call[1]["texts"]) for call in pipeline.vector_store.add_documents.call_args_list
+        )
+        assert stats["chunks_per_second"] > 0
+
+        # Each paper is written once with one metadata entry per chunk
+        for call in pipeline.vector_store.add_documents.call_args_list:
+            kwargs = call[1]
+            assert len(kwargs["document_ids"]) == len(kwargs["texts"]) == len(kwargs["metadatas"])
+            assert kwargs["embeddings"].shape == (len(kwargs["texts"]), 2)
+            assert set(kwargs["metadatas"][0]) == {"doc_id_base", "chunk_index"}
+
+        # The same chunks are written to the lexical index
+        assert [call[0][0] for call in pipeline.lexical_index.add_chunks.call_args_list] == [
+            call[1]["document_ids"] for call in pipeline.vector_store.add_documents.call_args_list
+        ]
+
+        # One centroid is computed from each paper's chunk embeddings
+        assert [call[0][0] for call in pipeline.centroid_index.add_paper.call_args_list] == [
+            call[1]["metadatas"][0]["doc_id_base"] for call in pipeline.vector_store.add_documents.call_args_list
+        ]
+
+        # Paper metadata is written once per paper
+        assert pipeline.paper_store.add_paper.call_count == 2
+        for call in pipeline.paper_store.add_paper.call_args_list:
+            assert call[0][1]["original_filename"] in ("a.pdf", "b.PDF", "copy_of_a.pdf")
+
+        # Failed files are not checkpointed so they are retried
+        with open(checkpoint_path) as f:
+            entries = [json.loads(line) for line in f]
+        assert sorted(entry["status"] for entry in entries) == ["duplicate", "ingested", "ingested"]
+
+    def test_resume_skips_finished_files(self, library):
+        """Test that a second run only retries files that did not finish."""
+        checkpoint_path = os.path.join(library, "checkpoint.jsonl")
+        make_pipeline().run(library, checkpoint_path)
+
+        pipeline = make_pipeline()
+        stats = pipeline.run(library, checkpoint_path)
+
+        assert stats["skipped"] == 3
+        assert stats["ingested"] == 0
+        assert stats["failed"] == 1
+        pipeline.vector_store.add_documents.assert_not_called()
+
+    def test_run_zip_archive(self, library):
+        """Test ingesting PDFs from a zip archive."""
+        archive_path = os.path.join(library, "library.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.write(os.path.join(library, "a.pdf"), "papers/a.pdf")
+            archive.write(os.path.join(library, "nested", "b.PDF"), "papers/b.pdf")
+
+        pipeline = make_pipeline()
+        stats = pipeline.run(archive_path, os.path.join(library, "checkpoint.jsonl"))
+
+        assert stats["ingested"] == 2
+        metadata = pipeline.paper_store.add_paper.call_args[0][1]
+        assert metadata["file_path"].startswith(os.path.join(archive_path, "papers"))
+
+    def test_writer_error_stops_run(self, library):
+        """Test that an error in a stage stops the whole pipeline."""
+        pipeline = make_pipeline(queue_size=1)
+        pipeline.vector_store.add_documents.side_effect = Exception("disk full")
+
+        with pytest.raises(RuntimeError, match="disk full"):
+            pipeline.run(library, os.path.join(library, "checkpoint.jsonl"))
+
+    def test_rerun_after_interrupted_write(self, library):
+        """Test that a run stopped between storing a paper and checkpointing it stores no copies."""
+        checkpoint_path = os.path.join(library, "checkpoint.jsonl")
+        with tempfile.TemporaryDirectory() as db_dir:
+            vector_store = NumpyVectorStore(persist_directory=db_dir)
+            lexical_index = LexicalIndex(os.path.join(db_dir, "lexical_index.db"))
+
+            # The first run dies after writing the chunks of the first paper
+            pipeline = make_pipeline(vector_store=vector_store, lexical_index=lexical_index)
+            pipeline.paper_store.add_paper.side_effect = Exception("killed")
+            with pytest.raises(RuntimeError, match="killed"):
+                pipeline.run(library, checkpoint_path)
+            assert vector_store.get_collection_stats()["count"] > 0
+
+            stats = make_pipeline(vector_store=vector_store, lexical_index=lexical_index).run(
+                library, checkpoint_path
+            )
+
+            assert stats["ingested"] == 2
+            assert vector_store.get_collection_stats()["count"] == stats["chunks"]
+            assert lexical_index.count() == stats["chunks"]
+            vector_store.close()
@@ -0,0 +1,77 @@
+"""
+Tests for the embedding batcher module.
+
+This module tests the functionality of batching concurrent embedding requests.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from papershelf.ingest.embedding_batcher import BatchingEmbeddingGenerator
+
+
+def make_generator():
+    """Create a mock embedding generator that embeds text as its length."""
+    generator = MagicMock()
+    generator.model_name = "mock-model"
+    generator.generate_embeddings.side_effect = lambda texts, as_numpy=False: np.array(
+        [[float(len(text))] for text in texts], dtype=np.float32
+    )
+    return generator
+
+
+class TestBatchingEmbeddingGenerator:
+    """Test cases for the BatchingEmbeddingGenerator class."""
+
+    def test_single_request(self):
+        """Test that a single request gets its own embedding back."""
+        batcher = BatchingEmbeddingGenerator(make_generator(), max_wait_ms=1)
+        try:
+            assert batcher.generate_embeddings("abc") == [[3.0]]
+            assert batcher.generate_embeddings(["a", "ab"]) == [[1.0], [2.0]]
+        finally:
+            batcher.close()
+
+    def test_concurrent_requests_are_batched(self):
+        """Test that concurrent requests share model calls and keep their results."""
+        generator = make_generator()
+        batcher = BatchingEmbeddingGenerator(generator, max_batch_size=8, max_wait_ms=200)
+        texts = ["x" * i for i in range(1, 9)]
+
+        try:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(batcher.generate_embeddings, texts))
+        finally:
+            batcher.close()
+
+        # Check that each caller got its own vector
+        assert results == [[[float(i)]] for i in range(1, 9)]
+
+        # Check that fewer model calls were made than requests
+        assert generator.generate_embeddings.call_count < len(texts)
+        assert batcher.get_stats()["texts"] == len(texts)
+
+    def test_large_request_bypasses_queue(self):
+        """Test that a request filling a batch is encoded directly."""
+        generator = make_generator()
+        batcher = BatchingEmbeddingGenerator(generator, max_batch_size=2)
+
+        embeddings = batcher.generate_embeddings(["a", "b", "c"], as_numpy=True)
+        assert embeddings.tolist() == [[1.0], [1.0], [1.0]]
+        generator.generate_embeddings.assert_called_once_with(["a", "b", "c"], as_numpy=True)
+        assert batcher.get_stats()["batches"] == 0
+
+    def test_error_propagates(self):
+        """Test that an encoding error is raised in every waiting caller."""
+        generator = make_generator()
+        generator.generate_embeddings.side_effect = RuntimeError("encode failed")
+        batcher = BatchingEmbeddingGenerator(generator, max_wait_ms=1)
+
+        try:
+            with pytest.raises(RuntimeError):
+                batcher.generate_embeddings("abc")
+        finally:
+            batcher.close()
@@ -0,0 +1,89 @@
+"""
+Tests for the embedding cache module.
+
+This module tests the functionality of caching embeddings on disk.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from papershelf.ingest.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def cache_path():
+    """Fixture that returns a path for a temporary cache database."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield os.path.join(temp_dir, "embedding_cache.db")
+
+
+class TestEmbeddingCache:
+    """Test cases for the EmbeddingCache class."""
+
+    def test_put_and_get(self, cache_path):
+        """Test storing and retrieving embeddings."""
+        cache = EmbeddingCache(cache_path)
+        embeddings = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]], dtype=np.float32)
+
+        cache.put_many("model", ["Text 1", "Text 2"], embeddings)
+        results = cache.get_many("model", ["Text 2", "Unknown", "Text 1"])
+
+        # Check hits and misses
+        assert np.array_equal(results[0], embeddings[1])
+        assert results[1] is None
+        assert np.array_equal(results[2], embeddings[0])
+        assert results[0].dtype == np.float32
+
+        # Check that embeddings are keyed by model
+        assert cache.get_many("other-model", ["Text 1"]) == [None]
+
+        # Check the counters
+        stats = cache.get_stats()
+        assert stats["hits"] == 2
+        assert stats["misses"] == 2
+        assert stats["hit_rate"] == 0.5
+        assert stats["entries"] == 2
+
+    def test_persistence(self, cache_path):
+        """Test that cached embeddings survive reopening the cache."""
+        cache = EmbeddingCache(cache_path)
+        cache.put_many("model", ["Text 1"], np.array([[1.0, 2.0]]))
+        cache.close()
+
+        cache = EmbeddingCache(cache_path)
+        assert cache.get_stats()["entries"] == 1
+        assert np.array_equal(cache.get_many("model", ["Text 1"])[0], [1.0, 2.0])
+
+    def test_lru_eviction(self, cache_path):
+        """Test that the least recently used embeddings are evicted first."""
+        cache = EmbeddingCache(cache_path, max_entries=2)
+        cache.put_many("model", ["Text 1", "Text 2"], np.array([[1.0], [2.0]]))
+
+        # Use Text 1 so that Text 2 becomes the least recently used entry
+        cache.get_many("model", ["Text 1"])
+        cache.put_many("model", ["Text 3"], np.array([[3.0]]))
+
+        results = cache.get_many("model", ["Text 1", "Text 2", "Text 3"])
+        assert results[0] is not None
+        assert results[1] is None
+        assert results[2] is not None
+        assert cache.get_stats()["entries"] == 2
+
+    def test_eviction_shared_between_instances(self, cache_path):
+        """Test that instances sharing one database evict against the same count."""
+        first = EmbeddingCache(cache_path, max_entries=3)
+        second = EmbeddingCache(cache_path, max_entries=3)
+
+        first.put_many("model", ["Text 1", "Text 2"], np.array([[1.0], [2.0]]))
+        second.put_many("model", ["Text 3", "Text 4"], np.array([[3.0], [4.0]]))
+        assert first.get_stats()["entries"] == 3
+        assert second.get_stats()["entries"] == 3
+
+        # Entries evicted by one instance are not counted by the other
+        first.put_many("model", ["Text 5"], np.array([[5.0]]))
+        second.put_many("model", ["Text 5"], np.array([[5.0]]))
+        assert second.get_stats()["entries"] == 3
+        assert sum(result is not None for result in first.get_many("model", [f"Text {i}" for i in range(1, 6)])) == 3
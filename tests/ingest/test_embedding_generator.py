@@ -9,6 +9,7 @@ from unittest.mock import patch, MagicMock
 
 import numpy as np
 
+from papershelf.ingest.embedding_cache import EmbeddingCache
 from papershelf.ingest.embedding_generator import EmbeddingGenerator
 
 
@@ -89,12 +90,60 @@ class TestEmbeddingGenerator:
         embeddings = generator.generate_embeddings(texts)
         
         # Check that the mock was called correctly
-        mock_model.encode.assert_called_once_with(texts, convert_to_tensor=False)
+        mock_model.encode.assert_called_once_with(texts, batch_size=32, normalize_embeddings=False, convert_to_tensor=False)
         
         # Check that we got the expected embeddings
         assert len(embeddings) == 2
-        assert embeddings[0] == [0.1, 0.2, 0.3, 0.4, 0.5]
-        assert embeddings[1] == [0.2, 0.3, 0.4, 0.5, 0.6]
+        assert embeddings[0] == pytest.approx([0.1, 0.2, 0.3, 0.4, 0.5])
+        assert embeddings[1] == pytest.approx([0.2, 0.3, 0.4, 0.5, 0.6])
+
+    @patch('papershelf.ingest.embedding_generator.SentenceTransformer')
+    def test_generate_embeddings_with_cache(self, mock_sentence_transformer, tmp_path):
+        """Test that only cache misses are passed to the model."""
+        # Set up the mock
+        mock_model = MagicMock()
+        mock_sentence_transformer.return_value = mock_model
+        mock_model.encode.return_value = np.array([[0.1, 0.2], [0.3, 0.4]], dtype=np.float32)
+
+        cache = EmbeddingCache(str(tmp_path / "embedding_cache.db"))
+        generator = EmbeddingGenerator(cache=cache)
+
+        # First call encodes both texts
+        embeddings = generator.generate_embeddings(["Text 1", "Text 2"])
+        mock_model.encode.assert_called_once_with(["Text 1", "Text 2"], batch_size=32, normalize_embeddings=False, convert_to_tensor=False)
+
+        # Second call only encodes the new text
+        mock_model.encode.reset_mock()
+        mock_model.encode.return_value = np.array([[0.5, 0.6]], dtype=np.float32)
+        repeated = generator.generate_embeddings(["Text 2", "Text 3", "Text 1"])
+        mock_model.encode.assert_called_once_with(["Text 3"], batch_size=32, normalize_embeddings=False, convert_to_tensor=False)
+
+        assert repeated[0] == embeddings[1]
+        assert repeated[1] == pytest.approx([0.5, 0.6])
+        assert repeated[2] == embeddings[0]
+        assert cache.get_stats()["hits"] == 2
+
+    @patch('papershelf.ingest.embedding_generator.SentenceTransformer')
+    def test_generate_embeddings_as_numpy(self, mock_sentence_transformer):
+        """Test returning embeddings as a contiguous float32 array."""
+        # Set up the mock
+        mock_model = MagicMock()
+        mock_sentence_transformer.return_value = mock_model
+        mock_model.encode.return_value = np.array([[0.1, 0.2], [0.3, 0.4]], dtype=np.float64)
+
+        generator = EmbeddingGenerator(batch_size=64, normalize_embeddings=True)
+        embeddings = generator.generate_embeddings(["Text 1", "Text 2"], as_numpy=True)
+
+        # Check that the encoding options were passed through
+        mock_model.encode.assert_called_once_with(
+            ["Text 1", "Text 2"], batch_size=64, normalize_embeddings=True, convert_to_tensor=False
+        )
+
+        # Check that we got a contiguous float32 array
+        assert isinstance(embeddings, np.ndarray)
+        assert embeddings.dtype == np.float32
+        assert embeddings.shape == (2, 2)
+        assert embeddings.flags["C_CONTIGUOUS"]
 
     def test_get_model_info(self, embedding_generator):
         """Test getting model information."""
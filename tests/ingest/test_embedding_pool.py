@@ -0,0 +1,48 @@
+"""
+Tests for the embedding pool module.
+
+This module tests the functionality of sharding embedding work across
+encoder processes.
+"""
+
+import numpy as np
+
+from papershelf.ingest.embedding_generator import EmbeddingGenerator
+from papershelf.ingest.embedding_pool import EncoderPool
+
+
+class TestEncoderPool:
+    """Test cases for the EncoderPool class."""
+
+    def test_shards(self):
+        """Test splitting texts into contiguous shards."""
+        pool = EncoderPool("all-MiniLM-L6-v2", num_processes=3, min_shard_size=10)
+        try:
+            # Small inputs stay in a single shard
+            assert pool._shards(5) == [(0, 5)]
+            assert pool._shards(25) == [(0, 13), (13, 25)]
+
+            # Large inputs use every process, with balanced shard sizes
+            assert pool._shards(100) == [(0, 34), (34, 67), (67, 100)]
+        finally:
+            pool.close()
+
+    def test_pool_matches_single_process(self, embedding_generator):
+        """Test that pooled embeddings match in-process embeddings, in order."""
+        texts = [f"Sentence number {i} about academic papers." for i in range(20)]
+
+        pooled_generator = EmbeddingGenerator(
+            model_name="all-MiniLM-L6-v2",
+            num_processes=2,
+            threads_per_process=1
+        )
+        pooled_generator.model.min_shard_size = 5
+        try:
+            pooled = pooled_generator.generate_embeddings(texts, as_numpy=True)
+        finally:
+            pooled_generator.close()
+
+        expected = embedding_generator.generate_embeddings(texts, as_numpy=True)
+
+        assert pooled.shape == expected.shape
+        assert np.allclose(pooled, expected, atol=1e-5)
@@ -0,0 +1,252 @@
+"""
+Tests for the ingestion jobs module.
+
+This module tests processing queued ingestion jobs in the background worker
+pool, including progress reporting and resuming interrupted jobs.
+"""
+
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Generator
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from papershelf.db.centroid_index import PaperCentroidIndex
+from papershelf.db.job_store import COMPLETED, FAILED, QUEUED, RUNNING, JobStore
+from papershelf.db.lexical_index import LexicalIndex
+from papershelf.db.paper_store import PaperStore
+from papershelf.ingest.ingestion_jobs import IngestionWorkerPool
+
+
+@pytest.fixture
+def temp_dir() -> Generator[str, None, None]:
+    """Fixture that returns a temporary directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+
+def make_pool(temp_dir: str, **kwargs) -> IngestionWorkerPool:
+    """Create a worker pool with real job and paper stores and indexes, and mocked services."""
+    pdf_processor = MagicMock()
+    pdf_processor.parse_pdf.return_value = {
+        "metadata": {"title": "Test Paper", "author": "Test Author", "page_count": 2},
+        "chunks": ["Chunk 1", "Chunk 2", "Chunk 3"],
+        "page_boundaries": [0, 20]
+    }
+    embedding_generator = MagicMock()
+    embedding_generator.generate_embeddings.side_effect = (
+        lambda texts, as_numpy: np.ones((len(texts), 2), dtype=np.float32)
+    )
+    vector_store = MagicMock()
+    vector_store.find_paper_by_hash.return_value = None
+
+    return IngestionWorkerPool(
+        job_store=JobStore(os.path.join(temp_dir, "jobs.db")),
+        pdf_processor=pdf_processor,
+        embedding_generator=embedding_generator,
+        vector_store=vector_store,
+        paper_store=PaperStore(os.path.join(temp_dir, "papers.db")),
+        lexical_index=LexicalIndex(os.path.join(temp_dir, "lexical_index.db")),
+        centroid_index=PaperCentroidIndex(os.path.join(temp_dir, "paper_centroids.db")),
+        **kwargs
+    )
+
+
+def make_upload(temp_dir: str, name: str = "paper.pdf") -> str:
+    """Create a placeholder uploaded file."""
+    path = os.path.join(temp_dir, name)
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.7\n")
+    return path
+
+
+class TestIngestionWorkerPool:
+    """Test cases for the IngestionWorkerPool class."""
+
+    def test_process_job(self, temp_dir):
+        """Test that a job parses, embeds and stores a paper."""
+        pool = make_pool(temp_dir, embed_batch_size=2)
+        upload_path = make_upload(temp_dir)
+        job_id = pool.job_store.create_job(upload_path, "paper.pdf", "abc123")
+
+        pool.process_job(pool.job_store.claim_next_job())
+
+        job = pool.job_store.get_job(job_id)
+        assert job["state"] == COMPLETED
+        assert job["progress"] == {
+            "pages_parsed": 2,
+            "total_pages": 2,
+            "chunks_embedded": 3,
+            "total_chunks": 3
+        }
+        assert job["result"]["title"] == "Test Paper"
+        assert job["result"]["status"] == "success"
+        assert job["timings"]["embed_seconds"] is not None
+
+        # Embeddings are generated in batches of embed_batch_size
+        assert pool.embedding_generator.generate_embeddings.call_count == 2
+
+        # Check the stored chunks
+        kwargs = pool.vector_store.add_documents.call_args[1]
+        assert kwargs["document_ids"] == [f"{job['result']['id']}_{i}" for i in range(3)]
+        assert kwargs["embeddings"].shape == (3, 2)
+        assert kwargs["metadatas"][1] == {"doc_id_base": job["result"]["id"], "chunk_index": 1}
+
+        # The chunk text is indexed for lexical search
+        assert pool.lexical_index.search("Chunk 2", n_results=3)["ids"][0][0] == f"{job['result']['id']}_1"
+
+        # The paper's centroid is stored for two-stage retrieval
+        assert pool.centroid_index.search([[1.0, 1.0]], n_papers=5) == [[job["result"]["id"]]]
+
+        # Paper metadata is stored once, in the paper store
+        paper = pool.paper_store.get_paper(job["result"]["id"])
+        assert paper["title"] == "Test Paper"
+        assert paper["content_hash"] == "abc123"
+        assert paper["original_filename"] == "paper.pdf"
+        assert paper["total_chunks"] == 3
+
+        # The upload is removed once the job is done
+        assert not os.path.exists(upload_path)
+
+        # Uploading the same file again finds the paper in the paper store
+        job_id = pool.job_store.create_job(make_upload(temp_dir), "copy.pdf", "abc123")
+        pool.process_job(pool.job_store.claim_next_job())
+        duplicate = pool.job_store.get_job(job_id)["result"]
+        assert duplicate["status"] == "duplicate"
+        assert duplicate["id"] == paper["doc_id_base"]
+
+    def test_retried_job_overwrites_partial_writes(self, temp_dir):
+        """Test that a job retried after an interruption reuses its paper ID."""
+        pool = make_pool(temp_dir)
+        job_id = pool.job_store.create_job(make_upload(temp_dir), "paper.pdf")
+
+        # The first attempt stores the paper but stops before completing the job
+        pool._ingest(pool.job_store.claim_next_job())
+        pool.job_store.requeue_interrupted(lease_seconds=-1)
+        pool.process_job(pool.job_store.claim_next_job())
+
+        assert pool.job_store.get_job(job_id)["result"]["id"] == job_id
+        first, second = pool.vector_store.add_documents.call_args_list
+        assert first[1]["document_ids"] == second[1]["document_ids"] == [f"{job_id}_{i}" for i in range(3)]
+        assert pool.lexical_index.count() == 3
+        assert pool.centroid_index.count() == 1
+        assert pool.paper_store.get_paper(job_id)["total_chunks"] == 3
+
+    def test_process_job_duplicate(self, temp_dir):
+        """Test that a job for a paper stored with per-chunk metadata skips ingestion."""
+        pool = make_pool(temp_dir)
+        pool.vector_store.find_paper_by_hash.return_value = {
+            "doc_id_base": "existing-id",
+            "metadata": {"title": "Test Paper"}
+        }
+        job_id = pool.job_store.create_job(make_upload(temp_dir), "paper.pdf", "abc123")
+
+        pool.process_job(pool.job_store.claim_next_job())
+
+        job = pool.job_store.get_job(job_id)
+        assert job["state"] == COMPLETED
+        assert job["result"]["id"] == "existing-id"
+        assert job["result"]["status"] == "duplicate"
+        pool.pdf_processor.parse_pdf.assert_not_called()
+
+    def test_process_job_failure(self, temp_dir):
+        """Test that a failing job records its error."""
+        pool = make_pool(temp_dir)
+        pool.pdf_processor.parse_pdf.side_effect = Exception("Test error")
+        upload_path = make_upload(temp_dir)
+        job_id = pool.job_store.create_job(upload_path, "paper.pdf", "abc123")
+
+        pool.process_job(pool.job_store.claim_next_job())
+
+        job = pool.job_store.get_job(job_id)
+        assert job["state"] == FAILED
+        assert "Test error" in job["error"]
+        assert not os.path.exists(upload_path)
+
+    def test_worker_survives_recording_error(self, temp_dir):
+        """Test that a failure to record a job's outcome keeps its upload and its worker."""
+        pool = make_pool(temp_dir, num_workers=1, poll_interval=0.05)
+        upload_path = make_upload(temp_dir, "a.pdf")
+        first = pool.job_store.create_job(upload_path, "a.pdf", "hash-a")
+        complete_job = pool.job_store.complete_job
+        calls = []
+
+        def locked_once(job_id, result):
+            calls.append(job_id)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("database is locked")
+            complete_job(job_id, result)
+
+        pool.job_store.complete_job = locked_once
+        pool.start(resume=False)
+        try:
+            second = pool.job_store.create_job(make_upload(temp_dir, "b.pdf"), "b.pdf", "hash-b")
+            pool.notify()
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline and pool.job_store.get_job(second)["state"] != COMPLETED:
+                time.sleep(0.05)
+        finally:
+            pool.stop(timeout=5)
+
+        # The worker went on to the next job, and the first can still be retried
+        assert pool.job_store.get_job(second)["state"] == COMPLETED
+        assert pool.job_store.get_job(first)["state"] == RUNNING
+        assert os.path.exists(upload_path)
+
+    def test_workers_resume_interrupted_jobs(self, temp_dir):
+        """Test that started workers resume jobs whose lease expired and pick up new ones."""
+        pool = make_pool(temp_dir, num_workers=2, poll_interval=0.05, lease_seconds=0.2)
+        interrupted = pool.job_store.create_job(make_upload(temp_dir, "a.pdf"), "a.pdf", "hash-a")
+        pool.job_store.claim_next_job("stopped-worker")
+        time.sleep(0.3)
+
+        pool.start(resume=True)
+        try:
+            queued = pool.job_store.create_job(make_upload(temp_dir, "b.pdf"), "b.pdf", "hash-b")
+            pool.notify()
+
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                states = {pool.job_store.get_job(job_id)["state"] for job_id in (interrupted, queued)}
+                if states == {COMPLETED}:
+                    break
+                time.sleep(0.05)
+        finally:
+            pool.stop(timeout=5)
+
+        assert pool.job_store.get_job(interrupted)["state"] == COMPLETED
+        assert pool.job_store.get_job(interrupted)["attempts"] == 2
+        assert pool.job_store.get_job(queued)["state"] == COMPLETED
+
+    def test_start_without_resume(self, temp_dir):
+        """Test that running jobs are left alone when not resuming."""
+        pool = make_pool(temp_dir, num_workers=1, poll_interval=0.05)
+        job_id = pool.job_store.create_job(make_upload(temp_dir), "paper.pdf")
+        pool.job_store.claim_next_job()
+
+        pool.start(resume=False)
+        pool.stop(timeout=5)
+
+        assert pool.job_store.get_job(job_id)["state"] != QUEUED
+
+    def test_running_job_keeps_lease(self, temp_dir):
+        """Test that a job outlasting its lease is not requeued while its worker runs it."""
+        pool = make_pool(temp_dir, lease_seconds=0.2)
+        parsed = pool.pdf_processor.parse_pdf.return_value
+
+        def slow_parse(*args, **kwargs):
+            time.sleep(0.5)
+            assert pool.job_store.requeue_interrupted(pool.lease_seconds) == 0
+            return parsed
+
+        pool.pdf_processor.parse_pdf.side_effect = slow_parse
+        job_id = pool.job_store.create_job(make_upload(temp_dir), "paper.pdf")
+        pool.process_job(pool.job_store.claim_next_job(pool.worker_id))
+
+        job = pool.job_store.get_job(job_id)
+        assert job["state"] == COMPLETED
+        assert job["attempts"] == 1
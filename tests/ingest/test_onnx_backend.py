@@ -0,0 +1,85 @@
+"""
+Tests for the ONNX backend module.
+
+This module tests exporting models to ONNX and checking their parity
+with the torch backend.
+"""
+
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+import pytest
+
+from papershelf.ingest.embedding_generator import EmbeddingGenerator
+from papershelf.ingest.onnx_backend import check_parity
+
+
+class TestOnnxBackend:
+    """Test cases for the ONNX embedding backend."""
+
+    def test_check_parity(self):
+        """Test measuring cosine drift between two generators."""
+        reference = MagicMock()
+        reference.generate_embeddings.return_value = np.array([[1.0, 0.0], [0.0, 1.0]])
+        candidate = MagicMock()
+        candidate.generate_embeddings.return_value = np.array([[1.0, 0.0], [0.6, 0.8]])
+
+        report = check_parity(reference, candidate, ["Text 1", "Text 2"])
+
+        assert report["texts"] == 2
+        assert report["min_cosine"] == pytest.approx(0.8)
+        assert report["mean_cosine"] == pytest.approx(0.9)
+        assert report["max_cosine_drift"] == pytest.approx(0.2)
+
+    @patch('papershelf.ingest.embedding_generator.SentenceTransformer')
+    def test_unknown_backend(self, mock_sentence_transformer):
+        """Test that an unknown backend is rejected."""
+        with pytest.raises(ValueError):
+            EmbeddingGenerator(backend="tensorflow")
+
+    def test_onnx_parity_with_torch(self, embedding_generator, tmp_path):
+        """Test that the quantized ONNX backend stays close to the torch backend."""
+        pytest.importorskip("onnxruntime")
+        pytest.importorskip("onnx")
+
+        onnx_generator = EmbeddingGenerator(
+            model_name="all-MiniLM-L6-v2",
+            backend="onnx",
+            onnx_cache_dir=str(tmp_path),
+            onnx_quantize=True
+        )
+        texts = [
+            "This is a sample academic paper text.",
+            "Embeddings are vector representations of text that capture semantic meaning."
+        ]
+
+        report = check_parity(embedding_generator, onnx_generator, texts)
+
+        assert report["min_cosine"] > 0.98
+        assert onnx_generator.get_model_info()["model_dimension"] == "384"
+
+    def test_onnx_sort_by_length_preserves_order(self, tmp_path):
+        """Test that length-bucketed encoding returns embeddings in input order."""
+        pytest.importorskip("onnxruntime")
+        pytest.importorskip("onnx")
+
+        texts = [
+            "Short.",
+            "A much longer sentence about the evaluation protocol used in this paper.",
+            "Medium length sentence.",
+            "Tiny"
+        ] * 5
+
+        embeddings = {}
+        for sort_by_length in (False, True):
+            generator = EmbeddingGenerator(
+                model_name="all-MiniLM-L6-v2",
+                backend="onnx",
+                onnx_cache_dir=str(tmp_path),
+                onnx_quantize=False,
+                batch_size=3,
+                sort_by_length=sort_by_length
+            )
+            embeddings[sort_by_length] = generator.generate_embeddings(texts, as_numpy=True)
+
+        assert np.allclose(embeddings[False], embeddings[True], atol=1e-5)
@@ -8,6 +8,8 @@ import os
 import pytest
 from unittest.mock import patch, MagicMock
 
+from pypdf import PdfReader
+
 from papershelf.ingest.pdf_processor import PDFProcessor
 
 
@@ -44,6 +46,38 @@ class TestPDFProcessor:
         assert isinstance(text, str)
         assert len(text) > 0
 
+    def test_page_ranges(self):
+        """Test splitting a document's pages into worker ranges."""
+        processor = PDFProcessor(pages_per_task=4)
+
+        assert processor._page_ranges(10) == [(0, 4), (4, 8), (8, 10)]
+        assert processor._page_ranges(4) == [(0, 4)]
+        assert processor._page_ranges(0) == []
+
+    def test_extract_pages_parallel(self, sample_pdf_path):
+        """Test that parallel extraction preserves page order."""
+        from reportlab.pdfgen import canvas
+
+        pdf_path = os.path.join(os.path.dirname(sample_pdf_path), "multi_page.pdf")
+        pdf = canvas.Canvas(pdf_path)
+        for i in range(7):
+            pdf.drawString(100, 700, f"Page number {i}")
+            pdf.showPage()
+        pdf.save()
+
+        sequential = PDFProcessor().extract_pages(pdf_path)
+
+        processor = PDFProcessor(max_workers=2, pages_per_task=2, max_tasks_per_worker=1)
+        try:
+            parallel = processor.extract_pages(pdf_path)
+        finally:
+            processor.close()
+
+        assert len(parallel) == 7
+        assert parallel == sequential
+        for i, page in enumerate(parallel):
+            assert f"Page number {i}" in page
+
     def test_chunk_text(self):
         """Test chunking text into smaller pieces."""
         processor = PDFProcessor(chunk_size=10, chunk_overlap=3)
@@ -76,6 +110,25 @@ class TestPDFProcessor:
             combined += chunk[processor.chunk_overlap:]
         assert combined == text
 
+    def test_iter_chunks_across_pages(self):
+        """Test that streamed chunks match chunking the joined text."""
+        processor = PDFProcessor(chunk_size=10, chunk_overlap=3)
+        pages = ["First page", "", "A much longer second page of text", "End"]
+
+        chunks = list(processor.iter_chunks(iter(pages)))
+        expected = processor.chunk_text("".join(page + "\n" for page in pages))
+
+        assert chunks == expected
+        assert all(len(chunk) <= processor.chunk_size for chunk in chunks)
+
+        # No pages means no chunks
+        assert list(processor.iter_chunks(iter([]))) == []
+
+    def test_invalid_chunk_overlap(self):
+        """Test that an overlap at least as large as the chunk size is rejected."""
+        with pytest.raises(ValueError):
+            PDFProcessor(chunk_size=100, chunk_overlap=100)
+
     def test_process_pdf(self, sample_pdf_path):
         """Test the full PDF processing pipeline."""
         processor = PDFProcessor(chunk_size=50, chunk_overlap=10)
@@ -91,6 +144,20 @@ class TestPDFProcessor:
         for chunk in chunks:
             assert isinstance(chunk, str)
 
+    def test_compute_content_hash(self, sample_pdf_path):
+        """Test hashing the contents of a PDF file."""
+        import hashlib
+
+        processor = PDFProcessor()
+
+        with open(sample_pdf_path, "rb") as f:
+            expected = hashlib.sha256(f.read()).hexdigest()
+
+        assert processor.compute_content_hash(sample_pdf_path) == expected
+
+        with pytest.raises(FileNotFoundError):
+            processor.compute_content_hash("non_existent_file.pdf")
+
     def test_extract_metadata(self, sample_pdf_path):
         """Test extracting metadata from a PDF file."""
         processor = PDFProcessor()
@@ -138,4 +205,28 @@ class TestPDFProcessor:
         assert metadata["keywords"] == "test, keywords"
         assert metadata["creator"] == "Test Creator"
         assert metadata["producer"] == "Test Producer"
-        assert metadata["page_count"] == 2
\ No newline at end of file
+        assert metadata["page_count"] == 2
+
+    def test_parse_pdf(self, sample_pdf_path):
+        """Test parsing metadata, chunks and page map in a single pass."""
+        processor = PDFProcessor(chunk_size=50, chunk_overlap=10)
+
+        with patch('papershelf.ingest.pdf_processor.PdfReader', wraps=PdfReader) as mock_pdf_reader:
+            parsed = processor.parse_pdf(sample_pdf_path)
+
+        # The file is only opened once
+        mock_pdf_reader.assert_called_once_with(sample_pdf_path)
+
+        # Check that the results match the separate entry points
+        assert parsed["metadata"] == processor.extract_metadata(sample_pdf_path)
+        assert parsed["chunks"] == processor.process_pdf(sample_pdf_path)
+        assert parsed["page_boundaries"] == [0]
+
+    def test_parse_pdf_reports_pages(self, sample_pdf_path):
+        """Test that parse_pdf reports the number of pages parsed."""
+        processor = PDFProcessor(chunk_size=50, chunk_overlap=10)
+        on_page = MagicMock()
+
+        processor.parse_pdf(sample_pdf_path, on_page=on_page)
+
+        on_page.assert_called_once_with(1)
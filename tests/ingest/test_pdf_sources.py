@@ -0,0 +1,105 @@
+"""
+Tests for the PDF sources module.
+
+This module tests finding PDFs in directories and zip archives and parsing
+them one at a time.
+"""
+
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import Generator
+
+import pytest
+from reportlab.pdfgen import canvas
+
+from papershelf.ingest.pdf_sources import PdfSource, find_pdf_sources, parse_source
+
+
+def write_pdf(path: str, text: str, pages: int = 2) -> None:
+    """Write a small PDF with the given text on each page."""
+    pdf = canvas.Canvas(path)
+    for page in range(pages):
+        pdf.drawString(72, 720, f"{text} (page {page + 1})")
+        pdf.showPage()
+    pdf.save()
+
+
+@pytest.fixture
+def library() -> Generator[str, None, None]:
+    """Fixture that returns a directory of PDFs, with one duplicate and one broken file."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.makedirs(os.path.join(temp_dir, "nested"))
+        write_pdf(os.path.join(temp_dir, "a.pdf"), "Attention is all you need")
+        write_pdf(os.path.join(temp_dir, "nested", "b.PDF"), "Deep residual learning")
+        shutil.copy(os.path.join(temp_dir, "a.pdf"), os.path.join(temp_dir, "nested", "copy_of_a.pdf"))
+        with open(os.path.join(temp_dir, "broken.pdf"), "wb") as f:
+            f.write(b"not really a pdf")
+        with open(os.path.join(temp_dir, "notes.txt"), "w") as f:
+            f.write("not a pdf")
+        yield temp_dir
+
+
+class TestFindPdfSources:
+    """Test cases for find_pdf_sources."""
+
+    def test_directory(self, library):
+        """Test that PDFs are found recursively, keyed by relative path."""
+        sources = find_pdf_sources(library)
+
+        assert [source.key for source in sources] == [
+            "a.pdf",
+            "broken.pdf",
+            os.path.join("nested", "b.PDF"),
+            os.path.join("nested", "copy_of_a.pdf")
+        ]
+        assert all(source.member is None for source in sources)
+
+    def test_zip_archive(self, library):
+        """Test that PDFs inside a zip archive are found by member name."""
+        archive_path = os.path.join(library, "library.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.write(os.path.join(library, "a.pdf"), "papers/a.pdf")
+            archive.write(os.path.join(library, "notes.txt"), "notes.txt")
+
+        assert find_pdf_sources(archive_path) == [PdfSource("papers/a.pdf", archive_path, "papers/a.pdf")]
+
+    def test_invalid_source(self, library):
+        """Test that a path that is neither a directory nor an archive is rejected."""
+        with pytest.raises(ValueError):
+            find_pdf_sources(os.path.join(library, "notes.txt"))
+
+
+class TestParseSource:
+    """Test cases for parse_source."""
+
+    def test_parse_file(self, library):
+        """Test parsing a PDF file."""
+        parsed = parse_source(PdfSource("a.pdf", os.path.join(library, "a.pdf")), 1000, 200)
+
+        assert parsed["key"] == "a.pdf"
+        assert len(parsed["content_hash"]) == 64
+        assert "Attention is all you need" in parsed["chunks"][0]
+        assert parsed["metadata"]["original_filename"] == "a.pdf"
+        assert parsed["metadata"]["page_count"] == 2
+
+    def test_parse_archive_member(self, library):
+        """Test that archive members are parsed like the original file."""
+        archive_path = os.path.join(library, "library.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.write(os.path.join(library, "a.pdf"), "papers/a.pdf")
+
+        from_file = parse_source(PdfSource("a.pdf", os.path.join(library, "a.pdf")), 1000, 200)
+        from_archive = parse_source(PdfSource("papers/a.pdf", archive_path, "papers/a.pdf"), 1000, 200)
+
+        assert from_archive["content_hash"] == from_file["content_hash"]
+        assert from_archive["chunks"] == from_file["chunks"]
+        assert from_archive["metadata"]["file_path"] == os.path.join(archive_path, "papers/a.pdf")
+
+    def test_parse_error(self, library):
+        """Test that a broken PDF is reported instead of raising."""
+        parsed = parse_source(PdfSource("broken.pdf", os.path.join(library, "broken.pdf")), 1000, 200)
+
+        assert parsed["key"] == "broken.pdf"
+        assert "error" in parsed
@@ -0,0 +1,62 @@
+"""
+Tests for the paper metadata cache module.
+
+This module tests the LRU cache that sits in front of the paper metadata
+store.
+"""
+
+from unittest.mock import MagicMock
+
+from papershelf.query.paper_cache import PaperMetadataCache
+
+
+def make_store(papers):
+    """Create a mocked paper store holding the given papers."""
+    store = MagicMock()
+    store.get_papers.side_effect = lambda ids: {i: papers[i] for i in ids if i in papers}
+    return store
+
+
+class TestPaperMetadataCache:
+    """Test cases for the PaperMetadataCache class."""
+
+    def test_get_many_loads_misses_once(self):
+        """Test that uncached papers are loaded in one call and then served from memory."""
+        store = make_store({"a": {"title": "A"}, "b": {"title": "B"}})
+        cache = PaperMetadataCache(store, capacity=10)
+
+        assert cache.get_many(["a", "b", "a"]) == {"a": {"title": "A"}, "b": {"title": "B"}}
+        store.get_papers.assert_called_once_with(["a", "b"])
+
+        assert cache.get_many(["b"]) == {"b": {"title": "B"}}
+        assert store.get_papers.call_count == 1
+        assert cache.get_stats()["hits"] == 1
+
+    def test_missing_papers_are_not_cached(self):
+        """Test that a paper missing from the store is looked up again later."""
+        papers = {}
+        store = make_store(papers)
+        cache = PaperMetadataCache(store, capacity=10)
+
+        assert cache.get_many(["a"]) == {}
+        papers["a"] = {"title": "A"}
+        assert cache.get_many(["a"]) == {"a": {"title": "A"}}
+
+    def test_eviction_and_invalidate(self):
+        """Test that the least recently used paper is evicted and invalidation works."""
+        store = make_store({"a": {"title": "A"}, "b": {"title": "B"}, "c": {"title": "C"}})
+        cache = PaperMetadataCache(store, capacity=2)
+
+        cache.get_many(["a", "b"])
+        cache.get_many(["a"])
+        cache.get_many(["c"])
+        assert cache.get_stats()["size"] == 2
+
+        store.get_papers.reset_mock()
+        cache.get_many(["b"])
+        store.get_papers.assert_called_once_with(["b"])
+
+        cache.invalidate("b")
+        store.get_papers.reset_mock()
+        cache.get_many(["b"])
+        store.get_papers.assert_called_once_with(["b"])
@@ -0,0 +1,62 @@
+"""
+Tests for the query embedding cache module.
+
+This module tests the functionality of caching query embeddings in memory.
+"""
+
+from unittest.mock import patch
+
+from papershelf.query.query_cache import QueryEmbeddingCache
+
+
+class TestQueryEmbeddingCache:
+    """Test cases for the QueryEmbeddingCache class."""
+
+    def test_get_and_put(self):
+        """Test storing and retrieving query embeddings."""
+        cache = QueryEmbeddingCache(capacity=10)
+
+        assert cache.get("What is the main contribution?") is None
+        cache.put("What is the main contribution?", [0.1, 0.2])
+
+        # Check that normalized variants share an entry
+        assert cache.get("what is  the main contribution? ") == [0.1, 0.2]
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["size"] == 1
+
+    def test_lru_eviction(self):
+        """Test that the least recently used query is evicted first."""
+        cache = QueryEmbeddingCache(capacity=2)
+        cache.put("query 1", [1.0])
+        cache.put("query 2", [2.0])
+
+        # Use query 1 so that query 2 becomes the least recently used entry
+        cache.get("query 1")
+        cache.put("query 3", [3.0])
+
+        assert cache.get("query 1") == [1.0]
+        assert cache.get("query 2") is None
+        assert cache.get("query 3") == [3.0]
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL."""
+        cache = QueryEmbeddingCache(capacity=10, ttl=60)
+
+        with patch('papershelf.query.query_cache.time.monotonic', return_value=100.0):
+            cache.put("query", [1.0])
+        with patch('papershelf.query.query_cache.time.monotonic', return_value=150.0):
+            assert cache.get("query") == [1.0]
+        with patch('papershelf.query.query_cache.time.monotonic', return_value=161.0):
+            assert cache.get("query") is None
+
+        assert cache.get_stats()["size"] == 0
+
+    def test_disabled(self):
+        """Test that a zero capacity cache stores nothing."""
+        cache = QueryEmbeddingCache(capacity=0)
+        cache.put("query", [1.0])
+        assert cache.get("query") is None
@@ -6,11 +6,13 @@ responses using LangGraph.
 """
 
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import ANY, MagicMock, call, patch
 
-from papershelf.query.rag_engine import RAGEngine
+from papershelf.query.rag_engine import RAGEngine, reciprocal_rank_fusion
 from papershelf.db.vector_store import VectorStore
 from papershelf.ingest.embedding_generator import EmbeddingGenerator
+from papershelf.query.paper_cache import PaperMetadataCache
+from papershelf.query.query_cache import QueryEmbeddingCache
 
 
 class TestRAGEngine:
@@ -103,6 +105,288 @@ class TestRAGEngine:
         assert result["answer"] == "This is a mock answer."
         assert len(result["retrieved_documents"]) == 2
 
+    @patch('papershelf.query.rag_engine.ChatOpenAI')
+    def test_embed_query_with_cache(self, mock_chat_openai):
+        """Test that repeated queries reuse the cached embedding."""
+        embedding_generator = MagicMock()
+        embedding_generator.generate_embeddings.return_value = [[0.1, 0.2, 0.3]]
+
+        engine = RAGEngine(
+            vector_store=MagicMock(),
+            embedding_generator=embedding_generator,
+            query_cache=QueryEmbeddingCache(capacity=10)
+        )
+
+        assert engine._embed_query("What is the main contribution?") == [0.1, 0.2, 0.3]
+        assert engine._embed_query("what is the main contribution?") == [0.1, 0.2, 0.3]
+
+        # Check that the model only ran once
+        embedding_generator.generate_embeddings.assert_called_once_with("What is the main contribution?")
+        assert engine.query_cache.get_stats()["hits"] == 1
+
+    @patch('papershelf.query.rag_engine.ChatOpenAI')
+    def test_attach_paper_metadata(self, mock_chat_openai):
+        """Test that paper metadata is joined onto chunks that only carry the paper ID."""
+        paper_store = MagicMock()
+        paper_store.get_papers.return_value = {
+            "paper1": {"doc_id_base": "paper1", "title": "Test Paper", "author": "Test Author"}
+        }
+        engine = RAGEngine(
+            vector_store=MagicMock(),
+            embedding_generator=MagicMock(),
+            paper_cache=PaperMetadataCache(paper_store)
+        )
+
+        documents = engine._attach_paper_metadata([
+            {"id": "paper1_0", "text": "Text 1", "metadata": {"doc_id_base": "paper1", "chunk_index": 0}},
+            {"id": "paper1_1", "text": "Text 2", "metadata": {"doc_id_base": "paper1", "chunk_index": 1}},
+            # Chunks stored with a full copy of the paper metadata are left as they are
+            {"id": "old_0", "text": "Text 3", "metadata": {"doc_id_base": "old", "title": "Old Paper"}}
+        ])
+
+        assert documents[0]["metadata"]["title"] == "Test Paper"
+        assert documents[1]["metadata"]["chunk_index"] == 1
+        assert documents[2]["metadata"]["title"] == "Old Paper"
+        paper_store.get_papers.assert_called_once_with(["paper1"])
+
+    def test_reciprocal_rank_fusion(self):
+        """Test that documents ranked well by both lists rise to the top."""
+        vector = [{"id": "a", "text": "A"}, {"id": "b", "text": "B"}, {"id": "c", "text": "C"}]
+        lexical = [{"id": "b", "text": "B"}, {"id": "d", "text": "D"}]
+
+        fused = reciprocal_rank_fusion([vector, lexical], n_results=3, k=60)
+
+        assert [doc["id"] for doc in fused] == ["b", "a", "d"]
+        assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
+        assert fused[0]["text"] == "B"
+
+    @patch('papershelf.query.rag_engine.ChatOpenAI')
+    def test_retrieve_modes(self, mock_chat_openai):
+        """Test vector, lexical and hybrid retrieval."""
+        embedding_generator = MagicMock()
+        embedding_generator.generate_embeddings.return_value = [[0.1, 0.2, 0.3]]
+        vector_store = MagicMock()
+        vector_store.query.return_value = {
+            "ids": [["doc1", "doc2"]],
+            "documents": [["Document 1", "Document 2"]],
+            "metadatas": [[{"source": "test1"}, {"source": "test2"}]]
+        }
+        lexical_index = MagicMock()
+        lexical_index.search.return_value = {
+            "ids": [["doc3", "doc2"]],
+            "documents": [["Document 3", "Document 2"]],
+            "metadatas": [[{}, {"source": "test2"}]],
+            "scores": [[4.2, 3.1]]
+        }
+        engine = RAGEngine(
+            vector_store=vector_store,
+            embedding_generator=embedding_generator,
+            top_k=2,
+            lexical_index=lexical_index,
+            retrieval_mode="hybrid",
+            hybrid_candidates=10
+        )
+
+        # Hybrid mode asks both searches for more candidates and fuses them
+        documents = engine.retrieve("test query")
+        assert [doc["id"] for doc in documents] == ["doc2", "doc1"]
+        vector_store.query.assert_called_once_with(query_embedding=[0.1, 0.2, 0.3], n_results=10)
+        lexical_index.search.assert_called_once_with("test query", n_results=10)
+
+        # Lexical mode does not embed the query
+        embedding_generator.generate_embeddings.reset_mock()
+        documents = engine.retrieve("test query", retrieval_mode="lexical")
+        assert [doc["id"] for doc in documents] == ["doc3", "doc2"]
+        embedding_generator.generate_embeddings.assert_not_called()
+
+        documents = engine.retrieve("test query", retrieval_mode="vector")
+        assert [doc["id"] for doc in documents] == ["doc1", "doc2"]
+
+        with pytest.raises(ValueError):
+            engine.retrieve("test query", retrieval_mode="fuzzy")
+        engine.close()
+
+    @patch('papershelf.query.rag_engine.ChatOpenAI')
+    def test_retrieve_without_lexical_index(self, mock_chat_openai):
+        """Test that every mode falls back to vector search without a lexical index."""
+        vector_store = MagicMock()
+        vector_store.query.return_value = {"ids": [["doc1"]], "documents": [["Document 1"]], "metadatas": None}
+        engine = RAGEngine(
+            vector_store=vector_store,
+            embedding_generator=MagicMock(),
+            retrieval_mode="hybrid"
+        )
+
+        assert engine.retrieve("test query") == [{"id": "doc1", "text": "Document 1", "metadata": {}}]
+        assert engine.retrieve("test query", retrieval_mode="lexical")[0]["id"] == "doc1"
+        assert engine.retrieve("test query", retrieval_mode="two_stage")[0]["id"] == "doc1"
+        vector_store.query.assert_called_with(query_embedding=ANY, n_results=5)
+
+    @patch('papershelf.query.rag_engine.ChatOpenAI')
+    def test_retrieve_two_stage(self, mock_chat_openai):
+        """Test searching only the chunks of the papers picked by their centroids."""
+        embedding_generator = MagicMock()
+        embedding_generator.generate_embeddings.side_effect = lambda texts: [[0.1, 0.2, 0.3] for _ in texts]
+        vector_store = MagicMock()
+        vector_store.query.return_value = {
+            "ids": [["paper2_0"]],
+            "documents": [["Document 1"]],
+            "metadatas": [[{"doc_id_base": "paper2"}]]
+        }
+        centroid_index = MagicMock()
+        centroid_index.search.return_value = [["paper2", "paper7"], []]
+        engine = RAGEngine(
+            vector_store=vector_store,
+            embedding_generator=embedding_generator,
+            top_k=3,
+            centroid_index=centroid_index,
+            retrieval_mode="two_stage",
+            two_stage_papers=2
+        )
+
+        batches = engine.retrieve_batch(["first query", "second query"])
+
+        assert [[doc["id"] for doc in documents] for documents in batches] == [["paper2_0"], ["paper2_0"]]
+        centroid_index.search.assert_called_once_with([[0.1, 0.2, 0.3], [0.1, 0.2, 0.3]], n_papers=2)
+        assert vector_store.query.call_args_list == [
+            call(query_embedding=[0.1, 0.2, 0.3], n_results=3, where={"doc_id_base": {"$in": ["paper2", "paper7"]}}),
+            # Without centroids for the query's papers, all chunks are searched
+            call(query_embedding=[0.1, 0.2, 0.3], n_results=3, where=None)
+        ]
+
+        centroid_index.search.return_value = [["paper2"]]
+        assert engine.retrieve("first query")[0]["id"] == "paper2_0"
+        engine.close()
+
+    @patch('papershelf.query.rag_engine.ChatOpenAI')
+    def test_retrieve_two_stage_with_missing_centroids(self, mock_chat_openai, caplog):
+        """Test that all chunks are searched while some papers have no centroid."""
+        embedding_generator = MagicMock()
+        embedding_generator.generate_embeddings.side_effect = lambda texts: [[0.1, 0.2, 0.3] for _ in texts]
+        vector_store = MagicMock()
+        vector_store.query_batch.return_value = {"ids": [["doc1"]], "documents": [["Document 1"]], "metadatas": None}
+        vector_store.query.return_value = vector_store.query_batch.return_value
+        centroid_index = MagicMock()
+        centroid_index.count.return_value = 2
+        centroid_index.get_version.return_value = 1
+        centroid_index.search.return_value = [["paper1"]]
+        paper_store = MagicMock()
+        paper_store.count_papers.return_value = 3
+        paper_store.get_version.return_value = 1
+        engine = RAGEngine(
+            vector_store=vector_store,
+            embedding_generator=embedding_generator,
+            centroid_index=centroid_index,
+            retrieval_mode="two_stage",
+            paper_store=paper_store
+        )
+
+        with caplog.at_level("WARNING", logger="papershelf.query.rag_engine"):
+            assert engine.retrieve("test query")[0]["id"] == "doc1"
+            engine.retrieve("test query")
+
+        centroid_index.search.assert_not_called()
+        vector_store.query_batch.assert_called_with(query_embeddings=[[0.1, 0.2, 0.3]], n_results=5)
+        # The warning is logged once, not on every query
+        assert len(caplog.records) == 1
+        assert "1 papers have no centroid" in caplog.text
+        # The papers are only counted again once either store changes
+        assert paper_store.count_papers.call_count == 1
+
+        # Once every paper has a centroid, the papers are picked by centroid again
+        centroid_index.count.return_value = 3
+        centroid_index.get_version.return_value = 2
+        engine.retrieve("test query")
+        engine.retrieve("test query")
+        assert centroid_index.search.call_count == 2
+        assert paper_store.count_papers.call_count == 2
+        engine.close()
+
+    @patch('papershelf.query.rag_engine.ChatOpenAI')
+    def test_embed_queries_with_cache(self, mock_chat_openai):
+        """Test that uncached queries are embedded together in one call."""
+        embedding_generator = MagicMock()
+        embedding_generator.generate_embeddings.side_effect = lambda texts: [[float(len(text))] for text in texts]
+        engine = RAGEngine(
+            vector_store=MagicMock(),
+            embedding_generator=embedding_generator,
+            query_cache=QueryEmbeddingCache(capacity=10)
+        )
+        engine.query_cache.put("cached", [0.5])
+
+        embeddings = engine._embed_queries(["cached", "four", "sixsix", "four"])
+
+        assert embeddings == [[0.5], [4.0], [6.0], [4.0]]
+        embedding_generator.generate_embeddings.assert_called_once_with(["four", "sixsix"])
+        assert engine.query_cache.get("sixsix") == [6.0]
+
+    @patch('papershelf.query.rag_engine.ChatOpenAI')
+    def test_query_batch(self, mock_chat_openai):
+        """Test answering several queries with one embedding pass and one index search."""
+        mock_chat_openai.return_value.invoke.side_effect = lambda prompt: MagicMock(
+            content="Answer about " + ("attention" if "attention" in prompt else "residuals")
+        )
+        embedding_generator = MagicMock()
+        embedding_generator.generate_embeddings.return_value = [[0.1, 0.2], [0.3, 0.4]]
+        vector_store = MagicMock()
+        vector_store.query_batch.return_value = {
+            "ids": [["doc1"], ["doc2"]],
+            "documents": [["On attention"], ["On residuals"]],
+            "metadatas": [[{"source": "test1"}], [{"source": "test2"}]]
+        }
+        engine = RAGEngine(
+            vector_store=vector_store,
+            embedding_generator=embedding_generator,
+            top_k=1,
+            generation_concurrency=2
+        )
+
+        results = engine.query_batch(["What is attention?", "What are residuals?"])
+
+        assert [result["query"] for result in results] == ["What is attention?", "What are residuals?"]
+        assert results[0]["answer"] == "Answer about attention"
+        assert results[1]["answer"] == "Answer about residuals"
+        assert results[1]["retrieved_documents"] == [
+            {"id": "doc2", "text": "On residuals", "metadata": {"source": "test2"}}
+        ]
+        embedding_generator.generate_embeddings.assert_called_once_with(["What is attention?", "What are residuals?"])
+        vector_store.query_batch.assert_called_once_with(query_embeddings=[[0.1, 0.2], [0.3, 0.4]], n_results=1)
+        assert engine.query_batch([]) == []
+        engine.close()
+
+    @patch('papershelf.query.rag_engine.ChatOpenAI')
+    def test_retrieve_batch_hybrid(self, mock_chat_openai):
+        """Test that hybrid batch retrieval fuses each query's own results."""
+        embedding_generator = MagicMock()
+        embedding_generator.generate_embeddings.return_value = [[0.1], [0.2]]
+        vector_store = MagicMock()
+        vector_store.query_batch.return_value = {
+            "ids": [["a1", "a2"], ["b1", "b2"]],
+            "documents": [["A1", "A2"], ["B1", "B2"]],
+            "metadatas": [[{}, {}], [{}, {}]]
+        }
+        lexical_index = MagicMock()
+        lexical_index.search.side_effect = lambda query_text, n_results: {
+            "ids": [["a2"] if query_text == "first" else ["b2"]],
+            "documents": [["A2"] if query_text == "first" else ["B2"]],
+            "metadatas": [[{}]],
+            "scores": [[1.0]]
+        }
+        engine = RAGEngine(
+            vector_store=vector_store,
+            embedding_generator=embedding_generator,
+            top_k=2,
+            lexical_index=lexical_index,
+            retrieval_mode="hybrid",
+            lexical_workers=2
+        )
+        assert engine._lexical_executor._max_workers == 2
+
+        batches = engine.retrieve_batch(["first", "second"])
+
+        assert [[doc["id"] for doc in documents] for documents in batches] == [["a2", "a1"], ["b2", "b1"]]
+        engine.close()
+
     @patch('papershelf.query.rag_engine.StateGraph')
     def test_graph_nodes(self, mock_state_graph, vector_store, embedding_generator):
         """Test that the graph has the expected nodes."""
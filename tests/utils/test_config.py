@@ -63,6 +63,20 @@ class TestConfig:
         # Reset the config module
         reload(config)
 
+    def test_pdf_worker_max_tasks_disabled(self):
+        """Test that 0 or an empty PDF_WORKER_MAX_TASKS means workers are never recycled."""
+        from importlib import reload
+        from papershelf.utils import config
+
+        for value in ("0", ""):
+            with patch.dict(os.environ, {"PDF_WORKER_MAX_TASKS": value}):
+                reload(config)
+                assert config.Config.PDF_WORKER_MAX_TASKS is None
+
+        # Reset the config module
+        reload(config)
+        assert config.Config.PDF_WORKER_MAX_TASKS == 50
+
     def test_get_all(self):
         """Test the get_all method."""
         # Get all config settings
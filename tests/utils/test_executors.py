@@ -0,0 +1,64 @@
+"""
+Tests for the executors module.
+
+This module tests running blocking calls in named thread pools without
+blocking the event loop.
+"""
+
+import asyncio
+import threading
+import time
+
+from papershelf.utils.executors import BlockingExecutor
+
+
+class TestBlockingExecutor:
+    """Test cases for the BlockingExecutor class."""
+
+    def test_run_in_named_threads(self):
+        """Test that calls run in the pool's threads with their arguments."""
+        executor = BlockingExecutor("test-pool", max_workers=2)
+
+        def describe(value, suffix=""):
+            return threading.current_thread().name, f"{value}{suffix}"
+
+        try:
+            thread_name, result = asyncio.run(executor.run(describe, "value", suffix="!"))
+        finally:
+            executor.shutdown()
+
+        assert thread_name.startswith("test-pool")
+        assert result == "value!"
+
+    def test_event_loop_stays_responsive(self):
+        """Test that the event loop keeps running while a blocking call runs."""
+        executor = BlockingExecutor("test-pool", max_workers=1)
+        ticks = []
+
+        async def tick():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def main():
+            await asyncio.gather(executor.run(time.sleep, 0.2), tick())
+
+        try:
+            asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        # All ticks happened while the blocking call was sleeping
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.2
+
+    def test_restart_after_shutdown(self):
+        """Test that the pool is recreated when used after shutdown."""
+        executor = BlockingExecutor("test-pool", max_workers=1)
+
+        first = executor.executor
+        executor.shutdown()
+        assert asyncio.run(executor.run(sum, [1, 2, 3])) == 6
+        assert executor.executor is not first
+
+        executor.shutdown()
@@ -0,0 +1,81 @@
+"""
+Tests for the lazy service module.
+
+This module tests that services are built once, on first use, and can be
+closed and rebuilt.
+"""
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from papershelf.utils.lazy import LazyService
+
+
+class TestLazyService:
+    """Test cases for the LazyService class."""
+
+    def test_builds_on_first_use(self):
+        """Test that the factory runs only when the service is used."""
+        factory = MagicMock()
+        factory.return_value.greet.return_value = "hello"
+        service = LazyService("greeter", factory)
+
+        assert service.name == "greeter"
+        assert not service.loaded
+        factory.assert_not_called()
+
+        assert service.greet() == "hello"
+        assert service.loaded
+        assert service.get() is factory.return_value
+        factory.assert_called_once()
+
+    def test_concurrent_first_use_builds_once(self):
+        """Test that concurrent first calls share a single build."""
+        calls = []
+        ready = threading.Event()
+
+        def factory():
+            ready.wait(1)
+            calls.append(1)
+            return object()
+
+        service = LazyService("slow", factory)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(service.get())) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        ready.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+
+    def test_close(self):
+        """Test that close closes a built service and allows a rebuild."""
+        factory = MagicMock()
+        service = LazyService("closable", factory)
+
+        # Closing an unbuilt service does nothing
+        service.close()
+        factory.assert_not_called()
+
+        instance = service.get()
+        service.close()
+        instance.close.assert_called_once()
+        assert not service.loaded
+
+        service.get()
+        assert factory.call_count == 2
+
+    def test_private_attributes_are_not_proxied(self):
+        """Test that private attribute lookups do not build the service."""
+        factory = MagicMock()
+        service = LazyService("private", factory)
+
+        with pytest.raises(AttributeError):
+            service._missing
+
+        factory.assert_not_called()